@@ -4,6 +4,8 @@ import pandas as pd
 
 import numpy as np
 
+from compact_vectors import write_vectors
+
 df = pd.read_csv("C:/Users/ravichandrav/Downloads/food-price-index-september-2023-index-numbers.csv")
 
 print(df)
@@ -44,9 +46,11 @@ def cosine_similarity(vec_a, vec_b):
 
   
 
-df["embedding"] = df["text"].apply(
-lambda
- x: get_embedding(x))
+# Embeddings go to a float16 vector store next to the CSV instead of being stringified into it
+embeddings = model.encode(df["text"].tolist())
+
+vector_store = write_vectors("C:/Users/nigelc/Downloads/word_embeddings_vectors", embeddings,
+                             df[["text"]].to_dict("records"), dtype="float16", overwrite=True)
 
 df.to_csv("C:/Users/nigelc/Downloads/word_embeddings.csv")
 
@@ -57,8 +61,6 @@ search_term = input("Enter a search term: ")
 
 search_term_vector = get_embedding(search_term)
 
-df["similarities"]=df["embedding"].apply(
-lambda
- x: cosine_similarity(x, search_term_vector))
+df["similarities"] = vector_store.similarities(search_term_vector)
 
 df.sort_values("similarities", ascending=False).head(20)
\ No newline at end of file
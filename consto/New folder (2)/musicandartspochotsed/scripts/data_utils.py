@@ -1,16 +1,23 @@
 """Data utilities for index preparation."""
 import ast
+import asyncio
+import hashlib
 import html
 import json
 import os
+import random
 import re
+import sqlite3
 import ssl
 import subprocess
 import tempfile
+import threading
 import time
+import urllib.error
 import urllib.request
 from abc import ABC, abstractmethod
-from concurrent.futures import ProcessPoolExecutor
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from functools import partial
 from typing import Any, Callable, Dict, Generator, List, Optional, Tuple, Union
@@ -735,6 +742,60 @@ def merge_chunks_serially(chunked_content_list: List[str], num_tokens: int, cont
     if total_size > 0:
         yield current_chunk, total_size
 
+class EmbeddingCache:
+    """On-disk cache of embeddings keyed by model, dimensions and a hash of the text.
+
+    Re-running data preparation over unchanged content reads the vectors
+    back from SQLite instead of calling the embedding endpoint again.
+    Off unless a path is given or EMBEDDING_CACHE_PATH is set.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path is not None else os.getenv("EMBEDDING_CACHE_PATH", "")
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not be used across fork, worker processes open their own
+        if self._conn is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def key(model: str, dimensions: Optional[int], text: str) -> str:
+        return hashlib.sha256(f"{model}\0{dimensions or ''}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, dimensions: Optional[int], text: str) -> Optional[List[float]]:
+        if not self.path:
+            return None
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (self.key(model, dimensions, text),)
+            ).fetchone()
+        return array("d", row[0]).tolist() if row else None
+
+    def put(self, model: str, dimensions: Optional[int], text: str, vector: List[float]):
+        if not self.path:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                (self.key(model, dimensions, text), array("d", vector).tobytes(), time.time()),
+            )
+            conn.commit()
+
+
+embedding_cache = EmbeddingCache()
+
+
 def get_payload_and_headers_cohere(
     text, aad_token) -> Tuple[Dict, Dict]:
     oai_headers =  {
@@ -744,7 +805,26 @@ def get_payload_and_headers_cohere(
 
     cohere_body = { "texts": [text], "input_type": "search_document" }
     return cohere_body, oai_headers
-    
+
+
+def get_embedding_cache_key(endpoint) -> Tuple[str, Optional[int]]:
+    """Model and dimensions `get_embedding` caches vectors from `endpoint` under."""
+    FLAG_EMBEDDING_MODEL = os.getenv("FLAG_EMBEDDING_MODEL", "AOAI")
+    FLAG_COHERE = os.getenv("FLAG_COHERE", "ENGLISH")
+    FLAG_AOAI = os.getenv("FLAG_AOAI", "V3")
+    cache_model = f"{FLAG_EMBEDDING_MODEL}:{FLAG_AOAI if FLAG_EMBEDDING_MODEL == 'AOAI' else FLAG_COHERE}:{endpoint}"
+    cache_dimensions = int(os.getenv("VECTOR_DIMENSION", 1536)) if FLAG_EMBEDDING_MODEL == "AOAI" and FLAG_AOAI == "V3" else None
+    return cache_model, cache_dimensions
+
+
+def get_cached_embedding(text, embedding_model_endpoint=None, embedding_model_key=None, azure_credential=None):
+    """The embedding `get_embedding` would return for these arguments if it is already cached, otherwise None."""
+    if not isinstance(text, str):
+        return None
+    endpoint = embedding_model_endpoint if embedding_model_endpoint else os.environ.get("EMBEDDING_MODEL_ENDPOINT")
+    return embedding_cache.get(*get_embedding_cache_key(endpoint), text)
+
+
 def get_embedding(text, embedding_model_endpoint=None, embedding_model_key=None, azure_credential=None):
     endpoint = embedding_model_endpoint if embedding_model_endpoint else os.environ.get("EMBEDDING_MODEL_ENDPOINT")
     
@@ -752,6 +832,12 @@ def get_embedding(text, embedding_model_endpoint=None, embedding_model_key=None,
     FLAG_COHERE = os.getenv("FLAG_COHERE", "ENGLISH")
     FLAG_AOAI = os.getenv("FLAG_AOAI", "V3")
 
+    # Identical text embedded by the same model and dimensions is served from the cache
+    cache_model, cache_dimensions = get_embedding_cache_key(endpoint)
+    cached = get_cached_embedding(text, endpoint)
+    if cached is not None:
+        return cached
+
     if azure_credential is None and (endpoint is None or key is None):
         raise Exception("EMBEDDING_MODEL_ENDPOINT and EMBEDDING_MODEL_KEY are required for embedding")
 
@@ -774,7 +860,10 @@ def get_embedding(text, embedding_model_endpoint=None, embedding_model_key=None,
                                                       input=text, 
                                                       dimensions=int(os.getenv("VECTOR_DIMENSION", 1536)))
             
-            return embeddings.model_dump()['data'][0]['embedding']
+            embedding = embeddings.model_dump()['data'][0]['embedding']
+            if isinstance(text, str):
+                embedding_cache.put(cache_model, cache_dimensions, text, embedding)
+            return embedding
         
         if FLAG_EMBEDDING_MODEL == "COHERE":
             if FLAG_COHERE == "MULTILINGUAL":
@@ -789,11 +878,184 @@ def get_embedding(text, embedding_model_endpoint=None, embedding_model_key=None,
             result = response.read()
             result_content = json.loads(result.decode('utf-8'))
                         
-            return result_content["embeddings"][0]   
+            embedding = result_content["embeddings"][0]
+            if isinstance(text, str):
+                embedding_cache.put(cache_model, cache_dimensions, text, embedding)
+            return embedding
         
 
     except Exception as e:
-        raise Exception(f"Error getting embeddings with endpoint={endpoint} with error={e}")
+        raise Exception(f"Error getting embeddings with endpoint={endpoint} with error={e}") from e
+
+
+def _error_chain(error: BaseException) -> Generator[BaseException, None, None]:
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _error_status_and_headers(error: BaseException) -> Tuple[Optional[int], Dict[str, str]]:
+    """HTTP status and response headers of an openai or urllib error, wherever it sits in the chain."""
+    for e in _error_chain(error):
+        response = getattr(e, "response", None)
+        status = getattr(e, "status_code", None) or getattr(e, "code", None) or getattr(response, "status_code", None)
+        headers = getattr(response, "headers", None) or getattr(e, "headers", None)
+        if isinstance(status, int):
+            return status, {k.lower(): v for k, v in dict(headers or {}).items()}
+    return None, {}
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the service asked us to wait in retry-after-ms / retry-after, if it did."""
+    _, headers = _error_status_and_headers(error)
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            value = headers["retry-after"]
+            try:
+                return float(value)
+            except ValueError:
+                from email.utils import parsedate_to_datetime
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Throttling, server errors and connection failures are worth retrying; bad requests are not."""
+    status, _ = _error_status_and_headers(error)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return any(isinstance(e, (ConnectionError, TimeoutError, urllib.error.URLError)) for e in _error_chain(error))
+
+
+def get_retry_delay(error: BaseException, attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+    """Retry-After when the service sent one, otherwise exponential backoff with full jitter."""
+    retry_after = get_retry_after(error)
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+class EmbeddingScheduler:
+    """
+    Shared asyncio scheduler for embedding calls. Keeps up to `max_in_flight`
+    requests running while staying within the deployment's requests-per-minute
+    and tokens-per-minute quota, so a bulk job runs at the quota instead of
+    alternating between bursts of 429s and idle sleeps. A 429 pauses every
+    caller for as long as the service's Retry-After asks.
+
+    `embed_fn` is a blocking embedding function such as `get_embedding`; it
+    runs on a thread pool sized to `max_in_flight`. `cached_fn`, called with
+    the same arguments, returns an already cached embedding or None; cached
+    texts are answered without taking a slot or any quota.
+    """
+
+    def __init__(self, embed_fn: Callable = None, requests_per_minute: int = None, tokens_per_minute: int = None,
+                 max_in_flight: int = None, max_retries: int = RETRY_COUNT,
+                 count_tokens: Callable[[str], int] = None, cached_fn: Callable = None):
+        self.embed_fn = embed_fn or get_embedding
+        if cached_fn is None and self.embed_fn is get_embedding:
+            cached_fn = get_cached_embedding
+        self.cached_fn = cached_fn
+        self.requests_per_minute = requests_per_minute or int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", 720))
+        self.tokens_per_minute = tokens_per_minute or int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", 120000))
+        self.max_in_flight = max_in_flight or int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", 16))
+        self.max_retries = max_retries
+        self.count_tokens = count_tokens or TOKEN_ESTIMATOR.estimate_tokens
+        # Budgets refill continuously and may hold at most a minute's worth
+        self._request_budget = float(self.requests_per_minute)
+        self._token_budget = float(self.tokens_per_minute)
+        self._refilled_at = None
+        self._paused_until = 0.0
+        self._budget_lock = None
+        self._in_flight = None
+        self._executor = None
+
+    def _start(self):
+        if self._budget_lock is None:
+            # Created lazily so they belong to the running event loop
+            self._budget_lock = asyncio.Lock()
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+            self._refilled_at = asyncio.get_running_loop().time()
+
+    def _refill(self, now: float):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._request_budget = min(float(self.requests_per_minute), self._request_budget + elapsed * self.requests_per_minute / 60)
+        self._token_budget = min(float(self.tokens_per_minute), self._token_budget + elapsed * self.tokens_per_minute / 60)
+
+    async def _acquire(self, tokens: int):
+        # A single input larger than the whole budget waits for a full budget rather than forever
+        tokens = min(tokens, self.tokens_per_minute)
+        loop = asyncio.get_running_loop()
+        # Callers take budget one at a time, in arrival order
+        async with self._budget_lock:
+            while True:
+                now = loop.time()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._request_budget >= 1 and self._token_budget >= tokens:
+                    self._request_budget -= 1
+                    self._token_budget -= tokens
+                    return
+                wait = max(
+                    (1 - self._request_budget) * 60 / self.requests_per_minute,
+                    (tokens - self._token_budget) * 60 / self.tokens_per_minute
+                )
+                await asyncio.sleep(wait)
+
+    def _pause(self, seconds: float):
+        now = asyncio.get_running_loop().time()
+        self._paused_until = max(self._paused_until, now + seconds)
+        # Whatever budget was left evidently was not; refill from empty during the pause
+        self._refilled_at = now
+        self._request_budget = 0.0
+        self._token_budget = 0.0
+
+    async def embed(self, text: str, *args, **kwargs):
+        """Embed `text` with `embed_fn(text, *args, **kwargs)` once budget allows, retrying throttled calls."""
+        if self.cached_fn is not None:
+            cached = self.cached_fn(text, *args, **kwargs)
+            if cached is not None:
+                return cached
+        self._start()
+        tokens = self.count_tokens(text)
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            async with self._in_flight:
+                # Budget is taken only once a slot is free, so a pause also holds back queued calls
+                await self._acquire(tokens)
+                try:
+                    return await loop.run_in_executor(self._executor, partial(self.embed_fn, text, *args, **kwargs))
+                except Exception as e:
+                    if attempt == self.max_retries or not is_retryable_error(e):
+                        raise
+                    status, _ = _error_status_and_headers(e)
+                    delay = get_retry_delay(e, attempt)
+                    print(f"Embedding request failed with status={status}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                    if status == 429:
+                        self._pause(delay)
+            if status != 429:
+                await asyncio.sleep(delay)
+
+    async def embed_many(self, texts: List[str], *args, **kwargs) -> List:
+        """Embed all of `texts` concurrently, results in input order."""
+        return await asyncio.gather(*(self.embed(text, *args, **kwargs) for text in texts))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._budget_lock = None
+        self._in_flight = None
 
 
 def chunk_content_helper(
@@ -894,8 +1156,12 @@ def chunk_content(
                             doc.contentVector = get_embedding(chunk, azure_credential=azure_credential, embedding_model_endpoint=embedding_endpoint)
                             break
                         except Exception as e:
-                            print(f"Error getting embedding for chunk with error={e}, retrying, current at {i + 1} retry, {RETRY_COUNT - (i + 1)} retries left")
-                            time.sleep(30)
+                            if not is_retryable_error(e):
+                                print(f"Error getting embedding for chunk with error={e}, not retrying")
+                                break
+                            delay = get_retry_delay(e, i)
+                            print(f"Error getting embedding for chunk with error={e}, retrying in {delay:.1f}s, current at {i + 1} retry, {RETRY_COUNT - (i + 1)} retries left")
+                            time.sleep(delay)
                     if doc.contentVector is None:
                         raise Exception(f"Error getting embedding for chunk={chunk}")
                     
@@ -1,19 +1,79 @@
 import argparse
-from asyncio import sleep
+import asyncio
+from collections import deque
 import json
 
 from azure.identity import DefaultAzureCredential
 from azure.keyvault.secrets import SecretClient
 
-from data_utils import get_embedding
+from compact_vectors import VectorWriter
+from data_utils import EmbeddingScheduler, get_embedding
 
-RETRY_COUNT = 5
+
+async def embed_documents(input_path, output_path, scheduler, embedding_endpoint, embedding_key, vector_format="json"):
+    """
+    Embed documents concurrently through the scheduler and write them out in input order:
+    as JSONL with a contentVector field, or for vector_format float16/int8 as a compact
+    vector store directory whose metadata rows are the documents.
+
+    A document whose embedding fails is written to JSONL without a contentVector, but a
+    compact store has no row without a vector, so it raises once the rest are written.
+    Returns the number of documents that could not be embedded.
+    """
+    # Documents read ahead of the one being written, enough to keep every request slot busy
+    window = scheduler.max_in_flight * 4
+    pending = deque()
+    if vector_format == "json":
+        output_file, writer = open(output_path, "w"), None
+    else:
+        output_file, writer = None, VectorWriter(output_path, vector_format, overwrite=True)
+    failed = 0
+
+    def write_next():
+        nonlocal failed
+        document, task = pending.popleft()
+        try:
+            embedding = task.result()
+        except Exception as e:
+            print(f"Error generating embedding: {e}")
+            embedding = None
+        if embedding is None:
+            failed += 1
+        if writer is None:
+            if embedding is not None:
+                document["contentVector"] = embedding
+            output_file.write(json.dumps(document) + "\n")
+        elif embedding is not None:
+            writer.add([embedding], [document])
+
+    try:
+        with open(input_path) as input_file:
+            for line in input_file:
+                document = json.loads(line)
+                task = asyncio.ensure_future(scheduler.embed(document["content"], embedding_endpoint, embedding_key))
+                pending.append((document, task))
+                if len(pending) >= window:
+                    await asyncio.wait([pending[0][1]])
+                    write_next()
+            while pending:
+                await asyncio.wait([pending[0][1]])
+                write_next()
+    finally:
+        (output_file or writer).close()
+    if failed:
+        message = f"{failed} documents could not be embedded"
+        if writer is not None:
+            raise RuntimeError(f"{message} and are missing from {output_path}")
+        print(f"{message} and were written without a contentVector")
+    return failed
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input_data_path", type=str, required=True)
     parser.add_argument("--output_file_path", type=str, required=True)
     parser.add_argument("--config_file", type=str, required=True)
+    parser.add_argument("--vector_format", choices=["json", "float16", "int8"], default="json",
+                        help="json writes JSONL with contentVector lists; float16/int8 write a compact vector store directory")
 
     args = parser.parse_args()
 
@@ -46,22 +106,16 @@ if __name__ == "__main__":
         if not embedding_endpoint:
             raise ValueError("No embedding endpoint provided in config file. Embeddings will not be generated.")
 
-        # Embed documents
+        # Embed documents at the deployment's quota, retrying throttled requests after Retry-After
+        scheduler = EmbeddingScheduler(
+            get_embedding,
+            requests_per_minute=index_config.get("embedding_requests_per_minute"),
+            tokens_per_minute=index_config.get("embedding_tokens_per_minute"),
+            max_in_flight=index_config.get("embedding_max_in_flight")
+        )
         print("Generating embeddings...")
-        with open(args.input_data_path) as input_file, open(args.output_file_path, "w") as output_file:
-            for line in input_file:
-                document = json.loads(line)
-                # Sleep/Retry in case embedding model is rate limited.
-                for _ in range(RETRY_COUNT):
-                    try:
-                        embedding = get_embedding(document["content"], embedding_endpoint,  embedding_key)
-                        document["contentVector"] = embedding
-                        break
-                    except:
-                        print("Error generating embedding. Retrying...")
-                        sleep(30)
-                
-                output_file.write(json.dumps(document) + "\n")
+        asyncio.run(embed_documents(args.input_data_path, args.output_file_path, scheduler, embedding_endpoint, embedding_key, args.vector_format))
+        scheduler.close()
 
         print("Embeddings generated and saved to {}.".format(args.output_file_path))
 
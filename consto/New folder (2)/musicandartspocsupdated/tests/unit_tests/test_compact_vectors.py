@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from scripts.compact_vectors import VectorStore, VectorWriter, write_vectors
+
+
+@pytest.mark.parametrize("empty", [[], [[]], np.zeros((0, 3))])
+def test_empty_batch_adds_no_rows(tmp_path, empty):
+    with VectorWriter(str(tmp_path), dimensions=None) as writer:
+        writer.add(empty)
+    store = VectorStore(str(tmp_path))
+    assert len(store) == 0
+    assert store.search([1.0, 0.0, 0.0]) == []
+
+    # The dimensions are still free for the first real batch
+    store = write_vectors(str(tmp_path), [[1.0, 0.0, 0.0]])
+    assert (len(store), store.dimensions) == (1, 3)
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_round_trip_and_search(tmp_path, dtype):
+    vectors = np.random.default_rng(0).normal(size=(50, 8)).astype(np.float32)
+    store = write_vectors(str(tmp_path), vectors, [{"id": i} for i in range(50)], dtype=dtype)
+
+    assert np.allclose(store.vectors(), vectors, atol=0.05)
+    assert store.search(vectors[17], k=1)[0][0] == 17
+    assert next(store.iter_documents())["id"] == 0
+
+
+def test_appends_keep_earlier_rows(tmp_path):
+    write_vectors(str(tmp_path), [[1.0, 0.0]], [{"id": "a"}])
+    store = write_vectors(str(tmp_path), [[0.0, 1.0]], [{"id": "b"}])
+    assert [row["id"] for row in store.metadata] == ["a", "b"]
+
+    with pytest.raises(ValueError):
+        write_vectors(str(tmp_path), [[1.0, 0.0, 0.0]])
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from scripts import data_utils
+from scripts.data_utils import EmbeddingCache, EmbeddingScheduler, get_embedding_cache_key
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"))
+    monkeypatch.setattr(data_utils, "embedding_cache", cache)
+    return cache
+
+
+def test_cached_texts_take_no_quota(cache, monkeypatch):
+    endpoint = "https://example/openai/deployments/ada/embeddings?api-version=1"
+    cache.put(*get_embedding_cache_key(endpoint), "cached", [0.5, 0.5])
+    calls = []
+    monkeypatch.setattr(data_utils, "get_embedding", lambda text, *args: calls.append(text) or [1.0, 0.0])
+
+    # The quota only has room for one request per minute
+    scheduler = EmbeddingScheduler(requests_per_minute=1, tokens_per_minute=1000, cached_fn=data_utils.get_cached_embedding,
+                                   embed_fn=data_utils.get_embedding, count_tokens=len)
+
+    async def run():
+        return await asyncio.wait_for(scheduler.embed_many(["cached", "fresh", "cached"], endpoint), timeout=5)
+
+    assert asyncio.run(run()) == [[0.5, 0.5], [1.0, 0.0], [0.5, 0.5]]
+    assert calls == ["fresh"]
+    assert scheduler._request_budget == 0
+    scheduler.close()
+
+
+def test_get_embedding_scheduler_checks_the_cache_by_default():
+    scheduler = EmbeddingScheduler()
+    assert scheduler.cached_fn is data_utils.get_cached_embedding
+    assert EmbeddingScheduler(embed_fn=lambda text: [0.0]).cached_fn is None
+
+
+def test_cache_is_off_unless_a_path_is_configured(tmp_path, monkeypatch):
+    monkeypatch.delenv("EMBEDDING_CACHE_PATH", raising=False)
+    monkeypatch.chdir(tmp_path)
+    cache = EmbeddingCache()
+    cache.put("ada", None, "text", [1.0])
+    assert cache.get("ada", None, "text") is None
+    assert list(tmp_path.iterdir()) == []
@@ -43,6 +43,8 @@ def chatbotIndexation(myblob: func.InputStream):
         file_extension = document_process.get_file_extension(file_name)
         chunks = document_process.process_file(file_content, file_extension)
 
+        # One client for all chunks; unchanged chunks come from the embedding cache
+        embedding = GetEmbeddings()
         # Indexing the chunks
         for chunk_number, chunk in enumerate(chunks, 1):
             document = {
@@ -53,7 +55,6 @@ def chatbotIndexation(myblob: func.InputStream):
                 "page_number": chunk_number
             }
 
-            embedding = GetEmbeddings()
             # Generate embeddings for the chunk
             document['content_embeddings'] = embedding.generate_embeddings(chunk)
 
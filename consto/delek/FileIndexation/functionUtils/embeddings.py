@@ -1,11 +1,18 @@
 from openai import AzureOpenAI
 import os
 import logging
+from FileIndexation.functionUtils.embedding_cache import EmbeddingCache
 
 # Load environment variables
 AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 EMBEDDING_API_VERSION = os.getenv("AZURE_OPENAI_EMBEDDING_API_VERSION")
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# Embeddings already computed for identical text, checked before every API call.
+# Opt-in through EMBEDDING_CACHE_PATH; the app directory is read-only when the function
+# runs from a package, so point it at a writable location such as the temp dir
+embedding_cache = EmbeddingCache()
 
 class GetEmbeddings():
     def __init__(self):
@@ -13,14 +20,18 @@ class GetEmbeddings():
             api_key=AZURE_OPENAI_KEY,
             api_version=EMBEDDING_API_VERSION,
             azure_endpoint=AZURE_OPENAI_ENDPOINT,
-            azure_deployment="text-embedding-ada-002"
+            azure_deployment=EMBEDDING_MODEL
         )
 
     def generate_embeddings(self, chunk):
+        cached = embedding_cache.get(EMBEDDING_MODEL, None, chunk)
+        if cached is not None:
+            return cached
         try:
-            response = self.client.embeddings.create(input=[chunk], model="text-embedding-ada-002")
+            response = self.client.embeddings.create(input=[chunk], model=EMBEDDING_MODEL)
             # logging.info("Response: %s", response.data)
             logging.info("Embedding generated successfully..!!")
+            embedding_cache.put(EMBEDDING_MODEL, None, chunk, response.data[0].embedding)
             return response.data[0].embedding
         except Exception as e:
             print(f"Error generating embeddings: {e}")
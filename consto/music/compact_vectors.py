@@ -0,0 +1,225 @@
+"""
+Compact on-disk format for embedding vectors.
+
+A vector store is a directory holding:
+
+    manifest.json   dtype, vector count and dimensions
+    vectors.bin     row-major float16, or int8 with a per-vector scale
+    scales.bin      float32 scale per vector (int8 only)
+    metadata.jsonl  one JSON object per vector, in the same order
+
+The binary files are raw little-endian arrays, so they are memory-mapped
+instead of parsed and can be appended to. float16 keeps half the bytes of
+float32 with ~3 significant digits; int8 keeps a quarter, scaling each
+vector by max(|x|) / 127.
+"""
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_NAME = "compact-vectors"
+FORMAT_VERSION = 1
+DTYPES = {"float16": np.dtype("<f2"), "int8": np.dtype("i1")}
+SCALE_DTYPE = np.dtype("<f4")
+
+MANIFEST_FILE = "manifest.json"
+VECTORS_FILE = "vectors.bin"
+SCALES_FILE = "scales.bin"
+METADATA_FILE = "metadata.jsonl"
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Encode float vectors as `dtype`; int8 also returns the per-vector scales."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float16":
+        return vectors.astype(DTYPES["float16"]), None
+    if dtype == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        safe = np.where(scales > 0, scales, 1.0)[:, None]
+        codes = np.clip(np.rint(vectors / safe), -127, 127).astype(DTYPES["int8"])
+        return codes, scales.astype(SCALE_DTYPE)
+    raise ValueError(f"Unsupported vector dtype: {dtype}, expected one of {', '.join(DTYPES)}")
+
+
+def dequantize(codes: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """Decode stored rows back to float32."""
+    vectors = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        vectors = vectors * np.asarray(scales, dtype=np.float32)[:, None]
+    return vectors
+
+
+class VectorWriter:
+    """
+    Appends vectors and their metadata to a store, creating it if needed, or
+    replacing it with `overwrite`. The manifest is rewritten on `close`, so
+    readers only see complete rows.
+    """
+
+    def __init__(self, path: str, dtype: str = "float16", dimensions: int = None, overwrite: bool = False):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}, expected one of {', '.join(DTYPES)}")
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        manifest = None
+        if not overwrite and os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            manifest = read_manifest(path)
+        if manifest is not None:
+            if manifest["dtype"] != dtype:
+                raise ValueError(f"{path} stores {manifest['dtype']} vectors, cannot append {dtype}")
+            if manifest["dimensions"]:
+                if dimensions is not None and dimensions != manifest["dimensions"]:
+                    raise ValueError(f"{path} stores {manifest['dimensions']}-dimensional vectors, got {dimensions}")
+                dimensions = manifest["dimensions"]
+        self.dtype = dtype
+        self.dimensions = dimensions
+        self.count = manifest["count"] if manifest else 0
+        # Drop anything past the last manifest, left behind by a writer that never closed
+        mode = "r+b" if manifest else "wb"
+        self._vectors = open(os.path.join(path, VECTORS_FILE), mode)
+        self._vectors.truncate(self.count * (dimensions or 0) * DTYPES[dtype].itemsize)
+        self._vectors.seek(0, os.SEEK_END)
+        self._scales = None
+        if dtype == "int8":
+            self._scales = open(os.path.join(path, SCALES_FILE), mode)
+            self._scales.truncate(self.count * SCALE_DTYPE.itemsize)
+            self._scales.seek(0, os.SEEK_END)
+        metadata_path = os.path.join(path, METADATA_FILE)
+        if manifest:
+            with open(metadata_path, "r+b") as f:
+                for _ in range(self.count):
+                    f.readline()
+                f.truncate()
+        self._metadata = open(metadata_path, "a" if manifest else "w", encoding="utf-8")
+
+    def add(self, vectors: Sequence[Sequence[float]], metadata: Sequence[Dict[str, Any]] = None):
+        """Append a batch of vectors, each with an optional metadata dict."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        # An empty batch ([] or [[]]) adds no rows, and must not fix the dimensions at 0
+        if vectors.size == 0:
+            return
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if self.dimensions is None:
+            self.dimensions = vectors.shape[1]
+        elif vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions}-dimensional vectors, got {vectors.shape[1]}")
+        if metadata is not None and len(metadata) != len(vectors):
+            raise ValueError(f"Got {len(metadata)} metadata rows for {len(vectors)} vectors")
+
+        codes, scales = quantize(vectors, self.dtype)
+        self._vectors.write(codes.tobytes())
+        if scales is not None:
+            self._scales.write(scales.tobytes())
+        for row in (metadata if metadata is not None else [{}] * len(vectors)):
+            self._metadata.write(json.dumps(row) + "\n")
+        self.count += len(vectors)
+
+    def close(self):
+        if self._vectors.closed:
+            return
+        for f in (self._vectors, self._scales, self._metadata):
+            if f is not None:
+                f.close()
+        manifest = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "dtype": self.dtype,
+            "count": self.count,
+            "dimensions": self.dimensions or 0,
+        }
+        temp_path = os.path.join(self.path, MANIFEST_FILE + ".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, os.path.join(self.path, MANIFEST_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_manifest(path: str) -> Dict[str, Any]:
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} store")
+    if manifest.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"{path} was written by a newer version ({manifest['version']}) of the format")
+    return manifest
+
+
+class VectorStore:
+    """Read-only view of a store; vectors are memory-mapped and decoded per block."""
+
+    def __init__(self, path: str):
+        self.path = path
+        manifest = read_manifest(path)
+        self.dtype = manifest["dtype"]
+        self.count = manifest["count"]
+        self.dimensions = manifest["dimensions"]
+        self.codes = self._map(VECTORS_FILE, DTYPES[self.dtype], (self.count, self.dimensions))
+        self.scales = self._map(SCALES_FILE, SCALE_DTYPE, (self.count,)) if self.dtype == "int8" else None
+        self._metadata = None
+
+    def _map(self, name: str, dtype: np.dtype, shape: Tuple[int, ...]) -> np.ndarray:
+        if self.count == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode="r", shape=shape)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def metadata(self) -> List[Dict[str, Any]]:
+        if self._metadata is None:
+            with open(os.path.join(self.path, METADATA_FILE), encoding="utf-8") as f:
+                self._metadata = [json.loads(line) for _, line in zip(range(self.count), f)]
+        return self._metadata
+
+    def vectors(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """Rows start:stop decoded to float32."""
+        stop = self.count if stop is None else min(stop, self.count)
+        return dequantize(self.codes[start:stop], None if self.scales is None else self.scales[start:stop])
+
+    def similarities(self, query: Sequence[float], block_size: int = 65536) -> np.ndarray:
+        """Cosine similarity of `query` to every stored vector, decoding one block at a time."""
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, block_size):
+            # The int8 scale cancels out of the cosine, so the raw codes are compared directly
+            block = np.asarray(self.codes[start:start + block_size], dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1)
+            scores[start:start + len(block)] = (block @ query) / np.where(norms > 0, norms, 1.0)
+        return scores
+
+    def search(self, query: Sequence[float], k: int = 10) -> List[Tuple[int, float]]:
+        """Indexes and cosine similarities of the `k` stored vectors closest to `query`, best first."""
+        scores = self.similarities(query)
+        k = min(k, self.count)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def iter_documents(self, vector_field: str = "contentVector", block_size: int = 4096) -> Iterator[Dict[str, Any]]:
+        """Metadata rows with their decoded vector under `vector_field`, e.g. for an index upload."""
+        metadata = self.metadata
+        for start in range(0, self.count, block_size):
+            for offset, vector in enumerate(self.vectors(start, start + block_size)):
+                document = dict(metadata[start + offset])
+                document[vector_field] = vector.tolist()
+                yield document
+
+
+def write_vectors(path: str, vectors: Sequence[Sequence[float]], metadata: Sequence[Dict[str, Any]] = None,
+                  dtype: str = "float16", overwrite: bool = False) -> VectorStore:
+    """Write (or append) vectors to the store at `path` and open it."""
+    with VectorWriter(path, dtype=dtype, overwrite=overwrite) as writer:
+        writer.add(vectors, metadata)
+    return VectorStore(path)
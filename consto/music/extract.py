@@ -4,13 +4,13 @@ import pdfplumber
 from pdf2image import convert_from_path
 from dotenv import load_dotenv
 import json
-import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import openai
 import re
+import shutil
 from io import BytesIO
 import base64
 from pathlib import Path
+from compact_vectors import VectorStore, VectorWriter
 
 # Load environment variables
 load_dotenv()
@@ -21,9 +21,12 @@ AZURE_OPENAI_KEY = "090c8f8e9f724b7eb47bf8a9e30db65b"
 AZURE_EMBEDDING_MODEL_NAME = "text-embedding-ada-002"  # This is your deployment ID
 AZURE_OPENAI_VERSION = "2023-05-15"
 
-# Local database to store documents, embeddings, and extracted content
-database = {"documents": [], "embeddings": [], "keywords": [], "images": [], "tables": []}
+# Local database to store documents, keywords and extracted content
+database = {"documents": [], "keywords": [], "images": [], "tables": []}
 DB_FILE = "local_database.json"
+# Embeddings live in a compact vector store, row i belongs to database["documents"][i]
+VECTOR_DIR = "local_vectors"
+VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float16")  # or "int8"
 
 # Load or initialize the database
 if os.path.exists(DB_FILE):
@@ -32,10 +35,23 @@ if os.path.exists(DB_FILE):
             database = json.load(f)
     except json.JSONDecodeError:
         print("Error loading local_database.json. The file may be corrupted. Initializing a new database.")
-        database = {"documents": [], "embeddings": [], "keywords": [], "tables": []}
+        database = {"documents": [], "keywords": [], "tables": []}
+        # The stored vectors belonged to the lost documents
+        shutil.rmtree(VECTOR_DIR, ignore_errors=True)
 else:
     with open(DB_FILE, "w") as f:
         json.dump(database, f)
+    shutil.rmtree(VECTOR_DIR, ignore_errors=True)
+
+# Move embeddings from databases written before the vector store into it
+if "embeddings" in database:
+    legacy_embeddings = database.pop("embeddings")
+    shutil.rmtree(VECTOR_DIR, ignore_errors=True)
+    if legacy_embeddings:
+        with VectorWriter(VECTOR_DIR, VECTOR_DTYPE, overwrite=True) as writer:
+            writer.add(legacy_embeddings)
+    with open(DB_FILE, "w") as f:
+        json.dump(database, f)
 
 # Function to extract text from PDF
 def extract_text_from_pdf(file_path):
@@ -115,6 +131,7 @@ def extract_keywords(text):
 
 # Index PDF documents (Split each document into sections/paragraphs)
 def index_documents(folder_path, save_image_folder):
+    embeddings = []
     for file_name in os.listdir(folder_path):
         if file_name.endswith(".pdf"):
             file_path = os.path.join(folder_path, file_name)
@@ -139,23 +156,28 @@ def index_documents(folder_path, save_image_folder):
                 
                 # Append the document, embedding, keywords, tables, and images to the database
                 database["documents"].append({"file_name": file_name, "text": section})
-                database["embeddings"].append(embedding)  # No .tolist() needed
+                embeddings.append(embedding)
                 database["keywords"].append(keywords)
                 database["tables"].append(tables)  # Storing extracted tables
 
-    # Save the database to the file
+    # Append the new embeddings to the vector store and save the database to the file
+    if embeddings:
+        with VectorWriter(VECTOR_DIR, VECTOR_DTYPE) as writer:
+            writer.add(embeddings)
     with open(DB_FILE, "w") as f:
         json.dump(database, f)
 
 # Query documents (return relevant snippet based on query)
 def query_documents(query):
     query_embedding = compute_embedding(query)
-    embeddings = np.array(database["embeddings"])
-    similarities = cosine_similarity([query_embedding], embeddings)[0]
-    
+    if not os.path.exists(VECTOR_DIR):
+        return "Sorry, I couldn't find relevant information in the indexed documents."
+    matches = VectorStore(VECTOR_DIR).search(query_embedding, k=1)
+    if not matches:
+        return "Sorry, I couldn't find relevant information in the indexed documents."
+
     # Retrieve the most relevant snippet
-    best_match_idx = np.argmax(similarities)
-    similarity_score = similarities[best_match_idx]
+    best_match_idx, similarity_score = matches[0]
 
     # Check if the similarity is above a relevance threshold (0.5 in this case)
     if similarity_score > 0.5:  
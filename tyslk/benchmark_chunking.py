@@ -0,0 +1,178 @@
+"""
+Chunking strategy benchmark.
+
+Runs every strategy registered in ChunkingFactory over the same local corpus
+and reports chars/s, chunks per document, the chunk length distribution in
+tokens and peak Python memory per strategy, so strategies can be compared by
+cost before choosing one for a tenant.
+
+The corpus is every .txt/.md file under --corpus-dir, or a fixed synthetic
+corpus when no directory is given.
+
+Example:
+    python -m Factory.benchmark_chunking --corpus-dir ./samples --strategies sentence "specific tokens"
+"""
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+import numpy as np
+
+from Factory.benchmark_pipeline import WORDS
+from Factory.chunking_factory import ChunkingFactory
+from Factory.embedding_batches import token_counter
+from Services.Chunking.parse_cache import parse_cache
+
+CORPUS_EXTENSIONS = (".txt", ".md")
+# Page separator in the synthetic corpus, also the default PAGE_TOKENS
+PAGE_BREAK = "--- page break ---"
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 24))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def synthetic_corpus(documents: int, pages: int, seed: int = 42) -> List[str]:
+    """Documents of pages with a heading, paragraphs and a repeated footer, fixed by `seed`."""
+    rng = random.Random(seed)
+    headings = ["Introduction", "Overview", "Methods", "Challenges", "Conclusion"]
+    corpus = []
+    for _ in range(documents):
+        page_texts = []
+        for page in range(pages):
+            heading = headings[page % len(headings)]
+            body = "\n\n".join(_paragraph(rng, rng.randint(2, 6)) for _ in range(4))
+            page_texts.append(f"{heading}\n{body}\nContoso Ltd - Confidential - Page {page + 1}")
+        corpus.append(f"\n{PAGE_BREAK}\n".join(page_texts))
+    return corpus
+
+
+def load_corpus(corpus_dir: str) -> List[str]:
+    corpus = []
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            if name.lower().endswith(CORPUS_EXTENSIONS):
+                with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+                    corpus.append(f.read())
+    return corpus
+
+
+def run_strategy(chunker, corpus: List[str], batch_size: int) -> List[List[str]]:
+    results = []
+    for start in range(0, len(corpus), batch_size):
+        batch = corpus[start:start + batch_size]
+        results.extend(chunker.chunk_batch(batch) if batch_size > 1 else [chunker.chunk(batch[0])])
+    return results
+
+
+def benchmark_strategy(factory: ChunkingFactory, strategy: str, corpus: List[str], args: argparse.Namespace,
+                       count_tokens) -> Dict[str, Any]:
+    try:
+        chunker = factory.get_chunker(strategy)
+        # Each strategy parses from scratch instead of reusing the previous strategy's parses
+        parse_cache.clear()
+        start = time.perf_counter()
+        results = run_strategy(chunker, corpus, args.batch_size)
+        elapsed = time.perf_counter() - start
+
+        peak_mb = None
+        if not args.skip_memory:
+            # Separate pass, tracemalloc slows the code it traces down
+            parse_cache.clear()
+            tracemalloc.start()
+            run_strategy(chunker, corpus, args.batch_size)
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+    except Exception as e:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return {"strategy": strategy, "error": str(e)}
+
+    chars = sum(len(text) for text in corpus)
+    lengths = np.array([count_tokens(chunk) for chunks in results for chunk in chunks] or [0])
+    return {
+        "strategy": strategy,
+        "seconds": elapsed,
+        "chars_per_second": chars / elapsed if elapsed else 0.0,
+        "chunks_per_document": sum(len(chunks) for chunks in results) / len(corpus),
+        "tokens": {
+            "min": int(lengths.min()),
+            "p50": float(np.percentile(lengths, 50)),
+            "p90": float(np.percentile(lengths, 90)),
+            "p99": float(np.percentile(lengths, 99)),
+            "max": int(lengths.max()),
+            "mean": float(lengths.mean()),
+        },
+        "peak_memory_mb": peak_mb,
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ.setdefault("MAX_TOKENS", str(args.max_tokens))
+    os.environ.setdefault("OVERLAP_TOKENS", str(args.overlap_tokens))
+    os.environ.setdefault("MAX_LEN", str(args.max_len))
+    os.environ.setdefault("PAGE_TOKENS", PAGE_BREAK)
+
+    corpus = load_corpus(args.corpus_dir) if args.corpus_dir else synthetic_corpus(args.documents, args.pages)
+    if not corpus:
+        raise SystemExit(f"No {', '.join(CORPUS_EXTENSIONS)} files found under {args.corpus_dir}")
+
+    factory = ChunkingFactory()
+    strategies = args.strategies or list(factory.strategies.keys())
+    # Chunk lengths in tiktoken tokens when an encoding is given, otherwise in whitespace-separated words
+    count_tokens = token_counter(args.token_encoding) if args.token_encoding else (lambda text: len(text.split()))
+    return {
+        "documents": len(corpus),
+        "corpus_chars": sum(len(text) for text in corpus),
+        "token_unit": args.token_encoding or "words",
+        "strategies": [benchmark_strategy(factory, strategy, corpus, args, count_tokens) for strategy in strategies],
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"documents={report['documents']} chars={report['corpus_chars']} token unit={report['token_unit']}")
+    print(f"{'strategy':<30}{'chars/s':>12}{'chunks/doc':>12}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}{'peak MB':>10}")
+    for result in report["strategies"]:
+        if "error" in result:
+            print(f"{result['strategy']:<30} failed: {result['error']}")
+            continue
+        tokens = result["tokens"]
+        peak = f"{result['peak_memory_mb']:.1f}" if result["peak_memory_mb"] is not None else "-"
+        print(
+            f"{result['strategy']:<30}{result['chars_per_second']:>12.0f}{result['chunks_per_document']:>12.1f}"
+            f"{tokens['p50']:>8.0f}{tokens['p90']:>8.0f}{tokens['p99']:>8.0f}{tokens['max']:>8}{peak:>10}"
+        )
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Compare ChunkingFactory strategies on throughput, chunk sizes and memory.")
+    parser.add_argument("--corpus-dir", help="Directory of .txt/.md files; a synthetic corpus is used when omitted.")
+    parser.add_argument("--documents", type=int, default=50, help="Documents in the synthetic corpus.")
+    parser.add_argument("--pages", type=int, default=5, help="Pages per synthetic document.")
+    parser.add_argument("--strategies", nargs="*", help="Strategies to run, all registered strategies by default.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Documents per chunk_batch call; 1 calls chunk per document.")
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--overlap-tokens", type=int, default=32)
+    parser.add_argument("--max-len", type=int, default=1000)
+    parser.add_argument("--token-encoding", help="tiktoken encoding used to measure chunk lengths instead of words.")
+    parser.add_argument("--skip-memory", action="store_true", help="Skip the tracemalloc pass that measures peak memory.")
+    parser.add_argument("--output", help="Also write the report as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    return report
+
+
+if __name__ == "__main__":
+    main()
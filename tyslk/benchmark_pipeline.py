@@ -0,0 +1,272 @@
+"""
+Offline end-to-end ingestion benchmark.
+
+Drives the generated Pipeline over a synthetic corpus of PDF, DOCX, XLSX and
+CSV files through the real TextExtractionFactory and ChunkingFactory, with
+stub embedding and search services that add configurable latency. Reports
+records/s, per-node p50/p99 latency and peak RSS. `--embedding opensource`
+embeds with the local CPU model instead of the stub, for a deterministic run
+with real embedding cost.
+
+Example:
+    python -m Factory.benchmark_pipeline --files-per-type 20 --mode staged --embed-latency 0.05
+    python -m Factory.benchmark_pipeline --mode async --max-in-flight 50 --batch-size 8
+"""
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from Factory.dynamic_main_generator import MainFileGenerator
+from Factory.embedding_factory import EmbeddingFactory
+from Factory.search_factory import SearchFactory
+
+# Vocabulary for the synthetic documents, fixed so runs are comparable
+WORDS = (
+    "ingestion pipeline document extraction chunk embedding index search vector "
+    "tenant library folder policy contract invoice report quarterly revenue "
+    "customer account region service latency throughput record metadata"
+).split()
+
+FILE_TYPES = ("pdf", "docx", "xlsx", "csv")
+
+
+class StubEmbeddingService:
+    """Deterministic embedding service that sleeps instead of calling an API."""
+
+    def __init__(self):
+        self.latency = float(os.getenv("BENCHMARK_EMBED_LATENCY", "0.05"))
+        self.per_item_latency = float(os.getenv("BENCHMARK_EMBED_ITEM_LATENCY", "0.0"))
+        self.dimensions = int(os.getenv("BENCHMARK_EMBED_DIMENSIONS", "1536"))
+
+    def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return {"status": "success", "message": "Validation successful", "error": False}
+
+    def generate_embeddings(self, chunks: List[str]) -> List[List[float]]:
+        time.sleep(self.latency + self.per_item_latency * len(chunks))
+        embeddings = []
+        for chunk in chunks:
+            seed = hashlib.sha256(chunk.encode("utf-8")).digest()
+            embeddings.append([seed[i % len(seed)] / 255.0 for i in range(self.dimensions)])
+        return embeddings
+
+
+class StubSearchService:
+    """Search service that counts uploaded documents and sleeps per upload."""
+
+    def __init__(self):
+        self.latency = float(os.getenv("BENCHMARK_SEARCH_LATENCY", "0.02"))
+        self.documents = 0
+
+    def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return {"status": "success", "message": "Validation successful", "error": False}
+
+    def store_records(self, documents: List[Dict[str, Any]]) -> bool:
+        time.sleep(self.latency)
+        self.documents += len(documents)
+        return True
+
+
+def _paragraphs(rng: random.Random, count: int, words: int = 60) -> List[str]:
+    return [" ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "." for _ in range(count)]
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Build a minimal text PDF with one page per list of lines."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for lines in pages:
+        text = " T* ".join(
+            "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") Tj" for line in lines
+        )
+        stream = f"BT /F1 10 Tf 14 TL 40 800 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+
+def make_docx(paragraphs: List[str]) -> bytes:
+    from docx import Document
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def _rows(rng: random.Random, count: int) -> List[List[Any]]:
+    return [[i, rng.choice(WORDS), rng.choice(WORDS), round(rng.random() * 1000, 2)] for i in range(count)]
+
+
+def make_xlsx(rows: List[List[Any]]) -> bytes:
+    import pandas as pd
+    out = io.BytesIO()
+    pd.DataFrame(rows, columns=["id", "category", "region", "amount"]).to_excel(out, index=False)
+    return out.getvalue()
+
+
+def make_csv(rows: List[List[Any]]) -> bytes:
+    lines = ["id,category,region,amount"] + [",".join(str(value) for value in row) for row in rows]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def build_corpus(files_per_type: int, pages: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Synthetic records shaped like connector output: file_name plus file_bytes."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(files_per_type):
+        for file_type in FILE_TYPES:
+            if file_type == "pdf":
+                content = make_pdf([[p[:90] for p in _paragraphs(rng, 12, 15)] for _ in range(pages)])
+            elif file_type == "docx":
+                content = make_docx(_paragraphs(rng, 8 * pages))
+            elif file_type == "xlsx":
+                content = make_xlsx(_rows(rng, 40 * pages))
+            else:
+                content = make_csv(_rows(rng, 40 * pages))
+            records.append({"file_name": f"doc_{i:05d}.{file_type}", "file_bytes": content})
+    return records
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        # Windows: fall back to psutil when it is installed
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except Exception:
+            return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def load_pipeline_class(config: Dict[str, Any], workdir: str):
+    """Generate main.py for `config` with MainFileGenerator and import its Pipeline class."""
+    path = MainFileGenerator(json.loads(json.dumps(config)), os.path.join(workdir, "benchmark_main.py")).generate_main_file()
+    spec = importlib.util.spec_from_file_location("benchmark_main", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.Pipeline
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    os.environ.setdefault("TEXT_EXTRACTION_TYPE", args.extraction)
+    os.environ["CHUNKING_STRATEGY"] = args.chunking_strategy
+    os.environ.setdefault("MAX_TOKENS", str(args.max_tokens))
+    os.environ.setdefault("OVERLAP_TOKENS", "0")
+    os.environ.setdefault("MAX_LEN", "500")
+    os.environ["EMBEDDING_TYPE"] = args.embedding
+    # Every run embeds the same corpus; a warm embedding cache would skip the work being measured
+    os.environ["EMBEDDING_CACHE_PATH"] = ""
+    os.environ["SEARCH_TYPE"] = "benchmark"
+    os.environ["BENCHMARK_EMBED_LATENCY"] = str(args.embed_latency)
+    os.environ["BENCHMARK_SEARCH_LATENCY"] = str(args.search_latency)
+    EmbeddingFactory.service_type.register("benchmark", f"{__name__}:StubEmbeddingService")
+    SearchFactory._services.register("benchmark", f"{__name__}:StubSearchService")
+
+    corpus = build_corpus(args.files_per_type, args.pages)
+    corpus_bytes = sum(len(record["file_bytes"]) for record in corpus)
+
+    node = lambda service: {"type": service, "service": service, "workers": args.workers, "batch_size": args.batch_size}
+    config = {
+        "nodes": [{"type": "benchmark", "service": "connectors"}]
+        + [node(service) for service in ("text_extraction", "chunking", "embeddings", "search")],
+        "execution": {"mode": args.mode, "queue_size": args.queue_size, "max_in_flight": args.max_in_flight},
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        Pipeline = load_pipeline_class(config, workdir)
+        pipeline = Pipeline(config)
+        start = time.perf_counter()
+        for record in corpus:
+            pipeline.process_record(dict(record))
+        pipeline.executor.close()
+        elapsed = time.perf_counter() - start
+
+    nodes = pipeline.metrics.snapshot()["nodes"]
+    return {
+        "mode": args.mode,
+        "records": len(corpus),
+        "corpus_mb": corpus_bytes / (1024 * 1024),
+        "seconds": elapsed,
+        "records_per_second": len(corpus) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "nodes": {
+            node_type: {
+                "records_out": values["records_out"],
+                "errors": values["errors"],
+                "p50_ms": values["p50_seconds"] * 1000,
+                "p99_ms": values["p99_seconds"] * 1000,
+            }
+            for node_type, values in nodes.items()
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"mode={report['mode']} records={report['records']} corpus={report['corpus_mb']:.1f} MB")
+    print(f"{report['records_per_second']:.2f} records/s over {report['seconds']:.2f}s, peak RSS {report['peak_rss_mb']:.1f} MB")
+    print(f"{'node':<18}{'out':>8}{'errors':>8}{'p50 ms':>12}{'p99 ms':>12}")
+    for node_type, values in report["nodes"].items():
+        print(f"{node_type:<18}{values['records_out']:>8}{values['errors']:>8}{values['p50_ms']:>12.2f}{values['p99_ms']:>12.2f}")
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Offline end-to-end ingestion benchmark for the generated Pipeline.")
+    parser.add_argument("--files-per-type", type=int, default=10, help="Files generated for each of PDF, DOCX, XLSX and CSV.")
+    parser.add_argument("--pages", type=int, default=3, help="Approximate pages of content per file.")
+    parser.add_argument("--mode", choices=["sequential", "staged", "async"], default="sequential")
+    parser.add_argument("--workers", type=int, default=1, help="Workers per node in staged mode.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Records per node call in staged and async mode.")
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--max-in-flight", type=int, default=100, help="Records processed at once in async mode.")
+    parser.add_argument("--extraction", default="opensource", help="TEXT_EXTRACTION_TYPE used when not already set.")
+    parser.add_argument("--chunking-strategy", default="specific tokens")
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--embedding", choices=["benchmark", "opensource"], default="benchmark",
+                        help="EMBEDDING_TYPE: the latency stub, or the local CPU model (see OPENSOURCE_EMBEDDING_*).")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="Seconds added to every stub embedding call.")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="Seconds added to every search upload.")
+    parser.add_argument("--output", help="Also write the report as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import hashlib
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from Factory.pipeline_record import PAYLOAD_KEY, pickle_friendly
+
+# Key under which a record carries its checkpoint identity through the pipeline
+CHECKPOINT_KEY = "_checkpoint"
+
+# Record fields tried in order to identify the source of a record
+DEFAULT_ID_FIELDS = ["id", "file_path", "file_name"]
+
+
+def record_source_id(record: Dict[str, Any], id_fields: Optional[List[str]] = None) -> Optional[str]:
+    """Identity of the source item a record came from, taken from the first id field it has, or None."""
+    id_fields = id_fields or DEFAULT_ID_FIELDS
+    for field in id_fields:
+        value = record.get(field)
+        if value:
+            return str(value)
+    return None
+
+
+class CheckpointStore:
+    """
+    SQLite-backed record of how far each source record got through the pipeline.
+
+    For every record it keeps the source identity, a hash of its content, the
+    last node that completed and a snapshot of the record after that node.
+    A restarted run skips records that already went through every node and
+    resumes partially processed ones from the next node.
+
+    Records without any id field are identified by their content hash, and
+    records with neither are not checkpointed. Snapshots leave out the file
+    payload; a resumed record takes it from the connector's copy instead.
+    """
+
+    def __init__(self, path: str, node_types: List[str], id_fields: Optional[List[str]] = None):
+        """
+        Args:
+            path (str): Location of the SQLite database file.
+            node_types (list): Node services in pipeline order, excluding the connector.
+            id_fields (list): Record fields tried in order to identify the source record.
+        """
+        self.path = path
+        self.node_types = list(node_types)
+        self.signature = ",".join(self.node_types)
+        self.id_fields = id_fields or DEFAULT_ID_FIELDS
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                source_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                node_index INTEGER NOT NULL,
+                node_type TEXT NOT NULL,
+                completed INTEGER NOT NULL,
+                record BLOB,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def source_id(self, record: Dict[str, Any]) -> Optional[str]:
+        """The record's id field, else a hash of its content, else None."""
+        source_id = record_source_id(record, self.id_fields)
+        if source_id is None and self._content(record) is not None:
+            source_id = f"sha256:{self.content_hash(record)}"
+        return source_id
+
+    @staticmethod
+    def _content(record: Dict[str, Any]) -> Optional[bytes]:
+        content = record.get(PAYLOAD_KEY)
+        if content is None:
+            content = record.get("text")
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return content
+
+    @classmethod
+    def content_hash(cls, record: Dict[str, Any]) -> str:
+        content = cls._content(record)
+        return hashlib.sha256(content if content is not None else b"").hexdigest()
+
+    def resume(self, record: Dict[str, Any]) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """
+        Decide where a record coming from the connector should start.
+
+        Returns None when the record was already fully processed, otherwise the
+        index of the first node to run and the record to run it with.
+        """
+        source_id = self.source_id(record)
+        if source_id is None:
+            logging.warning(f"Record has no id field ({', '.join(self.id_fields)}) and no content, not checkpointing it")
+            return 0, record
+        content_hash = self.content_hash(record)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, signature, node_index, completed, record FROM checkpoints WHERE source_id = ?",
+                (source_id,),
+            ).fetchone()
+
+        record = record.copy()
+        record[CHECKPOINT_KEY] = {"source_id": source_id, "content_hash": content_hash}
+        # Unknown, changed content or a different node sequence all start from scratch
+        if row is None or row[0] != content_hash or row[1] != self.signature:
+            return 0, record
+        if row[3]:
+            return None
+        if row[4] is None:
+            return 0, record
+        snapshot = pickle.loads(row[4])
+        snapshot[CHECKPOINT_KEY] = record[CHECKPOINT_KEY]
+        # The payload is not snapshotted; nodes before text extraction still need it
+        if PAYLOAD_KEY in record:
+            snapshot[PAYLOAD_KEY] = record[PAYLOAD_KEY]
+        return row[2] + 1, snapshot
+
+    def save(self, node_index: int, node_type: str, record: Dict[str, Any]):
+        """Record that `node_type` finished for this record. Used as the executor's node callback."""
+        identity = record.get(CHECKPOINT_KEY)
+        if not identity:
+            return
+        completed = node_index >= len(self.node_types) - 1
+        snapshot = None
+        if not completed:
+            try:
+                snapshot = pickle.dumps(pickle_friendly(
+                    {k: v for k, v in record.items() if k not in (CHECKPOINT_KEY, PAYLOAD_KEY)}
+                ))
+            except Exception as e:
+                logging.warning(f"Could not snapshot record {identity['source_id']} after {node_type}: {e}")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    identity["source_id"],
+                    identity["content_hash"],
+                    self.signature,
+                    node_index,
+                    node_type,
+                    int(completed),
+                    snapshot,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,165 @@
+import os
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from Factory.checkpoint_store import record_source_id
+from Factory.main_factory import INode
+
+# Record field linking a record to its chunks waiting to be indexed
+PENDING_KEY = "_chunk_dedup"
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) splitting `num_perm` whose LSH similarity threshold is closest to `threshold`."""
+    return min(
+        ((bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0),
+        key=lambda band_rows: abs((1 / band_rows[0]) ** (1 / band_rows[1]) - threshold),
+    )
+
+
+class ChunkDedupFactory(INode):
+    """
+    Drops boilerplate and near-duplicate chunks before they are embedded.
+
+    Meant to sit right after chunking. Every chunk gets a MinHash signature
+    over its word shingles and is looked up in an LSH index of the chunks
+    indexed so far, across all records of the run, and compared with the
+    earlier chunks of its own record. A chunk whose estimated Jaccard
+    similarity to one of those reaches the threshold (headers, footers,
+    disclaimers, signature blocks) is removed from `chunks` and listed in
+    `duplicate_chunks` with the id of the chunk it repeats, so only the first
+    copy is embedded and indexed.
+
+    A record's kept chunks only join the index once it has completed every
+    node, so a record that fails later does not leave behind chunks that
+    later records are dropped in favour of. The index keeps at most
+    CHUNK_DEDUP_MAX_CHUNKS chunks, forgetting the oldest first.
+    """
+
+    def __init__(self):
+        self.threshold = float(os.getenv("CHUNK_DEDUP_THRESHOLD", 0.8))
+        self.num_perm = int(os.getenv("CHUNK_DEDUP_NUM_PERM", 64))
+        self.shingle_size = max(int(os.getenv("CHUNK_DEDUP_SHINGLE_SIZE", 5)), 1)
+        self.max_chunks = max(int(os.getenv("CHUNK_DEDUP_MAX_CHUNKS", 100000)), 1)
+        id_fields = os.getenv("DEDUP_ID_FIELDS", "")
+        self.id_fields = [field.strip() for field in id_fields.split(",") if field.strip()] or None
+        self.bands, self.rows = lsh_bands(self.num_perm, self.threshold)
+
+        # Multiply-shift hash functions standing in for random permutations
+        rng = np.random.RandomState(1)
+        self._a = rng.randint(1, 2 ** 32, size=self.num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, 2 ** 32, size=self.num_perm, dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        # Indexed chunks in insertion order: entry number -> (signature, chunk id)
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, str]]" = OrderedDict()
+        self._next_entry = 0
+        # Kept chunks of records still in the pipeline, by the key stored in the record
+        self._pending: Dict[str, List[Tuple[np.ndarray, str]]] = {}
+
+    def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "message": "Validation successful",
+            "error": False
+        }
+
+    def signature(self, chunk: str) -> Optional[np.ndarray]:
+        """MinHash signature of the chunk's word shingles, None for an empty chunk."""
+        words = chunk.lower().split()
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        shingles = np.fromiter(
+            (zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)),
+            dtype=np.uint64,
+        )
+        hashes = (self._a[:, None] * shingles[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashes.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _find(self, signature: np.ndarray) -> Optional[str]:
+        """Id of an indexed chunk similar to `signature`, if there is one."""
+        for band, key in enumerate(self._band_keys(signature)):
+            for entry in self._buckets[band].get(key, ()):
+                indexed_signature, chunk_id = self._entries[entry]
+                if np.mean(indexed_signature == signature) >= self.threshold:
+                    return chunk_id
+        return None
+
+    def _add(self, signature: np.ndarray, chunk_id: str):
+        entry = self._next_entry
+        self._next_entry += 1
+        self._entries[entry] = (signature, chunk_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(entry)
+        while len(self._entries) > self.max_chunks:
+            oldest, (oldest_signature, _) = self._entries.popitem(last=False)
+            for band, key in enumerate(self._band_keys(oldest_signature)):
+                bucket = self._buckets[band][key]
+                bucket.remove(oldest)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def process_node(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            chunks = record.get("chunks") or []
+            source_id = record_source_id(record, self.id_fields) or record.get("content_hash", "")
+            # Signatures are the CPU-heavy part, compute them outside the lock
+            signatures = [self.signature(chunk) for chunk in chunks]
+
+            kept, duplicates, pending = [], [], []
+            with self._lock:
+                for i, (chunk, signature) in enumerate(zip(chunks, signatures)):
+                    duplicate_of = None
+                    if signature is not None:
+                        duplicate_of = self._find(signature)
+                        if duplicate_of is None and pending:
+                            # Earlier chunks of this record are not indexed yet, compare with them directly
+                            agreement = np.mean(np.stack([s for s, _ in pending]) == signature, axis=1)
+                            best = int(np.argmax(agreement))
+                            if agreement[best] >= self.threshold:
+                                duplicate_of = pending[best][1]
+                    if duplicate_of is None:
+                        kept.append(chunk)
+                        if signature is not None:
+                            pending.append((signature, f"{source_id}#{i}"))
+                    else:
+                        duplicates.append({"index": i, "duplicate_of": duplicate_of})
+                pending_key = uuid.uuid4().hex
+                self._pending[pending_key] = pending
+
+            updated_record = record.copy()
+            updated_record["chunks"] = kept
+            updated_record["duplicate_chunks"] = duplicates
+            updated_record[PENDING_KEY] = pending_key
+            return {
+                "status": "success",
+                "record": updated_record,
+                "error": None
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": True,
+                "message": str(e),
+            }
+
+    def on_record_complete(self, record: Dict[str, Any]):
+        """Index the kept chunks of a record that made it through every node."""
+        with self._lock:
+            for signature, chunk_id in self._pending.pop(record.get(PENDING_KEY), ()):
+                self._add(signature, chunk_id)
+
+    def on_record_dropped(self, record: Dict[str, Any]):
+        """Forget the chunks of a record that will not be indexed."""
+        with self._lock:
+            self._pending.pop(record.get(PENDING_KEY), None)
@@ -1,21 +1,81 @@
-from typing import Dict, List,Any
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Tuple
 import spacy
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
 import numpy as np
+import joblib
 from typing import Any, Dict, List
 import re
+import bisect
 from Services.Chunking.exception import ChunkingException
+from Services.Chunking.parse_cache import ParsedDocument, parse_cache
+from Services.Chunking.keyword_automaton import KeywordAutomaton
 import os
-# Load the spaCy model with error handling
-try:
-    nlp = spacy.load("en_core_web_sm")
-except Exception as e:
-    raise ChunkingException(f"Failed to load spaCy model: {e}")
+_nlp = None
+
+def get_nlp():
+    """Load the spaCy model on first use so strategies that don't need it start instantly."""
+    global _nlp
+    if _nlp is None:
+        # Load the spaCy model with error handling
+        try:
+            _nlp = spacy.load("en_core_web_sm")
+        except Exception as e:
+            raise ChunkingException(f"Failed to load spaCy model: {e}")
+    return _nlp
+
+def iter_words(segments: Iterable[str]) -> Iterator[str]:
+    """Whitespace-separated words of a stream of text, joining words split across segments."""
+    partial = ""
+    for segment in segments:
+        if not segment:
+            continue
+        words = (partial + segment).split()
+        # The last word may continue in the next segment unless the segment ends in whitespace
+        partial = words.pop() if words and not segment[-1].isspace() else ""
+        yield from words
+    if partial:
+        yield partial
+
+
+def iter_word_windows(words: Iterable[str], size: int, step: int) -> Iterator[str]:
+    """Join words into windows of `size` words starting every `step` words, like slicing a full word list."""
+    window = []
+    for word in words:
+        window.append(word)
+        if len(window) >= size:
+            yield ' '.join(window[:size])
+            del window[:step]
+    while window:
+        yield ' '.join(window[:size])
+        del window[:step]
+
+
+def _require_content(chunks: Iterable[str]) -> Iterator[str]:
+    empty = True
+    for chunk in chunks:
+        empty = False
+        yield chunk
+    if empty:
+        raise ChunkingException("Input text is empty or only contains whitespace.")
+
 
 class Chunker:
     def chunk(self, text: str) -> List[str]:
         raise NotImplementedError("This method should be implemented by subclasses.")
+
+    def chunk_iter(self, segments: Iterable[str]) -> Iterator[str]:
+        """
+        Chunk a stream of text segments, yielding chunks as they are complete.
+
+        Strategies that need the whole document join the segments first; the
+        word, model token and page strategies override this to stream.
+        """
+        yield from self.chunk("".join(segments))
+
+    def chunk_batch(self, texts: List[str]) -> List[List[str]]:
+        """Chunk several texts, returning one list of chunks per text."""
+        return [self.chunk(text) for text in texts]
     
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -24,26 +84,85 @@ class Chunker:
             "error": False
         }
 
-class ParagraphChunker(Chunker):
+class SpacyChunker(Chunker):
+    """
+    Base for strategies that parse text with spaCy.
+
+    Texts are parsed with `nlp.pipe` in batches of `batch_size` across
+    `n_process` processes, and pipeline components the strategy does not
+    read are disabled while parsing. The resulting structure is stored in the
+    shared parse cache, so other strategies and later re-chunking of the same
+    text skip the NLP pass. Subclasses implement `chunk_parsed`.
+    """
+    # Pipeline components the strategy needs; sentence boundaries come from the
+    # parser, or from senter/sentencizer in pipelines that have one instead
+    required_components: Tuple[str, ...] = ("tok2vec", "parser", "senter", "sentencizer")
+    # ParsedDocument fields the strategy reads
+    parsed_fields: Tuple[str, ...] = ("sentences",)
+    error_label = "spaCy chunking"
+
+    def __init__(self, batch_size: int = None, n_process: int = None):
+        self.batch_size = batch_size or int(os.getenv("NLP_BATCH_SIZE", 64))
+        self.n_process = n_process or int(os.getenv("NLP_N_PROCESS", 1))
+
+    def parse(self, texts: List[str]) -> List[ParsedDocument]:
+        """Parsed structure for every text, running spaCy only for texts missing from the cache."""
+        nlp = get_nlp()
+        model = f"{nlp.meta.get('name', 'spacy')}-{nlp.meta.get('version', '')}"
+        keys = [parse_cache.key(model, text) for text in texts]
+        parsed_docs = [parse_cache.get(key) for key in keys]
+        missing = [
+            i for i, parsed in enumerate(parsed_docs)
+            if parsed is None or any(getattr(parsed, field) is None for field in self.parsed_fields)
+        ]
+        if missing:
+            disabled = [name for name in nlp.pipe_names if name not in self.required_components]
+            docs = nlp.pipe(
+                [texts[i] for i in missing],
+                batch_size=self.batch_size, n_process=self.n_process, disable=disabled
+            )
+            for i, doc in zip(missing, docs):
+                parsed = parsed_docs[i] or ParsedDocument()
+                if "sentences" in self.parsed_fields:
+                    parsed.sentences = [(sent.start_char, sent.end_char) for sent in doc.sents]
+                if "entities" in self.parsed_fields:
+                    parsed.entities = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
+                parse_cache.put(keys[i], parsed)
+                parsed_docs[i] = parsed
+        return parsed_docs
+
+    def chunk_parsed(self, text: str, parsed: ParsedDocument) -> List[str]:
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
     def chunk(self, text: str) -> List[str]:
-        """Chunk text by grouping sentences into paragraphs."""
-        if not text.strip():
+        return self.chunk_batch([text])[0]
+
+    def chunk_batch(self, texts: List[str]) -> List[List[str]]:
+        """Parse all texts in one `nlp.pipe` pass and chunk each parsed document."""
+        if any(not text.strip() for text in texts):
             raise ChunkingException("Input text is empty or only contains whitespace.")
         try:
-            doc = nlp(text)
-            paragraphs, current_paragraph = [], []
-            for sent in doc.sents:
-                current_paragraph.append(sent.text.strip())
-                # Separate paragraphs based on sentence-ending punctuation and line breaks
-                if '\n' in sent.text or sent.text.endswith(('.', '!', '?')):
-                    paragraphs.append(' '.join(current_paragraph))
-                    current_paragraph = []
-
-            if current_paragraph:
-                paragraphs.append(' '.join(current_paragraph))
-            return paragraphs
+            return [self.chunk_parsed(text, parsed) for text, parsed in zip(texts, self.parse(texts))]
         except Exception as e:
-            raise ChunkingException(f"Error during paragraph chunking: {e}")
+            raise ChunkingException(f"Error during {self.error_label}: {e}")
+
+
+class ParagraphChunker(SpacyChunker):
+    error_label = "paragraph chunking"
+
+    def chunk_parsed(self, text: str, parsed: ParsedDocument) -> List[str]:
+        """Chunk text by grouping sentences into paragraphs."""
+        paragraphs, current_paragraph = [], []
+        for sent in parsed.sentence_texts(text):
+            current_paragraph.append(sent.strip())
+            # Separate paragraphs based on sentence-ending punctuation and line breaks
+            if '\n' in sent or sent.endswith(('.', '!', '?')):
+                paragraphs.append(' '.join(current_paragraph))
+                current_paragraph = []
+
+        if current_paragraph:
+            paragraphs.append(' '.join(current_paragraph))
+        return paragraphs
 
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -53,23 +172,75 @@ class ParagraphChunker(Chunker):
         }
 
 class PageChunker(Chunker):
+    # Longest page marker, in characters, expected to be split across two segments
+    marker_lookback = 256
+
     def __init__(self, page_tokens: List[str] = None) -> None:
         """Initialize with tokens for page separators."""
         self.page_tokens = page_tokens or []
+        self._pattern = None
 
-    def chunk(self, text: str) -> List[str]:
-        """Chunk text by pages using custom page markers."""
-        if not text.strip():
-            raise ChunkingException("Input text is empty or only contains whitespace.")
+    def _delimiters(self):
+        # All page and section markers as one alternation, so the text is scanned once
+        if self._pattern is None and self.page_tokens:
+            self._pattern = re.compile("|".join(f"(?:{token})" for token in self.page_tokens))
+        return self._pattern
 
-        pages = [text]
+    def iter_pages(self, text: str) -> Iterator[str]:
+        """Yield pages lazily, in a single pass over the text."""
+        if not text or text.isspace():
+            raise ChunkingException("Input text is empty or only contains whitespace.")
+        return self._stream_pages([text])
+
+    def chunk_iter(self, segments: Iterable[str]) -> Iterator[str]:
+        """Yield pages from a stream of text segments, including markers split across segments."""
+        return _require_content(self._stream_pages(segments))
+
+    def _split(self, pattern, buffer: str, resume: int, final: bool, split_at_start: bool = False):
+        """
+        Pages and captured marker text completed in `buffer`, as re.split gives them, the offset
+        the next page starts at, where to resume scanning and whether an empty match split there.
+        """
+        pages, start, empty_split = [], 0, split_at_start
+        for match in pattern.finditer(buffer, resume):
+            if not final and match.end() >= len(buffer):
+                # The marker may continue in the next segment, scan it again then
+                return pages, start, match.start(), empty_split
+            if match.end() == match.start() == start and empty_split:
+                continue  # Already split here before the buffer was rescanned
+            pages.append(buffer[start:match.start()])
+            # Capturing groups are kept like re.split does; groups of the other markers did not take part
+            pages.extend(group for group in match.groups() if group is not None)
+            start, empty_split = match.end(), match.end() == match.start()
+        if final:
+            pages.append(buffer[start:])
+        # A marker cut off by the segment boundary starts in the last few characters
+        return pages, start, max(start, len(buffer) - self.marker_lookback), empty_split
+
+    def _stream_pages(self, segments: Iterable[str]) -> Iterator[str]:
         try:
-            for token in self.page_tokens:
-                pages = sum([re.split(token, page) for page in pages], [])
-            return [page.strip() for page in pages if page.strip()]
-        except Exception as e:
+            pattern = self._delimiters()
+            if pattern is None:
+                # No markers: the whole text is one page
+                page = "".join(segments).strip()
+                if page:
+                    yield page
+                return
+            buffer, resume, empty_split = "", 0, False
+            for segment in segments:
+                buffer += segment
+                pages, start, resume, empty_split = self._split(pattern, buffer, resume, False, empty_split)
+                yield from (page.strip() for page in pages if page.strip())
+                buffer, resume = buffer[start:], resume - start
+            pages, _, _, _ = self._split(pattern, buffer, resume, True, empty_split)
+            yield from (page.strip() for page in pages if page.strip())
+        except re.error as e:
             raise ChunkingException(f"Error during page chunking: {e}")
 
+    def chunk(self, text: str) -> List[str]:
+        """Chunk text by pages using custom page markers."""
+        return list(self.iter_pages(text))
+
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         required_fields = ["PAGE_TOKENS"]
        
@@ -99,6 +270,10 @@ class SpecificTokenChunker(Chunker):
             words = text.split()
             return [' '.join(words[i:i + self.max_tokens]) for i in range(0, len(words), self.max_tokens)]
 
+        def chunk_iter(self, segments: Iterable[str]) -> Iterator[str]:
+            """Yield fixed-size token chunks from a stream of text segments."""
+            return _require_content(iter_word_windows(iter_words(segments), self.max_tokens, self.max_tokens))
+
         def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
             required_fields = ["MAX_TOKENS"]
        
@@ -134,6 +309,11 @@ class OverlappingTokenChunker(Chunker):
         step = max(self.max_tokens - self.overlap_tokens, 1)
         return [' '.join(words[i:i + self.max_tokens]) for i in range(0, len(words), step)]
 
+    def chunk_iter(self, segments: Iterable[str]) -> Iterator[str]:
+        """Yield overlapping token chunks from a stream of text segments."""
+        step = max(self.max_tokens - self.overlap_tokens, 1)
+        return _require_content(iter_word_windows(iter_words(segments), self.max_tokens, step))
+
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
              
             required_fields = ["MAX_TOKENS","OVERLAP_TOKENS"]
@@ -157,16 +337,168 @@ class OverlappingTokenChunker(Chunker):
 
 
 
-class SentenceChunker(Chunker):
+class TiktokenChunker(Chunker):
+    """
+    Chunk text at exact model token offsets.
+
+    The document is encoded once with tiktoken; chunks are cut every
+    `max_tokens` tokens (stepping back `overlap_tokens` for overlap) and the
+    token offsets are mapped back to character spans of the original text.
+    """
+    def __init__(self, max_tokens: int, overlap_tokens: int = 0, encoding_name: str = "cl100k_base"):
+        self.max_tokens = max(max_tokens, 1)  # Ensure at least 1 token per chunk
+        self.overlap_tokens = min(max(overlap_tokens, 0), self.max_tokens - 1)  # Overlap must leave progress
+        self.encoding_name = encoding_name
+        self._encoding = None
+
+    def _get_encoding(self):
+        if self._encoding is None:
+            try:
+                import tiktoken
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception as e:
+                raise ChunkingException(f"Failed to load tiktoken encoding {self.encoding_name}: {e}")
+        return self._encoding
+
+    def _encode(self, text: str) -> Tuple[List[int], List[int], List[int]]:
+        """Tokens of `text`, the character offset each starts at and the indexes of those that start a character."""
+        encoding = self._get_encoding()
+        tokens = encoding.encode(text, disallowed_special=())
+        # Character offset at which each token starts in the decoded text
+        decoded, offsets = encoding.decode_with_offsets(tokens)
+        if decoded != text:
+            raise ChunkingException("Token offsets do not round-trip to the input text.")
+        # Only cut before tokens that start a character; a token whose first byte is
+        # a UTF-8 continuation byte shares its character with the previous token
+        boundaries = [
+            i for i, token in enumerate(tokens)
+            if not 0x80 <= encoding.decode_single_token_bytes(token)[0] <= 0xBF
+        ] + [len(tokens)]
+        return tokens, offsets, boundaries
+
+    def _spans(self, text: str, tokens: List[int], offsets: List[int], boundaries: List[int],
+               position: int = 0, settled: int = None) -> Iterator[Tuple[int, int, int]]:
+        """
+        (start, end, next position) of every chunk from token `position` on.
+
+        With `settled`, stop at the first chunk that would need a token at or
+        past that index; the tokens there may still change.
+        """
+        limit = len(tokens) if settled is None else settled
+        while True:
+            if position + self.max_tokens >= limit:
+                if settled is None:
+                    yield offsets[position], len(text), len(tokens)
+                return
+            end = boundaries[bisect.bisect_right(boundaries, position + self.max_tokens) - 1]
+            if end <= position:
+                # A single character longer than max_tokens, keep it whole
+                end = boundaries[bisect.bisect_right(boundaries, position)]
+                if end > limit:
+                    return
+            next_position = boundaries[bisect.bisect_right(boundaries, max(end - self.overlap_tokens, 0)) - 1]
+            next_position = next_position if next_position > position else end
+            yield offsets[position], offsets[end] if end < len(tokens) else len(text), next_position
+            if end >= len(tokens):
+                return
+            position = next_position
+
+    def chunk_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Character (start, end) span of every chunk."""
+        tokens, offsets, boundaries = self._encode(text)
+        if not tokens:
+            return []
+        return [(start, end) for start, end, _ in self._spans(text, tokens, offsets, boundaries)]
+
     def chunk(self, text: str) -> List[str]:
-        """Chunk text into sentences."""
+        """Chunk text into chunks of at most `max_tokens` model tokens."""
         if not text.strip():
             raise ChunkingException("Input text is empty or only contains whitespace.")
         try:
-            doc = nlp(text)
-            return [sent.text.strip() for sent in doc.sents]
+            return [text[start:end] for start, end in self.chunk_spans(text)]
+        except ChunkingException:
+            raise
         except Exception as e:
-            raise ChunkingException(f"Error during sentence segmentation: {e}")
+            raise ChunkingException(f"Error during token chunking: {e}")
+
+    def chunk_iter(self, segments: Iterable[str]) -> Iterator[str]:
+        """
+        Yield model token chunks from a stream of text segments.
+
+        tiktoken splits text into pieces with its pattern (words, number
+        groups, whitespace runs) and encodes each piece on its own. All but
+        the last two pieces of the buffer are settled: more text can only
+        change or merge the pieces at the end (a whitespace run gives its last
+        space to the word that follows it). Every chunk that ends within the
+        settled pieces is emitted, and the buffer restarts at the start of the
+        piece holding the next chunk, so the chunks are those of `chunk`.
+        A buffer that is all one piece (a long run of letters) is cut at its
+        tokens once it is far past a chunk; chunks cut there may differ
+        slightly from `chunk`, but the buffer cannot grow without bound.
+        """
+        def stream():
+            import regex
+            encoding = self._get_encoding()
+            pattern = regex.compile(encoding._pat_str)
+            buffer, scanned, position = "", 0, 0
+            for segment in segments:
+                buffer += segment
+                if len(buffer) - scanned < self.max_tokens * 4:
+                    continue
+                scanned = len(buffer)
+                tokens, offsets, boundaries = self._encode(buffer)
+                pieces = [match.start() for match in pattern.finditer(buffer)]
+                settled = bisect.bisect_left(offsets, pieces[-2]) if len(pieces) > 2 else 0
+                flush = settled <= position + self.max_tokens and len(buffer) > self.max_tokens * 16
+                if flush:
+                    settled = len(tokens) - 1
+                for start, end, position in self._spans(buffer, tokens, offsets, boundaries, position, settled):
+                    yield buffer[start:end]
+                # Restart at a piece boundary so the rest of the buffer encodes the same
+                start = offsets[position] if position < len(tokens) else len(buffer)
+                if not flush:
+                    start = pieces[bisect.bisect_right(pieces, start) - 1] if pieces and pieces[0] <= start else 0
+                position -= bisect.bisect_left(offsets, start)
+                buffer = buffer[start:]
+                scanned = len(buffer)
+            tokens, offsets, boundaries = self._encode(buffer)
+            if position < len(tokens):
+                yield from (buffer[start:end] for start, end, _ in self._spans(buffer, tokens, offsets, boundaries, position))
+
+        try:
+            yield from _require_content(stream())
+        except ChunkingException:
+            raise
+        except Exception as e:
+            raise ChunkingException(f"Error during token chunking: {e}")
+
+    def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+            required_fields = ["MAX_TOKENS"]
+       
+            missing_fields = [field for field in required_fields if not config['config'].get(field)]
+            
+            # If there are any missing fields, return an error message
+            if missing_fields:
+                return {
+                    "status": "error",
+                    "message": f"{', '.join(missing_fields)} are required and must be positive integers.",
+                    "error": True
+                }
+
+            # Return success if all checks pass
+            return {
+                "status": "success",
+                "message": "Validation successful",
+                "error": False
+            }
+
+
+class SentenceChunker(SpacyChunker):
+    error_label = "sentence segmentation"
+
+    def chunk_parsed(self, text: str, parsed: ParsedDocument) -> List[str]:
+        """Chunk text into sentences."""
+        return [sent.strip() for sent in parsed.sentence_texts(text)]
 
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -176,16 +508,15 @@ class SentenceChunker(Chunker):
         }
 
 
-class EntityChunker(Chunker):
-    def chunk(self, text: str) -> List[str]:
+class EntityChunker(SpacyChunker):
+    # en_core_web_sm's NER has its own embedding layer, so it needs nothing else
+    required_components = ("ner",)
+    parsed_fields = ("entities",)
+    error_label = "entity extraction"
+
+    def chunk_parsed(self, text: str, parsed: ParsedDocument) -> List[str]:
         """Extract named entities from the text."""
-        if not text.strip():
-            raise ChunkingException("Input text is empty or only contains whitespace.")
-        try:
-            doc = nlp(text)
-            return [ent.text for ent in doc.ents]
-        except Exception as e:
-            raise ChunkingException(f"Error during entity extraction: {e}")
+        return parsed.entity_texts(text)
 
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         return {
@@ -195,27 +526,24 @@ class EntityChunker(Chunker):
         }
 
 
-class SemanticChunker(Chunker):
-    def __init__(self, max_len: int = 200):
+class SemanticChunker(SpacyChunker):
+    error_label = "semantic chunking"
+
+    def __init__(self, max_len: int = 200, batch_size: int = None, n_process: int = None):
+        super().__init__(batch_size, n_process)
         self.max_len = max_len
 
-    def chunk(self, text: str) -> List[str]:
+    def chunk_parsed(self, text: str, parsed: ParsedDocument) -> List[str]:
         """Chunk text semantically based on sentence lengths."""
-        if not text.strip():
-            raise ChunkingException("Input text is empty or only contains whitespace.")
-        try:
-            doc = nlp(text)
-            chunks, current_chunk = [], []
-            for sent in doc.sents:
-                current_chunk.append(sent.text)
-                if len(' '.join(current_chunk)) > self.max_len:
-                    chunks.append(' '.join(current_chunk))
-                    current_chunk = []
-            if current_chunk:
+        chunks, current_chunk = [], []
+        for sent in parsed.sentence_texts(text):
+            current_chunk.append(sent)
+            if len(' '.join(current_chunk)) > self.max_len:
                 chunks.append(' '.join(current_chunk))
-            return chunks
-        except Exception as e:
-            raise ChunkingException(f"Error during semantic chunking: {e}")
+                current_chunk = []
+        if current_chunk:
+            chunks.append(' '.join(current_chunk))
+        return chunks
 
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
            
@@ -239,36 +567,164 @@ class SemanticChunker(Chunker):
             }
 
 
-class TopicBasedChunker(Chunker):
-    def __init__(self, num_topics: int = 3):
-        self.num_topics = num_topics
+class SemanticBreakpointChunker(SpacyChunker):
+    """
+    Split text where the meaning shifts between adjacent sentences.
+
+    Sentences are embedded in batches, either through `embed` (for example an
+    EmbeddingFactory service) or a local sentence-transformers model, and a
+    chunk ends wherever the cosine distance to the next sentence is above the
+    `breakpoint_percentile` of the document's distances. Chunks longer than
+    `max_len` characters are also cut at a sentence boundary.
+    """
+    error_label = "semantic breakpoint chunking"
+
+    def __init__(self, embed: Callable[[List[str]], List[List[float]]] = None, model_name: str = "all-MiniLM-L6-v2",
+                 breakpoint_percentile: float = 95, max_len: int = 0, embedding_batch_size: int = 64,
+                 batch_size: int = None, n_process: int = None):
+        super().__init__(batch_size, n_process)
+        self.embed = embed
+        self.model_name = model_name
+        self.breakpoint_percentile = breakpoint_percentile
+        self.max_len = max_len
+        self.embedding_batch_size = max(embedding_batch_size, 1)
+        self._model = None
+
+    def _embed(self, sentences: List[str]) -> np.ndarray:
+        if self.embed is None:
+            if self._model is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception as e:
+                    raise ChunkingException(f"Failed to load embedding model {self.model_name}: {e}")
+            return np.asarray(self._model.encode(sentences, batch_size=self.embedding_batch_size), dtype=np.float32)
+        vectors = []
+        for start in range(0, len(sentences), self.embedding_batch_size):
+            vectors.extend(self.embed(sentences[start:start + self.embedding_batch_size]))
+        return np.asarray(vectors, dtype=np.float32)
+
+    def breakpoints(self, vectors: np.ndarray) -> np.ndarray:
+        """Indexes of the sentences that start a new chunk."""
+        if len(vectors) < 2:
+            return np.empty(0, dtype=int)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit = vectors / np.where(norms == 0, 1, norms)
+        distances = 1 - np.einsum("ij,ij->i", unit[:-1], unit[1:])
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+        return np.flatnonzero(distances > threshold) + 1
+
+    def _group(self, sentences: List[str], breakpoints: np.ndarray) -> List[str]:
+        chunks = []
+        for group in np.split(np.arange(len(sentences)), breakpoints):
+            current = []
+            for i in group:
+                if current and self.max_len and len(' '.join(current + [sentences[i]])) > self.max_len:
+                    chunks.append(' '.join(current))
+                    current = []
+                current.append(sentences[i])
+            if current:
+                chunks.append(' '.join(current))
+        return chunks
 
-    def chunk(self, text: str) -> List[str]:
-        """Chunk text based on topics using LDA."""
-        if not text.strip():
+    def chunk_batch(self, texts: List[str]) -> List[List[str]]:
+        """Embed the sentences of all texts together and split each text at its breakpoints."""
+        if any(not text.strip() for text in texts):
             raise ChunkingException("Input text is empty or only contains whitespace.")
         try:
-            sentences = text.split('. ')
-            vectorizer = CountVectorizer()
-            sentence_vectors = vectorizer.fit_transform(sentences)
+            documents = [
+                [sent.strip() for sent in parsed.sentence_texts(text) if sent.strip()]
+                for text, parsed in zip(texts, self.parse(texts))
+            ]
+            vectors = self._embed([sent for sentences in documents for sent in sentences])
+            chunks, start = [], 0
+            for sentences in documents:
+                document_vectors = vectors[start:start + len(sentences)]
+                start += len(sentences)
+                chunks.append(self._group(sentences, self.breakpoints(document_vectors)))
+            return chunks
+        except ChunkingException:
+            raise
+        except Exception as e:
+            raise ChunkingException(f"Error during {self.error_label}: {e}")
 
-            lda = LatentDirichletAllocation(n_components=self.num_topics, random_state=42)
-            lda.fit(sentence_vectors)
 
-            topic_word = lda.components_
-            vocabulary = vectorizer.get_feature_names_out()
+class TopicBasedChunker(Chunker):
+    """
+    Labels sentences with their dominant LDA topic.
 
-            topics = [
-                ", ".join([vocabulary[i] for i in topic.argsort()[:-6:-1]])
-                for topic in topic_word
-            ]
+    With a corpus-level model (see `fit`, or `python -m Factory.fit_topic_model`
+    to fit one from a directory of files), the vectorizer and LDA are fitted
+    once, saved to `model_path` and reused by every document and process.
+    Without one, a small model is fitted per document as before.
+    """
 
-            chunks = []
-            for i, sentence in enumerate(sentences):
-                topic_assignment = lda.transform(vectorizer.transform([sentence]))
-                topic_idx = np.argmax(topic_assignment)
-                chunks.append(f"Topic {topic_idx + 1}: {topics[topic_idx]} - {sentence}")
+    def __init__(self, num_topics: int = 3, model_path: str = None, max_features: int = 20000):
+        self.num_topics = num_topics
+        self.model_path = model_path
+        self.max_features = max_features
+        self._model = None
+
+    def fit(self, texts: Iterable[str]) -> None:
+        """Fit the topic model on a corpus of documents and save it to `model_path` when set."""
+        vectorizer = CountVectorizer(max_features=self.max_features, stop_words="english")
+        document_vectors = vectorizer.fit_transform(texts)
+        lda = LatentDirichletAllocation(n_components=self.num_topics, learning_method="online", random_state=42)
+        lda.fit(document_vectors)
+        self._model = (vectorizer, lda, self._topic_labels(vectorizer, lda))
+        if self.model_path:
+            joblib.dump(self._model, self.model_path)
+
+    def load_model(self):
+        """Corpus-level model, loaded from `model_path` on first use; None when there is none."""
+        if self._model is None and self.model_path and os.path.exists(self.model_path):
+            self._model = joblib.load(self.model_path)
+        return self._model
+
+    @staticmethod
+    def _topic_labels(vectorizer, lda) -> List[str]:
+        vocabulary = vectorizer.get_feature_names_out()
+        return [
+            ", ".join([vocabulary[i] for i in topic.argsort()[:-6:-1]])
+            for topic in lda.components_
+        ]
+
+    def _fit_document(self, sentences: List[str]):
+        vectorizer = CountVectorizer()
+        sentence_vectors = vectorizer.fit_transform(sentences)
+        lda = LatentDirichletAllocation(n_components=self.num_topics, random_state=42)
+        lda.fit(sentence_vectors)
+        return vectorizer, lda, self._topic_labels(vectorizer, lda)
+
+    @staticmethod
+    def _label(model, sentences: List[str]) -> List[str]:
+        vectorizer, lda, topics = model
+        # One transform for all sentences instead of one per sentence
+        topic_ids = np.argmax(lda.transform(vectorizer.transform(sentences)), axis=1)
+        return [
+            f"Topic {topic_idx + 1}: {topics[topic_idx]} - {sentence}"
+            for topic_idx, sentence in zip(topic_ids, sentences)
+        ]
 
+    def chunk(self, text: str) -> List[str]:
+        """Chunk text based on topics using LDA."""
+        return self.chunk_batch([text])[0]
+
+    def chunk_batch(self, texts: List[str]) -> List[List[str]]:
+        """Chunk several texts; with a corpus-level model all their sentences share one transform."""
+        if any(not text.strip() for text in texts):
+            raise ChunkingException("Input text is empty or only contains whitespace.")
+        try:
+            documents = [text.split('. ') for text in texts]
+            model = self.load_model()
+            if model is None:
+                return [self._label(self._fit_document(sentences), sentences) for sentences in documents]
+
+            labelled = self._label(model, [sentence for sentences in documents for sentence in sentences])
+            chunks, start = [], 0
+            for sentences in documents:
+                chunks.append(labelled[start:start + len(sentences)])
+                start += len(sentences)
             return chunks
         except Exception as e:
             raise ChunkingException(f"Error during topic-based chunking: {e}")
@@ -310,12 +766,28 @@ class ContentAwareChunker(Chunker):
             "error": False
         }
 
+# Line boundaries exactly as str.splitlines draws them
+LINE_BREAK = re.compile("\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+# Below this many keywords, scanning for each one is faster than the automaton
+AUTOMATON_MIN_KEYWORDS = 32
+
+
+def _use_automaton(keywords: List[str], use_automaton: bool = None) -> bool:
+    return len(keywords or []) >= AUTOMATON_MIN_KEYWORDS if use_automaton is None else use_automaton
+
+
 class HierarchicalChunker(Chunker):
-    def __init__(self, section_keywords=None):
+    def __init__(self, section_keywords=None, use_automaton: bool = None):
         self.section_keywords = section_keywords or []
+        # Built once and reused for every document; None picks it for large keyword sets
+        self.automaton = KeywordAutomaton(self.section_keywords) if _use_automaton(self.section_keywords, use_automaton) else None
 
     def chunk(self, text: str) -> List[str]:
         # Implement the logic to split the text into sections based on section_keywords
+        if self.automaton is not None:
+            # One pass finds the first occurrence of every keyword
+            first = self.automaton.first_matches(text)
+            return [text[first[keyword][1]:] for keyword in self.section_keywords if keyword in first]
         chunks = []
         for keyword in self.section_keywords:
             if keyword in text:
@@ -335,16 +807,35 @@ class HierarchicalChunker(Chunker):
 
 
 class KeywordBasedChunker(Chunker):
-    def __init__(self,keywords: List[str] = None):
-       self.keywords = keywords      
+    def __init__(self,keywords: List[str] = None, use_automaton: bool = None):
+       self.keywords = keywords
+       # Built once and reused for every document; None picks it for large keyword sets
+       self.automaton = KeywordAutomaton(self.keywords) if _use_automaton(self.keywords, use_automaton) else None
+
+    def _keyword_lines(self, text: str) -> set:
+        """Indexes of the lines that contain a keyword, found in one pass over the text."""
+        line_ends = [match.start() for match in LINE_BREAK.finditer(text)]
+        lines = set()
+        for start, end, _ in self.automaton.iter_matches(text):
+            line = bisect.bisect_right(line_ends, start)
+            # A match running over a line break is not inside a single line
+            if line == len(line_ends) or end <= line_ends[line]:
+                lines.add(line)
+        return lines
+
     def chunk(self, text: str) -> List[str]:
         """Chunk text based on specific keywords."""
         if not text.strip():
             raise ChunkingException("Input text is empty or only contains whitespace.")
         
+        keyword_lines = self._keyword_lines(text) if self.automaton is not None else None
         chunks, current_chunk = [], []
-        for line in text.splitlines():
-            if any(keyword in line for keyword in self.keywords):
+        for i, line in enumerate(text.splitlines()):
+            if keyword_lines is not None:
+                is_keyword_line = i in keyword_lines
+            else:
+                is_keyword_line = any(keyword in line for keyword in self.keywords)
+            if is_keyword_line:
                 if current_chunk:
                     chunks.append('\n'.join(current_chunk))
                 current_chunk = [line]  # Start a new chunk with the keyword line
@@ -1,14 +1,9 @@
 from typing import Any, Dict, List
-from Services.Chunking import chunking
 from Services.Chunking.exception import ChunkingException
 from Services.Chunking.base import BaseChunker
-from Services.Chunking.chunking import (
-    Chunker, ContentAwareChunker, EntityChunker, HierarchicalChunker,
-    KeywordBasedChunker, OverlappingTokenChunker, PageChunker,
-    ParagraphChunker, SemanticChunker, SentenceChunker,
-    SpecificTokenChunker, TopicBasedChunker
-)
 from .main_factory import INode
+from .embedding_factory import EmbeddingFactory
+from .lazy_registry import LazyRegistry, provider
 import os
 import json
 
@@ -26,23 +21,40 @@ class ChunkingFactory(INode):
         self.overlap_tokens = int(self.overlap_tokens) if self.overlap_tokens is not None else None
         self.max_len = os.getenv("MAX_LEN", 0)
         self.max_len = int(self.max_len) if self.max_len is not None else None
+        # tiktoken encoding used by the "model tokens" strategies
+        self.token_encoding = os.getenv("TOKEN_ENCODING", "cl100k_base")
+        # Corpus-level topic model for "topic_based", built with `python -m Factory.fit_topic_model`;
+        # a model is fitted per document when the file does not exist
+        self.num_topics = int(os.getenv("NUM_TOPICS", 3))
+        self.topic_model_path = os.getenv("TOPIC_MODEL_PATH") or None
+        # "semantic_breakpoint" embeds sentences with this EmbeddingFactory service, or a local model when unset
+        self.semantic_embedding_type = (os.getenv("SEMANTIC_EMBEDDING_TYPE") or "").strip()
+        self.semantic_embedding_model = os.getenv("SEMANTIC_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+        self.breakpoint_percentile = float(os.getenv("SEMANTIC_BREAKPOINT_PERCENTILE", 95))
         section_keywords = ["Introduction", "Overview", "Methods", "Conclusion"]
         keywords = ["Introduction", "Overview", "Conclusion", "Methods", "Challenges"]
-        self.strategies
-        # Define chunking strategies
-        self.strategies = {
-            "paragraph": ParagraphChunker(),
-            "page": PageChunker(self.page_tokens),  # Conditional initialization
-            "sentence": SentenceChunker(),
-            "specific tokens": SpecificTokenChunker(self.max_tokens),
-            "specific tokens with overlap": OverlappingTokenChunker(self.max_tokens, self.overlap_tokens),
-            "entity": EntityChunker(),
-            "semantic": SemanticChunker(self.max_len),
-            "content_aware": ContentAwareChunker(),
-            "keyword_based": KeywordBasedChunker(keywords=keywords),
-            "topic_based": TopicBasedChunker(),
-            "hierarchical": HierarchicalChunker(section_keywords=section_keywords)
-        }
+        chunkers = "Services.Chunking.chunking"
+        # Define chunking strategies; each chunker is built the first time it is selected
+        self.strategies = LazyRegistry({
+            "paragraph": f"{chunkers}:ParagraphChunker",
+            "page": provider(f"{chunkers}:PageChunker", self.page_tokens),  # Conditional initialization
+            "sentence": f"{chunkers}:SentenceChunker",
+            "specific tokens": provider(f"{chunkers}:SpecificTokenChunker", self.max_tokens),
+            "specific tokens with overlap": provider(f"{chunkers}:OverlappingTokenChunker", self.max_tokens, self.overlap_tokens),
+            "model tokens": provider(f"{chunkers}:TiktokenChunker", self.max_tokens, 0, self.token_encoding),
+            "model tokens with overlap": provider(f"{chunkers}:TiktokenChunker", self.max_tokens, self.overlap_tokens, self.token_encoding),
+            "entity": f"{chunkers}:EntityChunker",
+            "semantic": provider(f"{chunkers}:SemanticChunker", self.max_len),
+            "semantic_breakpoint": provider(
+                f"{chunkers}:SemanticBreakpointChunker",
+                self.embed_sentences if self.semantic_embedding_type else None,
+                self.semantic_embedding_model, self.breakpoint_percentile, self.max_len
+            ),
+            "content_aware": f"{chunkers}:ContentAwareChunker",
+            "keyword_based": provider(f"{chunkers}:KeywordBasedChunker", keywords=keywords),
+            "topic_based": provider(f"{chunkers}:TopicBasedChunker", self.num_topics, self.topic_model_path),
+            "hierarchical": provider(f"{chunkers}:HierarchicalChunker", section_keywords=section_keywords)
+        })
 
       
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
@@ -61,7 +73,11 @@ class ChunkingFactory(INode):
         return chunking_service.validate_config(config)
 
 
-    def get_chunker(self, strategy: str) -> Chunker:
+    def embed_sentences(self, sentences: List[str]) -> List[List[float]]:
+        """Embed sentences with the EmbeddingFactory service named by SEMANTIC_EMBEDDING_TYPE."""
+        return EmbeddingFactory().get_embedding_service(self.semantic_embedding_type).generate_embeddings(sentences)
+
+    def get_chunker(self, strategy: str) -> BaseChunker:
         """Get the appropriate chunker based on the strategy."""
         chunker_factory = self.strategies.get(strategy)
         if not chunker_factory:
@@ -102,4 +118,29 @@ class ChunkingFactory(INode):
                 "error": True,
                 "message":str(e),
                
-            }
\ No newline at end of file
+            }
+
+    def process_batch(self, records: List[Dict]) -> List[Dict]:
+        """Chunk several records with one call to the chunker's batch method."""
+        chunker = self.get_chunker(self.chunking_strategy)
+        texts = [record.get("text", "").strip() for record in records]
+        batch_indexes = [i for i, text in enumerate(texts) if text]
+        try:
+            batch_chunks = chunker.chunk_batch([texts[i] for i in batch_indexes])
+        except Exception:
+            # Fall back to per-record calls so one bad document does not fail the batch
+            return [self.process_node(record) for record in records]
+
+        results = [{
+            "status": "failed",
+            "error": "Record text is empty or contains only whitespace.",
+        } for _ in records]
+        for i, chunks in zip(batch_indexes, batch_chunks):
+            updated_record = records[i].copy()
+            updated_record["chunks"] = chunks
+            results[i] = {
+                "status": "success",
+                "record": updated_record,
+                "error": None
+            }
+        return results
\ No newline at end of file
@@ -2,24 +2,21 @@ import os
 from typing import Dict, Any
 from dotenv import load_dotenv  # type: ignore # Import dotenv to load environment variables
 # from ..Connectors.sharepoint_connector import SharepointConnector
-from Services.Connectors.csv_connector import CsvConnector
-from Services.Connectors.iconnectorservice import IConnector
-from Services.Connectors.outlook_connector import OutlookConnector
-from Services.Connectors.sharepoint_connector import SharepointConnector
-from Services.Connectors.postgres_connector import PostgresConnector
 from Services.Connectors.iconnectorservice import IConnector
 import os
 from .main_factory import INode
+from .lazy_registry import LazyRegistry
 # Load environment variables from the .env file
 load_dotenv()
 
 class ConnectorFactory(INode):
-    _services= {
-            "sharepoint": SharepointConnector(),  # Initialize SharePoint connector,
-            "csv":CsvConnector(),
-            "postgres":PostgresConnector(),
-            "outlook":OutlookConnector()
-        }
+    # Connectors are imported and initialized only when first selected
+    _services= LazyRegistry({
+            "sharepoint": "Services.Connectors.sharepoint_connector:SharepointConnector",
+            "csv":"Services.Connectors.csv_connector:CsvConnector",
+            "postgres":"Services.Connectors.postgres_connector:PostgresConnector",
+            "outlook":"Services.Connectors.outlook_connector:OutlookConnector"
+        })
 
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -32,7 +29,7 @@ class ConnectorFactory(INode):
         """
         service_type:str = config['type']
         service_type = service_type.strip().lower()
-        extract_service: IConnector = ConnectorFactory()._services.get(service_type)
+        extract_service: IConnector = self._services.get(service_type)
         
         if not extract_service:
             return {
@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from Factory.checkpoint_store import record_source_id
+from Factory.main_factory import INode
+from Factory.pipeline_executor import SKIPPED_STATUS
+
+
+class DedupFactory(INode):
+    """
+    Drops records whose file content has already gone through the pipeline.
+
+    Meant to sit right after the connector, before text extraction. The first
+    record seen with a given content hash is the canonical one and continues
+    down the pipeline; later records with the same bytes under another path
+    are recorded as aliases of it and skipped, so their content is not
+    extracted, chunked or embedded again.
+
+    The canonical record carries its alias source ids in `aliases`, so the
+    search node can store them with its chunks (map `aliases` in
+    FIELD_DEFINITIONS). Duplicates that arrive while it is still in the
+    pipeline are added to that same list. The content mapping is only
+    written to the database once the canonical record has completed every
+    node, so a record that fails leaves no mapping behind; the next record
+    with the same content then becomes the canonical one.
+    """
+
+    def __init__(self):
+        self.db_path = os.getenv("DEDUP_DB_PATH", "dedup.db")
+        id_fields = os.getenv("DEDUP_ID_FIELDS", "")
+        self.id_fields = [field.strip() for field in id_fields.split(",") if field.strip()] or None
+        self._lock = threading.RLock()
+        self._conn = None
+        # Canonical records still in the pipeline: content hash -> source id, alias list and
+        # the duplicates skipped in this run while it was in flight
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS contents (content_hash TEXT PRIMARY KEY, source_id TEXT NOT NULL, first_seen REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS aliases (source_id TEXT PRIMARY KEY, content_hash TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "success",
+            "message": "Validation successful",
+            "error": False
+        }
+
+    @staticmethod
+    def content_hash(record: Dict[str, Any]) -> Optional[str]:
+        content = record.get("file_bytes")
+        if content is None:
+            content = record.get("text")
+        if content is None:
+            return None
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return hashlib.sha256(content).hexdigest()
+
+    def canonical_source(self, source_id: str) -> str:
+        """Source id whose chunks and vectors serve `source_id`, which is itself when it is not a duplicate."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT contents.source_id FROM aliases JOIN contents USING (content_hash) WHERE aliases.source_id = ?",
+                (source_id,),
+            ).fetchone()
+        return row[0] if row else source_id
+
+    def aliases_of(self, source_id: str) -> List[str]:
+        """Duplicate source ids linked to the canonical `source_id`."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT aliases.source_id FROM aliases JOIN contents USING (content_hash) WHERE contents.source_id = ?",
+                (source_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def process_node(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            content_hash = self.content_hash(record)
+            source_id = record_source_id(record, self.id_fields)
+            if content_hash is None or source_id is None:
+                # Nothing to hash or nothing to link duplicates to, let the record through untouched
+                return {
+                    "status": "success",
+                    "record": record,
+                    "error": None
+                }
+
+            updated_record = record.copy()
+            updated_record["content_hash"] = content_hash
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT source_id FROM contents WHERE content_hash = ?", (content_hash,)).fetchone()
+                in_flight = self._in_flight.get(content_hash)
+                canonical = row[0] if row else (in_flight["source_id"] if in_flight else source_id)
+
+                if canonical == source_id:
+                    if in_flight is None:
+                        in_flight = {"source_id": source_id, "aliases": self.aliases_of(source_id), "skipped": []}
+                        self._in_flight[content_hash] = in_flight
+                    # Shared with the in-flight entry, so duplicates seen later in this run are included
+                    updated_record["aliases"] = in_flight["aliases"]
+                elif row is not None and in_flight is None:
+                    # The canonical record is already indexed, the alias can be stored right away
+                    conn.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?)", (source_id, content_hash))
+                    conn.commit()
+                else:
+                    in_flight["skipped"].append(source_id)
+                    if source_id not in in_flight["aliases"]:
+                        in_flight["aliases"].append(source_id)
+
+            if canonical != source_id:
+                updated_record["duplicate_of"] = canonical
+                return {
+                    "status": SKIPPED_STATUS,
+                    "record": updated_record,
+                    "message": f"{source_id} has the same content as {canonical}",
+                    "error": None
+                }
+            return {
+                "status": "success",
+                "record": updated_record,
+                "error": None
+            }
+        except Exception as e:
+            return {
+                "status": "failed",
+                "error": True,
+                "message": str(e),
+            }
+
+    def on_record_complete(self, record: Dict[str, Any]):
+        """
+        Store the content mapping of a canonical record that made it through
+        every node, with the aliases collected while it was in flight. Any
+        mapping left from an earlier version of the same source is replaced.
+        """
+        content_hash = record.get("content_hash")
+        source_id = record_source_id(record, self.id_fields)
+        if content_hash is None or source_id is None:
+            return
+        with self._lock:
+            in_flight = self._in_flight.get(content_hash)
+            if in_flight is not None and in_flight["source_id"] != source_id:
+                return
+            self._in_flight.pop(content_hash, None)
+            aliases = in_flight["aliases"] if in_flight else record.get("aliases") or []
+            conn = self._connect()
+            # The source's content changed: its old content and that content's aliases are stale
+            conn.execute(
+                "DELETE FROM aliases WHERE content_hash IN (SELECT content_hash FROM contents WHERE source_id = ? AND content_hash != ?)",
+                (source_id, content_hash),
+            )
+            conn.execute("DELETE FROM contents WHERE source_id = ? AND content_hash != ?", (source_id, content_hash))
+            conn.execute("DELETE FROM aliases WHERE source_id = ?", (source_id,))
+            conn.execute("INSERT OR REPLACE INTO contents VALUES (?, ?, ?)", (content_hash, source_id, time.time()))
+            conn.executemany(
+                "INSERT OR REPLACE INTO aliases VALUES (?, ?)",
+                [(alias, content_hash) for alias in aliases if alias != source_id],
+            )
+            conn.commit()
+
+    def on_record_dropped(self, record: Dict[str, Any]):
+        """
+        Release the in-flight entry of a canonical record that failed or was
+        skipped further down, so later records with the same content are
+        processed instead of being skipped as duplicates of content that was
+        never indexed.
+        """
+        content_hash = record.get("content_hash")
+        source_id = record_source_id(record, self.id_fields)
+        if content_hash is None or source_id is None:
+            return
+        with self._lock:
+            in_flight = self._in_flight.get(content_hash)
+            if in_flight is None or in_flight["source_id"] != source_id:
+                return
+            del self._in_flight[content_hash]
+        if in_flight["skipped"]:
+            logging.warning(
+                f"{source_id} did not complete; {len(in_flight['skipped'])} duplicates skipped while it was in flight "
+                f"need to be processed again: {', '.join(in_flight['skipped'])}"
+            )
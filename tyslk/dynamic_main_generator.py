@@ -27,6 +27,11 @@ class MainFileGenerator:
                 "type": node.get("type"),
                 "service": node.get("service")
             }
+            # Worker count is only used by the staged execution mode, concurrency by the async mode,
+            # batch size by both; cpu_bound/processes move the node into a process pool
+            for key in ("workers", "batch_size", "concurrency", "cpu_bound", "processes"):
+                if node.get(key):
+                    cleaned_node[key] = node[key]
             cleaned_nodes.append(cleaned_node)
         config["nodes"] = cleaned_nodes
         return config
@@ -35,8 +40,10 @@ class MainFileGenerator:
         """Extract required imports from the config."""
         imports = {
             "connectors": "from Factory.connector_factory import ConnectorFactory",
+            "dedup": "from Factory.dedup_factory import DedupFactory",
             "text_extraction": "from Factory.text_extract_factory import TextExtractionFactory",
             "chunking": "from Factory.chunking_factory import ChunkingFactory",
+            "chunk_dedup": "from Factory.chunk_dedup_factory import ChunkDedupFactory",
             "summarization":"from Factory.summarization_factory  import SummarizationFactory",
             "embeddings": "from Factory.embedding_factory import EmbeddingFactory",
             "search":"from Factory.search_factory import SearchFactory"
@@ -62,6 +69,11 @@ class MainFileGenerator:
 import logging
 
 {import_statements}
+from Factory.pipeline_executor import create_executor
+from Factory.checkpoint_store import CheckpointStore
+from Factory.pipeline_metrics import PipelineMetrics
+from Factory.process_pool_node import ProcessPoolNode, node_path
+from Factory.pipeline_record import PipelineRecord
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -71,6 +83,62 @@ class Pipeline:
         self.node_registry = {{
             {node_registry}
         }}
+        execution = config.get("execution", {{}})
+        nodes = []
+        self.process_nodes = []
+        for node_config in self.config["nodes"][1:]:
+            node = self._create_node(node_config["service"])
+            workers = node_config.get("workers", 1)
+            if node_config.get("cpu_bound"):
+                # CPU-bound nodes run in worker processes, each with its own loaded models
+                node = ProcessPoolNode(node_path(node), node_config.get("processes"))
+                self.process_nodes.append(node)
+                workers = node_config.get("workers", node.processes)
+            nodes.append({{
+                "node_type": node_config["service"],
+                "node": node,
+                "workers": workers,
+                "batch_size": node_config.get("batch_size", 1),
+                "concurrency": node_config.get("concurrency", execution.get("max_in_flight", 100)),
+            }})
+        # Optional checkpoint store so a restarted run skips work that is already done
+        self.checkpoints = None
+        checkpoint = config.get("checkpoint")
+        if checkpoint:
+            self.checkpoints = CheckpointStore(
+                checkpoint.get("path", "pipeline_checkpoints.db"),
+                [node["node_type"] for node in nodes],
+                checkpoint.get("id_fields"),
+            )
+        # Per-node counters and timings, optionally served on a local port
+        self.metrics = PipelineMetrics()
+        self.metrics_config = config.get("metrics", {{}})
+        if self.metrics_config.get("port"):
+            self.metrics.serve(int(self.metrics_config["port"]))
+        # "sequential" (default) runs each record through all nodes before the next one,
+        # "staged" gives every node its own worker pool and a bounded queue,
+        # "async" interleaves many records on one event loop with per-node concurrency limits
+        self.nodes = nodes
+        self.executor = create_executor(
+            nodes,
+            execution,
+            self._node_complete,
+            self.metrics,
+            self._record_dropped,
+        )
+
+    def _node_complete(self, node_index, node_type, record):
+        if self.checkpoints is not None:
+            self.checkpoints.save(node_index, node_type, record)
+        if node_index == len(self.nodes) - 1:
+            # Let nodes that track records across the run, e.g. dedup, know this one made it through
+            for node in self.nodes:
+                node["node"].on_record_complete(record)
+
+    def _record_dropped(self, node_index, node_type, record):
+        # Nodes that hold state for this record until it completes can release it now
+        for node in self.nodes:
+            node["node"].on_record_dropped(record)
 
     def _create_node(self, node_type):
         if node_type not in self.node_registry:
@@ -78,21 +146,30 @@ class Pipeline:
         return self.node_registry[node_type]
 
     def process_record(self, record):
-        for node_config in self.config["nodes"][1:]:
-            node_type = node_config["service"]
-            print("calling node : ",node_type)
-            node_instance = self._create_node(node_type)
-            result = node_instance.process_node(record)
-            if "error" in result and result.get("error"):
-                logging.error(f"Error processing record at node {{node_type}}: {{result['message']}}")
-                break
-            record = result.get('record')
-        print(record)
+        start_index = 0
+        if self.checkpoints is not None:
+            resumed = self.checkpoints.resume(record)
+            if resumed is None:
+                logging.info(f"Skipping already processed record: {{self.checkpoints.source_id(record)}}")
+                return
+            start_index, record = resumed
+        # Share the file content between node copies and release it after extraction
+        self.executor.submit(PipelineRecord.wrap(record), start_index)
         
 
     def run(self):
         connector = ConnectorFactory()
-        out=connector.process_node(self)
+        try:
+            out=connector.process_node(self)
+        finally:
+            self.executor.close()
+            for node in self.process_nodes:
+                node.close()
+            if self.checkpoints is not None:
+                self.checkpoints.close()
+            # Metrics files are only written where the config asks for them
+            self.metrics.write(self.metrics_config.get("prometheus_path"), self.metrics_config.get("json_path"))
+            self.metrics.close()
 
 if __name__ == "__main__":
     config = {config_str}
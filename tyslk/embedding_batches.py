@@ -0,0 +1,87 @@
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Vector = List[float]
+
+
+def token_counter(encoding_name: str = "cl100k_base") -> Callable[[str], int]:
+    """
+    Token count function for packing requests: tiktoken when the encoding can
+    be loaded, otherwise an estimate that errs on the high side.
+    """
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(encoding_name)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        logger.warning("tiktoken encoding %s unavailable (%s), estimating token counts", encoding_name, e)
+        return lambda text: len(text) // 3 + 1
+
+
+def pack_batches(texts: Sequence[str], count_tokens: Callable[[str], int], max_items: int, max_tokens: int) -> List[List[int]]:
+    """
+    Group text indexes, in order, into batches of at most `max_items` texts and
+    `max_tokens` tokens. A text over the token budget on its own gets a batch of its own.
+    """
+    batches, batch, batch_tokens = [], [], 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def embed_in_batches(embed: Callable[[List[str]], List[Vector]], texts: Sequence[str], batches: List[List[int]]) -> Tuple[List[Optional[Vector]], Dict[int, str]]:
+    """
+    Call `embed` once per batch and put the vectors back in input order.
+
+    A failed batch is split in half and retried until the failing texts are
+    isolated, so one bad input only costs its own embedding. After a run of
+    failures with no success in between (an outage or bad credentials rather
+    than a bad input) the remaining batches are not sent.
+
+    Returns the vectors, None where a text failed, and the error per failed index.
+    """
+    vectors: List[Optional[Vector]] = [None] * len(texts)
+    errors: Dict[int, str] = {}
+    if not batches:
+        return vectors, errors
+    # Isolating one bad text in the largest batch takes this many failed requests in a row
+    max_consecutive_failures = max(len(batch) for batch in batches).bit_length() + 2
+    consecutive_failures = 0
+    fatal_error = None
+    pending = list(reversed(batches))
+    while pending:
+        batch = pending.pop()
+        if fatal_error is not None:
+            errors.update((i, fatal_error) for i in batch)
+            continue
+        try:
+            batch_vectors = embed([texts[i] for i in batch])
+            if len(batch_vectors) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(batch_vectors)}")
+        except Exception as e:
+            consecutive_failures += 1
+            if len(batch) == 1:
+                errors[batch[0]] = str(e)
+            else:
+                middle = len(batch) // 2
+                pending.append(batch[middle:])
+                pending.append(batch[:middle])
+            if consecutive_failures >= max_consecutive_failures:
+                logger.error("Embedding requests keep failing, giving up on the remaining texts: %s", e)
+                fatal_error = str(e)
+            continue
+        consecutive_failures = 0
+        for i, vector in zip(batch, batch_vectors):
+            vectors[i] = vector
+    if errors:
+        logger.warning("%d of %d texts could not be embedded", len(errors), len(texts))
+    return vectors, errors
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import List, Optional, Sequence
+
+
+class EmbeddingCache:
+    """
+    On-disk cache of embeddings keyed by model, dimensions and a hash of the
+    text, so re-running ingestion over unchanged text does not call the
+    embedding API again. Backed by SQLite; safe to share between threads.
+
+    Off unless a path is given or EMBEDDING_CACHE_PATH is set.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path if path is not None else os.getenv("EMBEDDING_CACHE_PATH", "")
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    @property
+    def enabled(self) -> bool:
+        # No path, e.g. EMBEDDING_CACHE_PATH unset, means no cache
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not be used across fork, worker processes open their own
+        if self._conn is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def key(model: str, dimensions, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{dimensions or ''}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, dimensions, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vector for each text, None where there is none."""
+        if not self.enabled or not texts:
+            return [None] * len(texts)
+        keys = [self.key(model, dimensions, text) for text in texts]
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            # Stay under SQLite's limit on bound parameters
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update(rows)
+        return [array("d", found[key]).tolist() if key in found else None for key in keys]
+
+    def put_many(self, model: str, dimensions, texts: Sequence[str], vectors: Sequence[Optional[List[float]]]):
+        """Store vectors for texts; None vectors are skipped."""
+        if not self.enabled:
+            return
+        now = time.time()
+        rows = [
+            (self.key(model, dimensions, text), array("d", vector).tobytes(), now)
+            for text, vector in zip(texts, vectors) if vector is not None
+        ]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            conn.commit()
+
+    def get(self, model: str, dimensions, text: str) -> Optional[List[float]]:
+        return self.get_many(model, dimensions, [text])[0]
+
+    def put(self, model: str, dimensions, text: str, vector: List[float]):
+        self.put_many(model, dimensions, [text], [vector])
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,10 +1,9 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from Factory.main_factory import INode
+from Factory.lazy_registry import LazyRegistry
+from Factory.embedding_batches import embed_in_batches, pack_batches, token_counter
+from Factory.embedding_cache import EmbeddingCache
 from Services.Embeddings.IEmbedding_service import IEmbeddingService
-from Services.Embeddings.gcp_embedding_service import GcpEmbeddingService
-from Services.Embeddings.azure_embedding_service import AzureEmbeddingService
-from Services.Embeddings.aws_embedding_service import AwsEmbeddingService
-from Services.Embeddings.opensource_embedding_service import OpensourceEmbeddingService
 
  # type: ignore 
 import os
@@ -15,13 +14,47 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class EmbeddingFactory(INode):
-    # Mapping of service type to the corresponding embedding service class
-    service_type = {
-        "gcp": GcpEmbeddingService(),
-        "azure": AzureEmbeddingService(),
-        "aws": AwsEmbeddingService(),
-        "opensource": OpensourceEmbeddingService()
+    # Mapping of service type to the corresponding embedding service class,
+    # imported and instantiated the first time a config selects it
+    service_type = LazyRegistry({
+        "gcp": "Services.Embeddings.gcp_embedding_service:GcpEmbeddingService",
+        "azure": "Services.Embeddings.azure_embedding_service:AzureEmbeddingService",
+        "aws": "Services.Embeddings.aws_embedding_service:AwsEmbeddingService",
+        "opensource": "Services.Embeddings.opensource_embedding_service:OpensourceEmbeddingService"
+    })
+    # Default (inputs, tokens) per request for each service;
+    # EMBEDDING_MAX_BATCH_ITEMS / EMBEDDING_MAX_BATCH_TOKENS override them
+    batch_limits = {
+        "gcp": (250, 20000),
+        "azure": (2048, 300000),
+        "aws": (1, 8192),
+        "opensource": (64, 32768)
     }
+    default_batch_limits = (2048, 300000)
+    _count_tokens = None
+
+    def __init__(self):
+        # Embeddings already computed for identical text, checked before calling a service.
+        # Opt-in through EMBEDDING_CACHE_PATH
+        self.embedding_cache = EmbeddingCache()
+
+    def cache_model(self, service_type: str, embedding_service: IEmbeddingService) -> Optional[str]:
+        """
+        Cache key prefix naming the vectors a service produces: what its
+        `cache_identity()` reports (model, dimensions and anything else that
+        changes the output), or EMBEDDING_CACHE_NAMESPACE for services that do
+        not report it. None, and so no caching, when neither is available.
+        """
+        identity = getattr(embedding_service, "cache_identity", None)
+        identity = identity() if identity is not None else os.getenv("EMBEDDING_CACHE_NAMESPACE")
+        return f"{service_type}:{identity}" if identity else None
+
+    def get_batch_limits(self, service_type: str):
+        max_items, max_tokens = self.batch_limits.get(service_type, self.default_batch_limits)
+        return (
+            int(os.getenv("EMBEDDING_MAX_BATCH_ITEMS", max_items)),
+            int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", max_tokens))
+        )
 
     def get_embedding_service(self, service_type: str) -> IEmbeddingService:
         # Retrieve the service class from the dictionary, or raise an error if not found
@@ -49,34 +82,83 @@ class EmbeddingFactory(INode):
         return embedding_service.validate_config(config)
     
     def process_node(self, record: dict):
+        return self.process_batch([record])[0]
+
+    def process_batch(self, records: List[dict]) -> List[dict]:
+        """
+        Embed the chunks of several records in as few service calls as the
+        service's per-request limits allow and split the embeddings back out
+        per record, in order. Chunks that fail are dropped from their record
+        and listed in `failed_chunks`; a record only fails when none of its
+        chunks could be embedded.
+        """
         # Choose service type from environment 
-        service_type = os.getenv("EMBEDDING_TYPE").strip()
+        service_type = (os.getenv("EMBEDDING_TYPE") or "").strip()
         if not service_type:
-            return {
+            return [{
                 "status": "error",
                 "message": "Environment variable EMBEDDING_TYPE  is missing",
                 "error": True
-            }
+            } for _ in records]
         print("embedding node is starting")
 
         embedding_service = self.get_embedding_service(service_type)
-        chunks = record.get('chunks')
-  
+        chunk_lists = [record.get('chunks') or [] for record in records]
+        all_chunks = [chunk for chunks in chunk_lists for chunk in chunks]
+
         try:
-        # Generate embeddings with the chosen service
-            embeddings=embedding_service.generate_embeddings(chunks)
-        # Combine embeddings with metadata
-            updated_record = record.copy()
-            updated_record["embeddings"] = embeddings
-            return {
-                "status": "success",
-                "record": updated_record,
-                "error": None
-            }
+            # The cache key covers the service and the model and vector size it actually uses
+            model = self.cache_model(service_type, embedding_service)
+            cache = self.embedding_cache if model is not None else None
+            embeddings = cache.get_many(model, None, all_chunks) if cache else [None] * len(all_chunks)
+            missing = list(dict.fromkeys(chunk for chunk, embedding in zip(all_chunks, embeddings) if embedding is None))
+
+            if EmbeddingFactory._count_tokens is None:
+                EmbeddingFactory._count_tokens = token_counter()
+            max_items, max_tokens = self.get_batch_limits(service_type)
+            # Pack the uncached chunks of every record into token-budgeted requests
+            batches = pack_batches(missing, EmbeddingFactory._count_tokens, max_items, max_tokens)
+            new_embeddings, missing_errors = embed_in_batches(embedding_service.generate_embeddings, missing, batches)
+            if cache:
+                cache.put_many(model, None, missing, new_embeddings)
 
+            by_text = dict(zip(missing, new_embeddings))
+            errors_by_text = {missing[i]: error for i, error in missing_errors.items()}
+            embeddings = [embedding if embedding is not None else by_text.get(chunk) for chunk, embedding in zip(all_chunks, embeddings)]
+            errors = {i: errors_by_text[chunk] for i, chunk in enumerate(all_chunks) if chunk in errors_by_text}
         except Exception as e:
-            return {
+            return [{
                 "status": "failed",
                 "error": str(e),
-            }
+            } for _ in records]
 
+        # Combine embeddings with metadata
+        results = []
+        offset = 0
+        for record, chunks in zip(records, chunk_lists):
+            failed = [
+                {"index": i, "error": errors[offset + i]}
+                for i in range(len(chunks)) if offset + i in errors
+            ]
+            kept = [i for i in range(len(chunks)) if offset + i not in errors]
+            record_embeddings = [embeddings[offset + i] for i in kept]
+            offset += len(chunks)
+            if chunks and not kept:
+                results.append({
+                    "status": "failed",
+                    "error": failed[0]["error"],
+                })
+                continue
+
+            updated_record = record.copy()
+            if failed:
+                logger.warning(f"{len(failed)} of {len(chunks)} chunks could not be embedded and were dropped")
+                updated_record["chunks"] = [chunks[i] for i in kept]
+                updated_record["failed_chunks"] = failed
+            updated_record["embeddings"] = record_embeddings
+            results.append({
+                "status": "success",
+                "record": updated_record,
+                "error": None
+            })
+        return results
@@ -1,27 +1,84 @@
 from openai import AzureOpenAI
 import os
 import logging
+from typing import List, Optional
 from dotenv import load_dotenv
+from embedding_batches import embed_in_batches, pack_batches, token_counter
+from embedding_cache import EmbeddingCache
 load_dotenv()
 # Load environment variables
 AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 EMBEDDING_API_VERSION = os.getenv("AZURE_OPENAI_EMBEDDING_API_VERSION")
+EMBEDDING_MODEL = "text-embedding-ada-002"
+# Per-request limits of the embeddings endpoint
+EMBEDDING_MAX_BATCH_ITEMS = int(os.getenv("EMBEDDING_MAX_BATCH_ITEMS", 2048))
+EMBEDDING_MAX_BATCH_TOKENS = int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", 300000))
 
-class GetEmbeddings():
-    def __init__(self):
-        self.client = AzureOpenAI(
+# One client per process; it keeps its HTTP connections open between requests
+_client = None
+_count_tokens = None
+# Embeddings already computed for identical text, checked before every API call
+embedding_cache = EmbeddingCache()
+
+
+def get_client() -> AzureOpenAI:
+    global _client
+    if _client is None:
+        _client = AzureOpenAI(
             api_key=AZURE_OPENAI_KEY,
             api_version=EMBEDDING_API_VERSION,
             azure_endpoint=AZURE_OPENAI_ENDPOINT,
-            azure_deployment="text-embedding-ada-002"
+            azure_deployment=EMBEDDING_MODEL
+        )
+    return _client
+
+
+class GetEmbeddings():
+    def __init__(self):
+        self.client = get_client()
+
+    def _embed_request(self, chunks: List[str]) -> List[List[float]]:
+        response = self.client.embeddings.create(input=chunks, model=EMBEDDING_MODEL)
+        # The API may return items out of order; `index` is their position in the input
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def generate_embeddings_batch(self, chunks: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed many chunks with as few requests as the endpoint's input count and
+        token limits allow. Results are in input order, with None for chunks
+        that could not be embedded; the other chunks are unaffected.
+        """
+        global _count_tokens
+        embeddings = embedding_cache.get_many(EMBEDDING_MODEL, None, chunks)
+        # Only send text that is not cached, and each distinct text once
+        missing = list(dict.fromkeys(chunk for chunk, embedding in zip(chunks, embeddings) if embedding is None))
+        if not missing:
+            return embeddings
+
+        if _count_tokens is None:
+            _count_tokens = token_counter()
+        batches = pack_batches(missing, _count_tokens, EMBEDDING_MAX_BATCH_ITEMS, EMBEDDING_MAX_BATCH_TOKENS)
+        new_embeddings, errors = embed_in_batches(self._embed_request, missing, batches)
+        embedding_cache.put_many(EMBEDDING_MODEL, None, missing, new_embeddings)
+        for index, error in errors.items():
+            logging.error(f"Error generating embeddings for chunk {missing[index]!r:.80}: {error}")
+        logging.info(
+            f"Embedded {len(missing) - len(errors)} of {len(missing)} uncached chunks in {len(batches)} batches, "
+            f"{sum(embedding is not None for embedding in embeddings)} chunks served from the cache"
         )
+        by_text = dict(zip(missing, new_embeddings))
+        return [embedding if embedding is not None else by_text.get(chunk) for chunk, embedding in zip(chunks, embeddings)]
 
     def generate_embeddings(self, chunk):
+        cached = embedding_cache.get(EMBEDDING_MODEL, None, chunk)
+        if cached is not None:
+            return cached
         try:
-            response = self.client.embeddings.create(input=[chunk], model="text-embedding-ada-002")
+            response = self.client.embeddings.create(input=[chunk], model=EMBEDDING_MODEL)
             # logging.info("Response: %s", response.data)
             logging.info("Embedding generated successfully..!!")
+            embedding_cache.put(EMBEDDING_MODEL, None, chunk, response.data[0].embedding)
             return response.data[0].embedding
         except Exception as e:
             print(f"Error generating embeddings: {e}")
@@ -0,0 +1,61 @@
+"""
+Fit the corpus-level topic model used by the "topic_based" chunking strategy.
+
+TopicBasedChunker fits a small LDA model per document unless TOPIC_MODEL_PATH
+points at a saved corpus-level model. This fits one on every .txt/.md file
+under --corpus-dir and saves it there, so every document and worker process
+labels sentences with the same topics. Re-run it when the corpus changes.
+
+Example:
+    python -m Factory.fit_topic_model --corpus-dir ./samples --model-path ./topic_model.joblib --num-topics 8
+
+The defaults come from the same NUM_TOPICS and TOPIC_MODEL_PATH variables
+ChunkingFactory reads.
+"""
+import argparse
+import os
+from typing import Iterator, List
+
+from Services.Chunking.chunking import TopicBasedChunker
+
+CORPUS_EXTENSIONS = (".txt", ".md")
+
+
+def iter_corpus(corpus_dir: str) -> Iterator[str]:
+    """Text of every corpus file under `corpus_dir`, read one file at a time."""
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            if name.lower().endswith(CORPUS_EXTENSIONS):
+                with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+                    yield f.read()
+
+
+def fit_topic_model(corpus_dir: str, model_path: str, num_topics: int = 3, max_features: int = 20000) -> List[str]:
+    """Fit and save the model; returns the top words of each topic."""
+    if not any(True for _ in iter_corpus(corpus_dir)):
+        raise SystemExit(f"No {', '.join(CORPUS_EXTENSIONS)} files found under {corpus_dir}")
+    chunker = TopicBasedChunker(num_topics, model_path, max_features)
+    chunker.fit(iter_corpus(corpus_dir))
+    return chunker.load_model()[2]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Fit and save the corpus-level topic model for topic_based chunking.")
+    parser.add_argument("--corpus-dir", required=True, help="Directory of .txt/.md files to fit on.")
+    parser.add_argument("--model-path", default=os.getenv("TOPIC_MODEL_PATH"),
+                        help="Where to save the model; TOPIC_MODEL_PATH by default.")
+    parser.add_argument("--num-topics", type=int, default=int(os.getenv("NUM_TOPICS", 3)))
+    parser.add_argument("--max-features", type=int, default=20000, help="Vocabulary size of the vectorizer.")
+    args = parser.parse_args(argv)
+    if not args.model_path:
+        parser.error("--model-path is required when TOPIC_MODEL_PATH is not set")
+
+    topics = fit_topic_model(args.corpus_dir, args.model_path, args.num_topics, args.max_features)
+    for i, topic in enumerate(topics, 1):
+        print(f"Topic {i}: {topic}")
+    print(f"Saved topic model to {args.model_path}")
+    return topics
+
+
+if __name__ == "__main__":
+    main()
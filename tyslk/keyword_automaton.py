@@ -0,0 +1,85 @@
+from collections import deque
+from typing import Dict, Iterator, List, Tuple
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton that finds every occurrence of a set of keywords
+    in one pass over the text, however many keywords there are.
+
+    The automaton is built once and reused for every text. pyahocorasick is
+    used when it is installed; otherwise a pure-Python automaton is built.
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = [keyword for keyword in dict.fromkeys(keywords or []) if keyword]
+        self._native = None
+        try:
+            import ahocorasick
+            self._native = ahocorasick.Automaton()
+            for index, keyword in enumerate(self.keywords):
+                self._native.add_word(keyword, index)
+            if self.keywords:
+                self._native.make_automaton()
+        except ImportError:
+            self._build()
+
+    def _build(self):
+        # Trie transitions, failure links and the keywords ending at each state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(index)
+
+        # Breadth-first, so a state's failure target is always final before its children need it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, keyword) for every occurrence, overlapping ones included, ordered by end."""
+        if not self.keywords:
+            return
+        if self._native is not None:
+            for last, index in self._native.iter(text):
+                keyword = self.keywords[index]
+                yield last + 1 - len(keyword), last + 1, keyword
+            return
+
+        goto, fail, out, keywords = self._goto, self._fail, self._out, self.keywords
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                keyword = keywords[index]
+                yield position + 1 - len(keyword), position + 1, keyword
+
+    def first_matches(self, text: str) -> Dict[str, Tuple[int, int]]:
+        """(start, end) of the first occurrence of each keyword found in `text`."""
+        first = {}
+        for start, end, keyword in self.iter_matches(text):
+            if keyword not in first:
+                first[keyword] = (start, end)
+                if len(first) == len(self.keywords):
+                    break
+        return first
@@ -0,0 +1,74 @@
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+
+def load_class(path: str) -> Any:
+    """Import `module.path:ClassName` and return the attribute."""
+    module_name, _, attr = path.partition(":")
+    if not attr:
+        raise ValueError(f"Provider path must look like 'module:ClassName', got: {path}")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def provider(path: str, *args, **kwargs) -> Callable[[], Any]:
+    """Build a factory that imports `path` and instantiates it with the given arguments."""
+    def create():
+        return load_class(path)(*args, **kwargs)
+    return create
+
+
+class LazyRegistry:
+    """
+    Name-to-provider mapping that imports and instantiates a provider only
+    when it is first looked up, then reuses that instance.
+
+    Entries are either `module:ClassName` strings, instantiated without
+    arguments, or zero-argument callables (see `provider`). It supports the
+    `get`, `in` and `[]` lookups the factories already use on plain dicts.
+    """
+
+    def __init__(self, specs: Dict[str, Union[str, Callable[[], Any]]]):
+        self._specs = dict(specs)
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, spec: Union[str, Callable[[], Any]]):
+        """Add or replace a provider; any instance already created for `name` is dropped."""
+        with self._lock:
+            self._specs[name] = spec
+            self._instances.pop(name, None)
+
+    def get(self, name: Optional[str], default: Any = None) -> Any:
+        if name not in self._specs:
+            return default
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    spec = self._specs[name]
+                    instance = load_class(spec)() if isinstance(spec, str) else spec()
+                    self._instances[name] = instance
+        return instance
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._specs:
+            raise KeyError(name)
+        return self.get(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def keys(self):
+        return self._specs.keys()
+
+    def loaded(self) -> Dict[str, Any]:
+        """Providers that have been instantiated so far."""
+        return dict(self._instances)
@@ -29,6 +29,7 @@ def chatbot_indexation_from_directory(directory_path):
             # If the index does not exist, create it
         azure_index.createIndex(AZURE_SERVICE_ENDPOINT, AZURE_SEARCH_KEY, AZURE_SEARCH_INDEX)
 
+        embedding = GetEmbeddings()
         # Iterate through all files in the directory
         for root, _, files in os.walk(directory_path):
             for file_name in files:
@@ -45,20 +46,21 @@ def chatbot_indexation_from_directory(directory_path):
                     file_extension = document_process.get_file_extension(file_name)
                     chunks = document_process.process_file(file_content, file_extension)
                     print(chunks)
+                    # Generate embeddings for all chunks of the file in batched requests
+                    vectors = embedding.generate_embeddings_batch(chunks)
                     # Index the chunks
-                    for chunk_number, chunk in enumerate(chunks, 1):
+                    for chunk_number, (chunk, vector) in enumerate(zip(chunks, vectors), 1):
+                        if vector is None:
+                            logging.error(f"Skipping chunk {chunk_number} of '{file_name}', it could not be embedded")
+                            continue
                         document = {
                             "id": str(uuid.uuid4()),  # Generate unique ID
                             "content": chunk,
-                            "contentVector": [],  # Placeholder for embeddings
+                            "contentVector": vector,
                             "file_name": file_name,
                             "page_number": chunk_number
                         }
 
-                        embedding = GetEmbeddings()
-                        # Generate embeddings for the chunk
-                        document['contentVector'] = embedding.generate_embeddings(chunk)
-
                         # Index document
                         try:
                             azure_index.index_document_to_azure_search(
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 class INode(ABC):
     @abstractmethod
@@ -7,3 +8,25 @@ class INode(ABC):
         Standard method to process a record.
         """
         pass
+
+    def process_batch(self, records: List[dict]) -> List[dict]:
+        """
+        Process several records at once, returning one result per record in order.
+        Nodes that can amortize network calls override this; the default
+        falls back to calling `process_node` for each record.
+        """
+        return [self.process_node(record) for record in records]
+
+    def on_record_complete(self, record: dict):
+        """
+        Called with the final record once it has gone through every node.
+        Nodes that keep state about in-flight records, such as dedup, override this.
+        """
+        pass
+
+    def on_record_dropped(self, record: dict):
+        """
+        Called with the record as it was handed to a node that failed or skipped it,
+        so it will not reach the end of the pipeline. The counterpart of `on_record_complete`.
+        """
+        pass
@@ -0,0 +1,122 @@
+import os
+import threading
+import logging
+from typing import Any, Dict, List
+from dotenv import load_dotenv
+from Services.Embeddings.IEmbedding_service import IEmbeddingService
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+class OpensourceEmbeddingService(IEmbeddingService):
+    """
+    Local sentence-transformer embeddings on CPU, with no network calls once
+    the model is on disk. Works offline for air-gapped tenants and gives
+    benchmarks a deterministic embedding source with real compute cost.
+
+    Environment variables:
+        OPENSOURCE_EMBEDDING_MODEL       model name or local path
+        OPENSOURCE_EMBEDDING_BACKEND     "torch", "onnx" or "openvino"
+        OPENSOURCE_EMBEDDING_FILE        model file for onnx/openvino, e.g. a quantized "onnx/model_qint8_avx512.onnx"
+        OPENSOURCE_EMBEDDING_QUANTIZE    "true" to quantize the torch model's linear layers to int8
+        OPENSOURCE_EMBEDDING_BATCH_SIZE  inputs per forward pass
+        OPENSOURCE_EMBEDDING_MAX_TOKENS  longer inputs are truncated to this many tokens
+        OPENSOURCE_EMBEDDING_THREADS     CPU threads used for inference, all cores by default
+        OPENSOURCE_EMBEDDING_NORMALIZE   "false" to keep vectors unnormalized
+    """
+
+    def __init__(self):
+        self.model_name = os.getenv("OPENSOURCE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        self.backend = os.getenv("OPENSOURCE_EMBEDDING_BACKEND", "torch").strip().lower()
+        self.model_file = os.getenv("OPENSOURCE_EMBEDDING_FILE")
+        self.quantize = os.getenv("OPENSOURCE_EMBEDDING_QUANTIZE", "false").strip().lower() == "true"
+        self.batch_size = int(os.getenv("OPENSOURCE_EMBEDDING_BATCH_SIZE", 32))
+        self.max_tokens = int(os.getenv("OPENSOURCE_EMBEDDING_MAX_TOKENS", 256))
+        self.threads = int(os.getenv("OPENSOURCE_EMBEDDING_THREADS", os.cpu_count() or 1))
+        self.normalize = os.getenv("OPENSOURCE_EMBEDDING_NORMALIZE", "true").strip().lower() != "false"
+        self._model = None
+        self._lock = threading.Lock()
+
+    def cache_identity(self) -> str:
+        """Everything that changes the vectors this service returns, for the embedding cache key."""
+        return (
+            f"{self.model_name}|backend={self.backend}|file={self.model_file or ''}|quantize={self.quantize}"
+            f"|max_tokens={self.max_tokens}|normalize={self.normalize}"
+        )
+
+    def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Check the backend is supported and its packages are installed."""
+        if self.backend not in ("torch", "onnx", "openvino"):
+            return {
+                "status": "error",
+                "message": f"Unsupported OPENSOURCE_EMBEDDING_BACKEND: {self.backend}",
+                "error": True
+            }
+        try:
+            import sentence_transformers  # noqa: F401
+            if self.backend == "onnx":
+                import onnxruntime  # noqa: F401
+        except ImportError as e:
+            return {
+                "status": "error",
+                "message": f"Missing package for open source embeddings: {e}",
+                "error": True
+            }
+        return {
+            "status": "success",
+            "message": "Open source embedding configuration validated successfully",
+            "error": False
+        }
+
+    def _load_model(self):
+        from sentence_transformers import SentenceTransformer
+        import torch
+
+        torch.set_num_threads(self.threads)
+        model_kwargs = {}
+        if self.model_file:
+            model_kwargs["file_name"] = self.model_file
+        if self.backend == "onnx":
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = self.threads
+            model_kwargs["session_options"] = session_options
+            model_kwargs["provider"] = "CPUExecutionProvider"
+
+        if self.backend == "torch":
+            model = SentenceTransformer(self.model_name, device="cpu")
+        else:
+            model = SentenceTransformer(self.model_name, device="cpu", backend=self.backend, model_kwargs=model_kwargs)
+        if self.quantize and self.backend == "torch":
+            # Dynamic int8 quantization of the linear layers, where CPU inference spends its time
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.max_seq_length = min(self.max_tokens, model.max_seq_length or self.max_tokens)
+        model.eval()
+        logger.info(
+            "Loaded embedding model %s (backend=%s, file=%s, quantized=%s, threads=%d, max tokens=%d)",
+            self.model_name, self.backend, self.model_file, self.quantize, self.threads, model.max_seq_length
+        )
+        return model
+
+    @property
+    def model(self):
+        # Loaded on first use so registering the service costs nothing
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def generate_embeddings(self, chunks: List[str]) -> List[List[float]]:
+        if not chunks:
+            return []
+        # encode sorts inputs by length, so each batch pads to similar lengths
+        embeddings = self.model.encode(
+            list(chunks),
+            batch_size=self.batch_size,
+            normalize_embeddings=self.normalize,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return embeddings.tolist()
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import pickle
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+class ParsedDocument:
+    """
+    NLP structure of a text as character offsets into it. The text itself is
+    not kept: the caller already has it, and the cache key is its hash, so an
+    entry costs a few bytes per sentence. `sentences` and `entities` stay None
+    until a strategy that needs them has parsed the text.
+    """
+    __slots__ = ("sentences", "entities")
+
+    def __init__(self):
+        self.sentences: Optional[List[Tuple[int, int]]] = None
+        self.entities: Optional[List[Tuple[int, int, str]]] = None
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
+    def sentence_texts(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.sentences]
+
+    def entity_texts(self, text: str) -> List[str]:
+        return [text[start:end] for start, end, _ in self.entities]
+
+
+class ParsedDocumentCache:
+    """
+    LRU cache of ParsedDocuments keyed by model name and content hash.
+
+    When `spill_dir` is set, every entry is also written there as it is
+    stored and loaded back on a lookup that misses memory, so re-chunking
+    runs in a new process skip the NLP pass as well, even if this one never
+    evicted anything or did not exit cleanly.
+    """
+
+    def __init__(self, max_items: int = 128, spill_dir: Optional[str] = None):
+        self.max_items = max(max_items, 1)
+        self.spill_dir = spill_dir
+        self._items: "OrderedDict[str, ParsedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return f"{model}-{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, re.sub(r"[^\w.-]", "_", key) + ".pkl")
+
+    def get(self, key: str) -> Optional[ParsedDocument]:
+        with self._lock:
+            parsed = self._items.get(key)
+            if parsed is not None:
+                self._items.move_to_end(key)
+                return parsed
+        if self.spill_dir:
+            path = self._spill_path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    parsed = pickle.load(f)
+                self._remember(key, parsed)
+                return parsed
+        return None
+
+    def put(self, key: str, parsed: ParsedDocument):
+        self._remember(key, parsed)
+        if self.spill_dir:
+            # Written to a temporary file and renamed, so readers in other processes never see half an entry
+            fd, temp_path = tempfile.mkstemp(dir=self.spill_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(parsed, f)
+            os.replace(temp_path, self._spill_path(key))
+
+    def _remember(self, key: str, parsed: ParsedDocument):
+        with self._lock:
+            self._items[key] = parsed
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# Shared by every chunking strategy in the process
+parse_cache = ParsedDocumentCache(
+    int(os.getenv("PARSE_CACHE_SIZE", 128)),
+    os.getenv("PARSE_CACHE_DIR") or None,
+)
@@ -0,0 +1,433 @@
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from Factory.main_factory import INode
+from Factory.pipeline_metrics import PipelineMetrics, record_size
+
+# Sentinel pushed onto a stage queue to tell one worker to exit
+_STOP = object()
+
+# Node result status for records that need no further processing, e.g. duplicates
+SKIPPED_STATUS = "skipped"
+
+# Returned in place of a record that a node skipped
+SKIPPED = object()
+
+# Called as on_node_complete(node_index, node_type, record) after a node succeeds, and as
+# on_record_dropped(node_index, node_type, record) with the node's input when it fails, skips or raises
+NodeCallback = Callable[[int, str, Dict[str, Any]], None]
+
+
+def _unwrap(node_type: str, result: Dict[str, Any]) -> Any:
+    if result.get("error"):
+        logging.error(f"Error processing record at node {node_type}: {result.get('message', result['error'])}")
+        return None
+    if result.get("status") == SKIPPED_STATUS:
+        logging.info(f"Record skipped at node {node_type}: {result.get('message', '')}")
+        return SKIPPED
+    return result.get("record")
+
+
+def run_node(node_type: str, node: INode, record: Dict[str, Any]) -> Any:
+    """
+    Run a single node on a record.
+
+    Returns the updated record, None when the node reported an error, or
+    SKIPPED when the node decided the record needs no further processing.
+    """
+    return _unwrap(node_type, node.process_node(record))
+
+
+def run_batch(node_type: str, node: INode, records: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Run a node on several records through its `process_batch` method.
+
+    Returns one outcome per input, as described for `run_node`.
+    """
+    if len(records) == 1:
+        return [run_node(node_type, node, records[0])]
+    return [_unwrap(node_type, result) for result in node.process_batch(records)]
+
+
+def execute_batch(node_type: str, node: INode, records: List[Dict[str, Any]],
+                  metrics: Optional[PipelineMetrics] = None) -> List[Any]:
+    """`run_batch` that also records the call in `metrics` when given."""
+    if metrics is None:
+        return run_batch(node_type, node, records)
+    size = sum(record_size(record) for record in records)
+    updated_records: List[Any] = [None] * len(records)
+    start = time.perf_counter()
+    try:
+        updated_records = run_batch(node_type, node, records)
+    finally:
+        _observe(metrics, node_type, updated_records, size, time.perf_counter() - start)
+    return updated_records
+
+
+def _observe(metrics: PipelineMetrics, node_type: str, outcomes: List[Any], size: int, duration: float):
+    skipped = sum(1 for record in outcomes if record is SKIPPED)
+    completed = sum(1 for record in outcomes if record is not None) - skipped
+    metrics.node(node_type).observe(len(outcomes), completed, size, duration, skipped)
+
+
+def _dropped(on_record_dropped: Optional[NodeCallback], index: int, node_type: str, record: Dict[str, Any]):
+    if on_record_dropped is None:
+        return
+    try:
+        on_record_dropped(index, node_type, record)
+    except Exception as e:
+        logging.error(f"Error handling a record dropped at node {node_type}: {e}")
+
+
+class NodeStage:
+    """A pipeline node with its own worker threads and a bounded input queue."""
+
+    def __init__(self, index: int, node_type: str, node: INode, workers: int = 1, queue_size: int = 100,
+                 batch_size: int = 1, on_node_complete: Optional[NodeCallback] = None,
+                 metrics: Optional[PipelineMetrics] = None, on_record_dropped: Optional[NodeCallback] = None):
+        self.index = index
+        self.node_type = node_type
+        self.node = node
+        self.workers = max(int(workers), 1)
+        self.batch_size = max(int(batch_size), 1)
+        self.queue: queue.Queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self.next_stage: Optional["NodeStage"] = None
+        self.on_node_complete = on_node_complete
+        self.on_record_dropped = on_record_dropped
+        self.metrics = metrics
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.node_type}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def put(self, record: Dict[str, Any]):
+        # Blocks while the queue is full, which throttles the upstream stage
+        self.queue.put(record)
+
+    def _emit(self, record: Dict[str, Any]):
+        if self.on_node_complete is not None:
+            self.on_node_complete(self.index, self.node_type, record)
+        if self.next_stage is not None:
+            self.next_stage.put(record)
+        else:
+            logging.info(f"Record completed pipeline: {record.get('file_name', '')}")
+
+    def _next_batch(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Block for one record, then take whatever else is already queued up to
+        `batch_size`. Returns the batch and whether a stop sentinel was seen.
+        """
+        batch = []
+        record = self.queue.get()
+        while record is not _STOP:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _work(self):
+        while True:
+            batch, stopping = self._next_batch()
+            if self.metrics is not None:
+                self.metrics.node(self.node_type).set_queue_depth(self.queue.qsize())
+            if batch:
+                try:
+                    outcomes = execute_batch(self.node_type, self.node, batch, self.metrics)
+                except Exception as e:
+                    logging.error(f"Unhandled error at node {self.node_type}: {e}")
+                    outcomes = [None] * len(batch)
+                for record, updated_record in zip(batch, outcomes):
+                    if updated_record is None or updated_record is SKIPPED:
+                        _dropped(self.on_record_dropped, self.index, self.node_type, record)
+                    else:
+                        self._emit(updated_record)
+            if stopping:
+                return
+
+    def stop(self):
+        """Wait for queued records to drain, then stop the workers."""
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+class SequentialExecutor:
+    """Runs each record through every node before accepting the next one."""
+
+    def __init__(self, nodes: List[Dict[str, Any]], on_node_complete: Optional[NodeCallback] = None,
+                 metrics: Optional[PipelineMetrics] = None, on_record_dropped: Optional[NodeCallback] = None):
+        self.nodes = nodes
+        self.on_node_complete = on_node_complete
+        self.on_record_dropped = on_record_dropped
+        self.metrics = metrics
+
+    def submit(self, record: Dict[str, Any], start_index: int = 0):
+        for index in range(start_index, len(self.nodes)):
+            node_type = self.nodes[index]["node_type"]
+            print("calling node : ",node_type)
+            try:
+                updated_record = execute_batch(node_type, self.nodes[index]["node"], [record], self.metrics)[0]
+            except Exception:
+                _dropped(self.on_record_dropped, index, node_type, record)
+                raise
+            if updated_record is None or updated_record is SKIPPED:
+                _dropped(self.on_record_dropped, index, node_type, record)
+                return
+            record = updated_record
+            if self.on_node_complete is not None:
+                self.on_node_complete(index, node_type, record)
+        print(record)
+
+    def close(self):
+        pass
+
+
+class StagedExecutor:
+    """
+    Runs pipeline nodes as concurrent stages connected by bounded queues.
+
+    Each node gets its own worker pool, so different records can be in
+    extraction, chunking, embedding and indexing at the same time. When a
+    stage falls behind its queue fills up and `submit` blocks the connector.
+    """
+
+    def __init__(self, nodes: List[Dict[str, Any]], queue_size: int = 100,
+                 on_node_complete: Optional[NodeCallback] = None, metrics: Optional[PipelineMetrics] = None,
+                 on_record_dropped: Optional[NodeCallback] = None):
+        """
+        Args:
+            nodes (list): Dicts with `node_type`, `node` and optional `workers` and `batch_size`.
+            queue_size (int): Maximum number of records waiting in front of each stage.
+            on_node_complete (callable): Called with the node index, node type and
+                updated record each time a node succeeds.
+            metrics (PipelineMetrics): Collects per-node counters, timings and queue depth.
+            on_record_dropped (callable): Called with the node index, node type and
+                input record when a node fails, skips or raises on it.
+        """
+        if not nodes:
+            raise ValueError("StagedExecutor requires at least one node.")
+        self.stages = [
+            NodeStage(index, n["node_type"], n["node"], n.get("workers", 1), queue_size,
+                      n.get("batch_size", 1), on_node_complete, metrics, on_record_dropped)
+            for index, n in enumerate(nodes)
+        ]
+        for stage, next_stage in zip(self.stages, self.stages[1:]):
+            stage.next_stage = next_stage
+        self._started = False
+
+    def start(self):
+        if not self._started:
+            for stage in self.stages:
+                stage.start()
+            self._started = True
+
+    def submit(self, record: Dict[str, Any], start_index: int = 0):
+        """Queue a record for a stage (the first by default), blocking if the pipeline is saturated."""
+        self.start()
+        self.stages[start_index].put(record)
+
+    def close(self):
+        """Drain every stage in order and stop all workers."""
+        if not self._started:
+            return
+        for stage in self.stages:
+            stage.stop()
+        self._started = False
+
+
+class AsyncExecutor:
+    """
+    Interleaves many in-flight records on one asyncio event loop.
+
+    Nodes whose `process_node` is a coroutine function are awaited directly;
+    ordinary synchronous nodes keep working unchanged and run on a thread
+    pool. A synchronous node with a `batch_size` above 1 gets the records
+    waiting for it handed to `process_batch` together, as in the staged mode.
+    Each node has its own concurrency limit, counted in calls, and `submit`
+    blocks the connector once `max_in_flight` records are being processed.
+    """
+
+    def __init__(self, nodes: List[Dict[str, Any]], max_in_flight: int = 100,
+                 on_node_complete: Optional[NodeCallback] = None, metrics: Optional[PipelineMetrics] = None,
+                 on_record_dropped: Optional[NodeCallback] = None):
+        """
+        Args:
+            nodes (list): Dicts with `node_type`, `node` and optional `concurrency` and `batch_size`.
+            max_in_flight (int): Maximum number of records being processed at once.
+            on_node_complete (callable): Called with the node index, node type and
+                updated record each time a node succeeds.
+            metrics (PipelineMetrics): Collects per-node counters, timings and queue depth.
+            on_record_dropped (callable): Called with the node index, node type and
+                input record when a node fails, skips or raises on it.
+        """
+        if not nodes:
+            raise ValueError("AsyncExecutor requires at least one node.")
+        self.nodes = nodes
+        self.concurrency = [max(int(n.get("concurrency", max_in_flight)), 1) for n in nodes]
+        self.is_async = [inspect.iscoroutinefunction(n["node"].process_node) for n in nodes]
+        self.batch_sizes = [max(int(n.get("batch_size", 1)), 1) for n in nodes]
+        self.on_node_complete = on_node_complete
+        self.on_record_dropped = on_record_dropped
+        self.metrics = metrics
+        self._in_flight = threading.BoundedSemaphore(max(int(max_in_flight), 1))
+        self._futures = set()
+        self._futures_lock = threading.Lock()
+        self._waiting = [0] * len(nodes)
+        # Records waiting to be batched for each node, with the future their outcome goes to
+        self._batches: List[List[Tuple[Dict[str, Any], asyncio.Future]]] = [[] for _ in nodes]
+        self._draining = [False] * len(nodes)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphores: List[asyncio.Semaphore] = []
+        self._thread_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    def start(self):
+        if self._loop is not None:
+            return
+        # Synchronous nodes share a thread pool large enough for all their concurrency limits
+        sync_slots = sum(c for c, is_async in zip(self.concurrency, self.is_async) if not is_async)
+        self._thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(sync_slots, 1))
+        self._loop = asyncio.new_event_loop()
+        self._semaphores = [asyncio.Semaphore(c) for c in self.concurrency]
+        self._thread = threading.Thread(target=self._loop.run_forever, name="pipeline-async", daemon=True)
+        self._thread.start()
+
+    def submit(self, record: Dict[str, Any], start_index: int = 0):
+        """Schedule a record on the event loop, blocking while `max_in_flight` records are running."""
+        self.start()
+        self._in_flight.acquire()
+        future = asyncio.run_coroutine_threadsafe(self._process(record, start_index), self._loop)
+        with self._futures_lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future: concurrent.futures.Future):
+        with self._futures_lock:
+            self._futures.discard(future)
+        self._in_flight.release()
+        if not future.cancelled() and future.exception() is not None:
+            logging.error(f"Unhandled error in async pipeline: {future.exception()}")
+
+    async def _call_node(self, index: int, record: Dict[str, Any]) -> Any:
+        if self.batch_sizes[index] > 1 and not self.is_async[index]:
+            return await self._call_batched(index, record)
+        node_type = self.nodes[index]["node_type"]
+        node = self.nodes[index]["node"]
+        self._waiting[index] += 1
+        if self.metrics is not None:
+            self.metrics.node(node_type).set_queue_depth(self._waiting[index])
+        async with self._semaphores[index]:
+            self._waiting[index] -= 1
+            size = record_size(record) if self.metrics is not None else 0
+            outcome = None
+            start = time.perf_counter()
+            try:
+                if self.is_async[index]:
+                    result = await node.process_node(record)
+                else:
+                    result = await self._loop.run_in_executor(self._thread_pool, node.process_node, record)
+                outcome = _unwrap(node_type, result)
+            finally:
+                if self.metrics is not None:
+                    _observe(self.metrics, node_type, [outcome], size, time.perf_counter() - start)
+        return outcome
+
+    async def _call_batched(self, index: int, record: Dict[str, Any]) -> Any:
+        future = self._loop.create_future()
+        self._batches[index].append((record, future))
+        if self.metrics is not None:
+            self.metrics.node(self.nodes[index]["node_type"]).set_queue_depth(len(self._batches[index]))
+        if not self._draining[index]:
+            self._draining[index] = True
+            self._loop.create_task(self._drain(index))
+        return await future
+
+    async def _drain(self, index: int):
+        """Hand the records waiting for a node to `process_batch`, up to `batch_size` per call."""
+        try:
+            # Let every record that is ready right now join the first batch
+            await asyncio.sleep(0)
+            while self._batches[index]:
+                # Take the batch only once a call slot is free, so records keep joining it meanwhile
+                await self._semaphores[index].acquire()
+                batch = self._batches[index][:self.batch_sizes[index]]
+                del self._batches[index][:len(batch)]
+                self._loop.create_task(self._run_batch(index, batch))
+        finally:
+            self._draining[index] = False
+
+    async def _run_batch(self, index: int, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        node_type = self.nodes[index]["node_type"]
+        try:
+            outcomes = await self._loop.run_in_executor(
+                self._thread_pool, execute_batch, node_type, self.nodes[index]["node"],
+                [record for record, _ in batch], self.metrics
+            )
+            for (_, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    future.set_result(outcome)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._semaphores[index].release()
+
+    async def _process(self, record: Dict[str, Any], start_index: int):
+        for index in range(start_index, len(self.nodes)):
+            node_type = self.nodes[index]["node_type"]
+            try:
+                updated_record = await self._call_node(index, record)
+            except Exception:
+                _dropped(self.on_record_dropped, index, node_type, record)
+                raise
+            if updated_record is None or updated_record is SKIPPED:
+                _dropped(self.on_record_dropped, index, node_type, record)
+                return
+            record = updated_record
+            if self.on_node_complete is not None:
+                self.on_node_complete(index, node_type, record)
+        logging.info(f"Record completed pipeline: {record.get('file_name', '')}")
+
+    def close(self):
+        """Wait for every submitted record to finish, then stop the event loop."""
+        if self._loop is None:
+            return
+        with self._futures_lock:
+            pending = list(self._futures)
+        concurrent.futures.wait(pending)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread_pool.shutdown()
+        self._loop = None
+
+
+def create_executor(nodes: List[Dict[str, Any]], execution: Dict[str, Any],
+                    on_node_complete: Optional[NodeCallback] = None,
+                    metrics: Optional[PipelineMetrics] = None,
+                    on_record_dropped: Optional[NodeCallback] = None):
+    """Build the executor selected by the `execution` section of the pipeline config."""
+    mode = execution.get("mode", "sequential")
+    if mode == "sequential":
+        return SequentialExecutor(nodes, on_node_complete, metrics, on_record_dropped)
+    if mode == "staged":
+        return StagedExecutor(nodes, execution.get("queue_size", 100), on_node_complete, metrics, on_record_dropped)
+    if mode == "async":
+        return AsyncExecutor(nodes, execution.get("max_in_flight", 100), on_node_complete, metrics, on_record_dropped)
+    raise ValueError(f"Unsupported execution mode: {mode}")
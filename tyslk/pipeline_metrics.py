@@ -0,0 +1,197 @@
+import json
+import logging
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# Upper bounds, in seconds, of the wall time histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Number of recent durations kept per node for percentile estimates
+SAMPLE_SIZE = 10000
+
+
+def record_size(record: Dict[str, Any]) -> int:
+    """Approximate payload size of a record: its file bytes plus its text."""
+    size = 0
+    file_bytes = record.get("file_bytes")
+    if file_bytes is not None:
+        size += len(file_bytes)
+    text = record.get("text")
+    if isinstance(text, str):
+        size += len(text)
+    return size
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class NodeMetrics:
+    """Counters and a wall time histogram for a single pipeline node."""
+
+    def __init__(self, node_type: str):
+        self.node_type = node_type
+        self.records_in = 0
+        self.records_out = 0
+        self.errors = 0
+        self.skipped = 0
+        self.bytes_processed = 0
+        self.queue_depth = 0
+        self.calls = 0
+        self.duration_sum = 0.0
+        self.bucket_counts = [0] * (len(DURATION_BUCKETS) + 1)
+        self._samples = deque(maxlen=SAMPLE_SIZE)
+        self._lock = threading.Lock()
+
+    def observe(self, records_in: int, records_out: int, bytes_processed: int, duration: float, skipped: int = 0):
+        """
+        Record one node call that received `records_in` records, completed
+        `records_out` and deliberately skipped `skipped`; the rest are errors.
+        """
+        with self._lock:
+            self.calls += 1
+            self.records_in += records_in
+            self.records_out += records_out
+            self.skipped += skipped
+            self.errors += records_in - records_out - skipped
+            self.bytes_processed += bytes_processed
+            self.duration_sum += duration
+            self._samples.append(duration)
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+            else:
+                self.bucket_counts[-1] += 1
+
+    def set_queue_depth(self, depth: int):
+        self.queue_depth = depth
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+            return {
+                "records_in": self.records_in,
+                "records_out": self.records_out,
+                "errors": self.errors,
+                "skipped": self.skipped,
+                "bytes_processed": self.bytes_processed,
+                "queue_depth": self.queue_depth,
+                "calls": self.calls,
+                "wall_time_seconds": self.duration_sum,
+                "p50_seconds": percentile(samples, 50),
+                "p99_seconds": percentile(samples, 99),
+                "buckets": dict(zip([str(b) for b in DURATION_BUCKETS] + ["+Inf"], self.bucket_counts)),
+            }
+
+
+class PipelineMetrics:
+    """
+    Per-node runtime metrics for the generated Pipeline.
+
+    Exposed as a JSON snapshot and in the Prometheus text format, either
+    written to files or served over HTTP from a local port.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[str, NodeMetrics] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def node(self, node_type: str) -> NodeMetrics:
+        with self._lock:
+            if node_type not in self._nodes:
+                self._nodes[node_type] = NodeMetrics(node_type)
+            return self._nodes[node_type]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            nodes = list(self._nodes.values())
+        return {"nodes": {metrics.node_type: metrics.snapshot() for metrics in nodes}}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=4)
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()["nodes"]
+        counters = [
+            ("records_in_total", "counter", "Records received by the node."),
+            ("records_out_total", "counter", "Records the node completed successfully."),
+            ("errors_total", "counter", "Records the node failed to process."),
+            ("skipped_total", "counter", "Records the node short-circuited, such as duplicates."),
+            ("bytes_processed_total", "counter", "File and text bytes received by the node."),
+            ("queue_depth", "gauge", "Records waiting in front of the node."),
+        ]
+        keys = {
+            "records_in_total": "records_in",
+            "records_out_total": "records_out",
+            "errors_total": "errors",
+            "skipped_total": "skipped",
+            "bytes_processed_total": "bytes_processed",
+            "queue_depth": "queue_depth",
+        }
+        lines = []
+        for name, kind, help_text in counters:
+            lines.append(f"# HELP pipeline_node_{name} {help_text}")
+            lines.append(f"# TYPE pipeline_node_{name} {kind}")
+            for node_type, values in snapshot.items():
+                lines.append(f'pipeline_node_{name}{{node="{node_type}"}} {values[keys[name]]}')
+
+        lines.append("# HELP pipeline_node_duration_seconds Wall time of node calls.")
+        lines.append("# TYPE pipeline_node_duration_seconds histogram")
+        for node_type, values in snapshot.items():
+            cumulative = 0
+            for bound, count in values["buckets"].items():
+                cumulative += count
+                lines.append(f'pipeline_node_duration_seconds_bucket{{node="{node_type}",le="{bound}"}} {cumulative}')
+            lines.append(f'pipeline_node_duration_seconds_sum{{node="{node_type}"}} {values["wall_time_seconds"]}')
+            lines.append(f'pipeline_node_duration_seconds_count{{node="{node_type}"}} {values["calls"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, prometheus_path: Optional[str] = None, json_path: Optional[str] = None):
+        """Write the current metrics to a Prometheus text file and/or a JSON file."""
+        if prometheus_path:
+            with open(prometheus_path, "w") as f:
+                f.write(self.to_prometheus())
+        if json_path:
+            with open(json_path, "w") as f:
+                f.write(self.to_json())
+
+    def serve(self, port: int, host: str = "127.0.0.1"):
+        """Serve `/metrics` (Prometheus) and `/metrics.json` from a background thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = metrics.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="pipeline-metrics", daemon=True).start()
+        logging.info(f"Serving pipeline metrics on http://{host}:{port}/metrics")
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,63 @@
+from typing import Any, Dict, Optional, Union
+
+# Record field that holds the raw file content
+PAYLOAD_KEY = "file_bytes"
+
+
+class PipelineRecord(dict):
+    """
+    Record passed between pipeline nodes.
+
+    It behaves like the plain dicts nodes already use, but keeps `file_bytes`
+    as a memoryview so the `copy()` every node makes shares the payload
+    instead of pinning another reference to it, and the payload can be
+    released for all copies at once as soon as text extraction is done.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def wrap(cls, record: Dict[str, Any]) -> "PipelineRecord":
+        """
+        Build a PipelineRecord from a connector record.
+
+        The payload is moved out of `record`, so the connector's dict no
+        longer keeps the file bytes alive once the pipeline releases them.
+        """
+        if isinstance(record, cls):
+            return record
+        wrapped = cls(record)
+        payload = record.pop(PAYLOAD_KEY, None)
+        if payload is not None:
+            wrapped[PAYLOAD_KEY] = payload if isinstance(payload, memoryview) else memoryview(payload)
+        return wrapped
+
+    def copy(self) -> "PipelineRecord":
+        # Shallow, like dict.copy, but keeps the record type so later nodes can release the payload
+        return PipelineRecord(self)
+
+    def release_payload(self):
+        """Drop the payload and invalidate the view shared with every copy of this record."""
+        payload = self.pop(PAYLOAD_KEY, None)
+        if isinstance(payload, memoryview):
+            payload.release()
+
+
+def pickle_friendly(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Plain-dict copy of a record with binary views turned into bytes, so it can be pickled."""
+    return {
+        key: bytes(value) if isinstance(value, (memoryview, bytearray)) else value
+        for key, value in record.items()
+    }
+
+
+def payload_bytes(payload: Union[bytes, bytearray, memoryview, None]) -> Optional[bytes]:
+    """
+    Bytes-like object for services that cannot take a memoryview.
+    Returns the underlying object of a full view instead of copying it.
+    """
+    if isinstance(payload, memoryview):
+        if isinstance(payload.obj, (bytes, bytearray)) and payload.nbytes == len(payload.obj):
+            return payload.obj
+        return payload.tobytes()
+    return payload
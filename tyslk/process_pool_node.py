@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from Factory.lazy_registry import load_class
+from Factory.main_factory import INode
+from Factory.pipeline_record import pickle_friendly
+
+# Node instance owned by a worker process, created once by _init_worker
+_worker_node: Optional[INode] = None
+
+
+def _init_worker(node_path: str):
+    global _worker_node
+    # Each process builds its own node so models are loaded once per worker
+    _worker_node = load_class(node_path)()
+
+
+def _process_in_worker(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _worker_node.process_batch(records)
+
+
+def node_path(node: INode) -> str:
+    """`module:ClassName` path of a node, as accepted by `load_class`."""
+    return f"{type(node).__module__}:{type(node).__qualname__}"
+
+
+class ProcessPoolNode(INode):
+    """
+    Runs a CPU-bound node in a pool of worker processes.
+
+    The wrapped node class is instantiated inside every worker, so models such
+    as spaCy or transformers are loaded per process and never pickled. Records
+    and results are sent between processes, so they must be picklable.
+    """
+
+    def __init__(self, node_path: str, processes: Optional[int] = None):
+        """
+        Args:
+            node_path (str): `module:ClassName` of the node to run in the workers.
+            processes (int): Number of worker processes, defaults to the CPU count.
+        """
+        self.node_path = node_path
+        self.processes = int(processes or os.cpu_count() or 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.node_path,),
+            )
+        return self._pool
+
+    def process_node(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return self.process_batch([record])[0]
+
+    def process_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        future = self._get_pool().submit(_process_in_worker, [pickle_friendly(record) for record in records])
+        return future.result()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
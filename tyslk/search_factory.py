@@ -1,21 +1,19 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 import uuid
 import os
-from Services.Search.aws_search import AwsSearchService
-from Services.Search.azure_search import AzureSearchService
-from Services.Search.elastic_search import ElasticSearchService
-# from Services.Search.gcp_search import GcpSearchService
 from Services.Search.isearchservice import ISearchService
 from Factory.main_factory import INode
+from Factory.lazy_registry import LazyRegistry
 import json
 
 class SearchFactory(INode):
-    _services = {
-        "elastic":ElasticSearchService(),
-        "azure":AzureSearchService(),
-         "aws":AwsSearchService(),
-        # "gcp":GcpSearchService()
-    }
+    # Search clients are imported and connected only when first selected
+    _services = LazyRegistry({
+        "elastic":"Services.Search.elastic_search:ElasticSearchService",
+        "azure":"Services.Search.azure_search:AzureSearchService",
+         "aws":"Services.Search.aws_search:AwsSearchService",
+        # "gcp":"Services.Search.gcp_search:GcpSearchService"
+    })
 
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -64,68 +62,102 @@ class SearchFactory(INode):
         """
         pass
 
+    def _build_documents(self, record: Dict[str, Any], mapping: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Turn a record's chunks and embeddings into search documents.
+        The chunks and embeddings are removed from the record.
+        """
+        embeddings = record.pop("embeddings", [])
+        chunks = record.pop("chunks", [])
+        documents = []
+        def get_value(record, field_name):
+            fields = field_name.split(".")
+            value = record
+            for i in fields:
+                value = value.get(i, None)
+            return value
+        for i, (embedding, chunk) in enumerate(zip(embeddings, chunks)):
+            document = {
+                "id": str(uuid.uuid4()),
+                "embeddings": embedding,
+                "chunks": chunk
+            }
+            
+            for i, mapping_properties in enumerate(mapping):
+                # print("properties_mapping_1",mapping_properties)
+                document[mapping_properties["Target_name"]] = get_value(record,mapping_properties["source_name"])
+            documents.append(document)
+        return documents
+
     def process_node(self, record) -> Dict[str, Any]:
         """
         Stores records in the specified search service.
         """
+        return self.process_batch([record])[0]
+
+    def _store(self, search_service: ISearchService, records: List[Dict[str, Any]], documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Uploads `documents` in one call; the result applies to each of `records`.
+        """
+        try:
+            result = search_service.store_records(documents)
+        except Exception as e:
+            print(str(e))
+            return [{
+                "status": "failed",
+                "error": True,
+                "message": str(e),
+            } for _ in records]
+        if not result:
+            return [{
+                "status": "failed",
+                "error": "Failed to store records",
+            } for _ in records]
+
+        return [{
+            "status": "success",
+            "record": record,
+            "error": None
+        } for record in records]
+
+    def process_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Stores the documents of several records with a single upload to the search service.
+        If that upload fails, each record is uploaded on its own, so a rejected
+        document only fails the record it came from.
+        """
         try:
             search_type = os.getenv("SEARCH_TYPE")
             search_service = self._services.get(search_type)
 
             if not search_service:
-                return {
+                return [{
                     "status": "error",
                     "message": f"Unsupported connector_type: {search_type}",
                     "error": True
-                }
+                } for _ in records]
+            mapping = []
             mapping_properties = os.getenv("FIELD_DEFINITIONS")
             if mapping_properties:
                 mapping = json.loads(mapping_properties)
-                
-            embeddings = record.get("embeddings", [])
-            chunks = record.get("chunks", [])
-            del record["embeddings"]
-            del record["chunks"]
-            documents = []
-            def get_value(record, field_name):
-                fields = field_name.split(".")
-                value = record
-                for i in fields:
-                    value = value.get(i, None)
-                return value
-            for i, (embedding, chunk) in enumerate(zip(embeddings, chunks)):
-                document = {
-                    "id": str(uuid.uuid4()),
-                    "embeddings": embedding,
-                    "chunks": chunk
-                }
-                
-                for i, mapping_properties in enumerate(mapping):
-                    # print("properties_mapping_1",mapping_properties)
-                    document[mapping_properties["Target_name"]] = get_value(record,mapping_properties["source_name"])
-                documents.append(document)
-            
 
-            # Store filtered records
-            result = search_service.store_records(documents)
-            if not result:
-                return {
-                    "status": "failed",
-                    "error": "Failed to store records",
-                }
+            documents = [self._build_documents(record, mapping) for record in records]
 
-            return {
-                "status": "success",
-                "record": record,
-                "error": None
-            }
+            # Store filtered records
+            results = self._store(search_service, records, [document for docs in documents for document in docs])
+            if len(records) > 1 and results[0]["status"] != "success":
+                results = [
+                    self._store(search_service, [record], docs)[0]
+                    for record, docs in zip(records, documents)
+                ]
+            return results
         except Exception as e:
             print(str(e))
-            return {
+            return [{
                 "status": "failed",
                 "error": True,
                 "message": str(e),
-            }
+            } for _ in records]
 
     def retrieve_records(self, query: str) -> Dict[str, Any]:
         """
@@ -1,5 +1,4 @@
 import openai
-from transformers import T5ForConditionalGeneration, T5Tokenizer, BartForConditionalGeneration, BartTokenizer
 from typing import Any, Dict, List
 import os
 import warnings
@@ -34,6 +33,8 @@ class Summarizer:
 class T5Summarizer(Summarizer):
     def __init__(self):
         try:
+            # Imported here so selecting another summarizer does not pay for transformers
+            from transformers import T5ForConditionalGeneration, T5Tokenizer
             self.tokenizer = T5Tokenizer.from_pretrained("t5-small", clean_up_tokenization_spaces=True, legacy=False)
             self.model = T5ForConditionalGeneration.from_pretrained("t5-small")
         except Exception as e:
@@ -63,6 +64,7 @@ class T5Summarizer(Summarizer):
 class BARTSummarizer(Summarizer):
     def __init__(self):
         try:
+            from transformers import BartForConditionalGeneration, BartTokenizer
             self.tokenizer = BartTokenizer.from_pretrained("facebook/bart-large-cnn")
             self.model = BartForConditionalGeneration.from_pretrained("facebook/bart-large-cnn")
         except Exception as e:
@@ -1,16 +1,8 @@
 from typing import Any, Dict, List
 import os
 from Factory.main_factory import INode
+from Factory.lazy_registry import LazyRegistry
 from Services.summarization.SummarizationBase import BaseSummarization
-from Services.summarization.summarization import (
-    BARTSummarizer,
-    BERTSummarizer,
-    KeywordExtractor,
-    Summarizer,
-    SumySummarizer,
-    T5Summarizer,
-    TopicModeler,
-)
 import json
 
 class SummarizationFactory(INode):
@@ -18,15 +10,16 @@ class SummarizationFactory(INode):
         self.model_name = os.getenv("MODEL_NAME")
         self.custom_prompt=os.getenv('CUSTOM_PROMPT')
         self.max_tokens=int(os.getenv('MAX_TOKENS'))
-        self.summarizer = {
-            # "gpt":GPTSummarizer(),
-            "t5": T5Summarizer(),
-            "bart": BARTSummarizer(),
-            "sumy": SumySummarizer(),
-            "bert": BERTSummarizer(),
-            "keyword":KeywordExtractor(),
-            "TopicModeler":TopicModeler()
-        }
+        # Models are only downloaded and loaded for the summarizer that is selected
+        self.summarizer = LazyRegistry({
+            # "gpt":"Services.summarization.summarization:GPTSummarizer",
+            "t5": "Services.summarization.summarization:T5Summarizer",
+            "bart": "Services.summarization.summarization:BARTSummarizer",
+            "sumy": "Services.summarization.summarization:SumySummarizer",
+            "bert": "Services.summarization.summarization:BERTSummarizer",
+            "keyword":"Services.summarization.summarization:KeywordExtractor",
+            "TopicModeler":"Services.summarization.summarization:TopicModeler"
+        })
       
 
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
@@ -45,7 +38,7 @@ class SummarizationFactory(INode):
         # Validate the configuration using the appropriate service
         return summarization_service.validate_config(config)
 
-    def get_summarizer(self, model_name: str) -> Summarizer:
+    def get_summarizer(self, model_name: str) -> BaseSummarization:
         summarizer_instance = self.summarizer.get(model_name)
         if not summarizer_instance:
             raise ValueError(f"Unknown summarizer model: {model_name}")
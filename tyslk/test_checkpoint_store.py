@@ -0,0 +1,61 @@
+import pickle
+
+from Factory.checkpoint_store import CHECKPOINT_KEY, CheckpointStore
+
+NODES = ["text_extraction", "chunking", "embeddings"]
+
+
+def make_store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.db"), NODES)
+
+
+def test_resumes_from_the_node_after_the_last_completed_one(tmp_path):
+    store = make_store(tmp_path)
+    start, record = store.resume({"file_name": "a.pdf", "file_bytes": b"abc"})
+    assert start == 0
+    store.save(0, "text_extraction", dict(record, text="abc"))
+
+    start, record = make_store(tmp_path).resume({"file_name": "a.pdf", "file_bytes": b"abc"})
+    assert start == 1
+    assert record["text"] == "abc"
+
+
+def test_skips_fully_processed_records_and_restarts_changed_ones(tmp_path):
+    store = make_store(tmp_path)
+    _, record = store.resume({"file_name": "a.pdf", "file_bytes": b"abc"})
+    store.save(len(NODES) - 1, "embeddings", record)
+
+    assert store.resume({"file_name": "a.pdf", "file_bytes": b"abc"}) is None
+    assert store.resume({"file_name": "a.pdf", "file_bytes": b"changed"})[0] == 0
+
+
+def test_record_without_id_fields_is_identified_by_content(tmp_path):
+    store = make_store(tmp_path)
+    _, record = store.resume({"file_bytes": b"abc"})
+    assert record[CHECKPOINT_KEY]["source_id"].startswith("sha256:")
+    store.save(len(NODES) - 1, "embeddings", record)
+
+    assert store.resume({"file_bytes": b"abc"}) is None
+
+
+def test_record_without_id_or_content_is_not_checkpointed(tmp_path):
+    store = make_store(tmp_path)
+    start, record = store.resume({"metadata": {}})
+    assert start == 0
+    assert CHECKPOINT_KEY not in record
+    # Saving a record without a checkpoint identity is a no-op rather than an error
+    store.save(0, "text_extraction", record)
+
+
+def test_snapshot_leaves_out_the_payload_and_resume_restores_it(tmp_path):
+    store = make_store(tmp_path)
+    payload = b"x" * 100000
+    _, record = store.resume({"file_name": "a.pdf", "file_bytes": payload})
+    store.save(0, "text_extraction", dict(record, text="x"))
+
+    snapshot = store._conn.execute("SELECT record FROM checkpoints").fetchone()[0]
+    assert "file_bytes" not in pickle.loads(snapshot)
+    assert len(snapshot) < 1000
+
+    _, resumed = store.resume({"file_name": "a.pdf", "file_bytes": payload})
+    assert resumed["file_bytes"] == payload
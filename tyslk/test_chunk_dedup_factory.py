@@ -0,0 +1,64 @@
+import pytest
+
+from Factory.chunk_dedup_factory import ChunkDedupFactory, lsh_bands
+
+FOOTER = "This message and any attachments are confidential and intended only for the named recipient"
+
+
+@pytest.fixture
+def dedup(monkeypatch):
+    monkeypatch.setenv("DEDUP_ID_FIELDS", "file_path")
+    return ChunkDedupFactory()
+
+
+def test_boilerplate_repeated_across_records_is_dropped(dedup):
+    first = dedup.process_node({"file_path": "a.pdf", "chunks": ["Quarterly revenue grew in every region", FOOTER]})
+    dedup.on_record_complete(first["record"])
+    second = dedup.process_node({"file_path": "b.pdf", "chunks": [FOOTER + ".", "Search latency fell after the index rebuild"]})
+
+    assert first["record"]["chunks"] == ["Quarterly revenue grew in every region", FOOTER]
+    assert second["record"]["chunks"] == ["Search latency fell after the index rebuild"]
+    assert second["record"]["duplicate_chunks"] == [{"index": 0, "duplicate_of": "a.pdf#1"}]
+
+
+def test_distinct_and_empty_chunks_are_kept(dedup):
+    chunks = ["alpha beta gamma delta epsilon", "zeta eta theta iota kappa", "  "]
+    result = dedup.process_node({"file_path": "a.pdf", "chunks": chunks})
+    assert result["record"]["chunks"] == chunks
+    assert result["record"]["duplicate_chunks"] == []
+
+
+def test_chunks_of_a_record_that_failed_are_not_used(dedup):
+    first = dedup.process_node({"file_path": "a.pdf", "chunks": [FOOTER]})
+    # Nothing is indexed while a.pdf is in flight
+    assert dedup.process_node({"file_path": "b.pdf", "chunks": [FOOTER]})["record"]["chunks"] == [FOOTER]
+
+    dedup.on_record_dropped(first["record"])
+    dedup.on_record_complete(first["record"])
+    third = dedup.process_node({"file_path": "c.pdf", "chunks": [FOOTER]})
+    assert third["record"]["chunks"] == [FOOTER]
+
+
+def test_repeats_within_a_record_are_dropped(dedup):
+    result = dedup.process_node({"file_path": "a.pdf", "chunks": [FOOTER, "Quarterly revenue grew in every region", FOOTER]})
+    assert result["record"]["chunks"] == [FOOTER, "Quarterly revenue grew in every region"]
+    assert result["record"]["duplicate_chunks"] == [{"index": 2, "duplicate_of": "a.pdf#0"}]
+
+
+def test_index_forgets_the_oldest_chunks_beyond_the_cap(monkeypatch):
+    monkeypatch.setenv("CHUNK_DEDUP_MAX_CHUNKS", "2")
+    dedup = ChunkDedupFactory()
+    texts = [f"document {i} has its own distinct words number {i} here" for i in range(3)]
+    for i, text in enumerate(texts):
+        dedup.on_record_complete(dedup.process_node({"file_path": f"{i}.pdf", "chunks": [text]})["record"])
+
+    assert len(dedup._entries) == 2
+    assert dedup.process_node({"file_path": "x.pdf", "chunks": [texts[0]]})["record"]["chunks"] == [texts[0]]
+    assert dedup.process_node({"file_path": "y.pdf", "chunks": [texts[2]]})["record"]["chunks"] == []
+
+
+def test_lsh_bands_split_the_signature():
+    bands, rows = lsh_bands(64, 0.8)
+    assert bands * rows == 64
+    # The threshold of the chosen banding is close to the requested one
+    assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.1
@@ -0,0 +1,133 @@
+import random
+import re
+
+import numpy as np
+import pytest
+import spacy
+import tiktoken
+
+from Factory.chunking_factory import ChunkingFactory
+from Services.Chunking import chunking
+from Services.Chunking.chunking import KeywordBasedChunker, PageChunker, SemanticBreakpointChunker, TiktokenChunker
+from Services.Chunking.parse_cache import parse_cache
+
+
+def split_like_re(tokens, text):
+    """Reference: re.split by each token in turn, stripped pages without the empty ones."""
+    pages = [text]
+    for token in tokens:
+        pages = [piece for page in pages for piece in re.split(token, page)]
+    return [page.strip() for page in pages if page.strip()]
+
+
+def segments(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("tokens, text, expected", [
+    ([r"(?=Page \d)"], "intro Page 1 foo Page 2 bar", ["intro", "Page 1 foo", "Page 2 bar"]),
+    ([r"(Page)"], "aPagebPagec", ["a", "Page", "b", "Page", "c"]),
+    ([r"\f", r"---"], "one\ftwo --- three\f", ["one", "two", "three"]),
+])
+def test_pages_split_like_re_split(tokens, text, expected):
+    assert split_like_re(tokens, text) == expected
+    assert PageChunker(tokens).chunk(text) == expected
+
+
+@pytest.mark.parametrize("tokens", [[r"(?=Page \d)"], [r"(Page)"], [r"(?=Page \d)|(Section \d+)"], [r"PAGE_BREAK"]])
+@pytest.mark.parametrize("size", [1, 3, 7, 50])
+def test_streamed_pages_match_a_single_pass(tokens, size):
+    text = "intro Page 1 foo PAGE_BREAK Section 12 Page 2 bar PageXPage 3 Section 4 end"
+    chunker = PageChunker(tokens)
+    assert list(chunker.chunk_iter(segments(text, size))) == chunker.chunk(text)
+
+
+def byte_chunker(max_tokens, overlap_tokens=0):
+    """TiktokenChunker over a small byte-level BPE vocabulary, so no encoding has to be downloaded."""
+    ranks = {bytes([i]): i for i in range(256)}
+    ranks.update({b"ab": 256, b"abab": 257, b"the": 258})
+    chunker = TiktokenChunker(max_tokens, overlap_tokens)
+    chunker._encoding = tiktoken.Encoding("bytes", pat_str=r"\s+|\S+", mergeable_ranks=ranks, special_tokens={})
+    return chunker
+
+
+@pytest.mark.parametrize("overlap", [0, 5])
+def test_token_chunks_stream_like_a_single_pass(overlap):
+    text = " ".join(f"the abab word{i}" for i in range(400))
+    chunker = byte_chunker(20, overlap)
+    assert list(chunker.chunk_iter(segments(text, 37))) == chunker.chunk(text)
+
+
+# cl100k_base's pattern: a whitespace run gives its last space to the word after it
+CL100K_PATTERN = r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s"""
+
+
+def cl100k_like_chunker(max_tokens, overlap_tokens=0):
+    ranks = {bytes([i]): i for i in range(256)}
+    for merge in [b"  ", b"    ", b" t", b"ab", b"tab", b"\t\t", b" \n"]:
+        ranks[merge] = len(ranks)
+    chunker = TiktokenChunker(max_tokens, overlap_tokens)
+    chunker._encoding = tiktoken.Encoding("cl100k_like", pat_str=CL100K_PATTERN, mergeable_ranks=ranks, special_tokens={})
+    return chunker
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("size", [1, 2, 5, 17])
+def test_token_chunks_stream_like_a_single_pass_across_whitespace_runs(seed, size):
+    rng = random.Random(seed)
+    pieces = ["tab", "ab", "日本語", "x1", "123", "it's", "...", "ab!", " ", "  ", "   ", "\t", "\n", "\r\n"]
+    text = "".join(rng.choice(pieces) for _ in range(1000))
+    chunker = cl100k_like_chunker(3, seed % 3)
+    assert list(chunker.chunk_iter(segments(text, size))) == chunker.chunk(text)
+
+
+def test_token_stream_without_whitespace_is_flushed_as_it_arrives():
+    text = "abab" * 5000
+    read = []
+
+    def tracked_segments():
+        for segment in segments(text, 100):
+            read.append(segment)
+            yield segment
+
+    chunker = byte_chunker(20)
+    chunks = chunker.chunk_iter(tracked_segments())
+    first = next(chunks)
+    # The first chunk comes out long before the whole text has been read
+    assert len(read) < 5
+    chunks = [first] + list(chunks)
+    assert "".join(chunks) == text
+    assert all(len(chunker._get_encoding().encode(chunk)) <= 20 for chunk in chunks)
+
+
+def test_factory_chunks_string_text(monkeypatch):
+    monkeypatch.setenv("CHUNKING_STRATEGY", "page")
+    monkeypatch.setenv("PAGE_TOKENS", r"\f")
+    factory = ChunkingFactory()
+    result = factory.process_node({"text": " one\ftwo "})
+    assert result["record"]["chunks"] == ["one", "two"]
+    assert factory.process_node({"text": "  "})["status"] == "failed"
+
+
+def test_keyword_automaton_finds_the_same_lines_as_scanning():
+    keywords = ["Introduction", "Methods", "Conclusion"] + [f"term{i}" for i in range(40)]
+    text = "Preface\nIntroduction here\x0cbody term7 text\u2028more\r\nMethods\nrest\nConclusion"
+    expected = KeywordBasedChunker(keywords, use_automaton=False).chunk(text)
+    assert KeywordBasedChunker(keywords, use_automaton=True).chunk(text) == expected
+    assert expected[0] == "Preface"
+
+
+def test_semantic_breakpoints_split_where_the_topic_changes(monkeypatch):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    monkeypatch.setattr(chunking, "_nlp", nlp)
+    parse_cache.clear()
+
+    def embed(sentences):
+        # Sentences about cats point one way, the rest the other
+        return [[1.0, 0.0] if "cat" in sentence else [0.0, 1.0] for sentence in sentences]
+
+    chunker = SemanticBreakpointChunker(embed, breakpoint_percentile=50, n_process=1)
+    text = "The cat sleeps. A cat eats. Stocks fell today. Markets closed lower."
+    assert chunker.chunk(text) == ["The cat sleeps. A cat eats.", "Stocks fell today. Markets closed lower."]
+    assert chunker.breakpoints(np.ones((1, 2))).size == 0
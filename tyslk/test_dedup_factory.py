@@ -0,0 +1,120 @@
+import pytest
+
+from Factory.dedup_factory import DedupFactory
+from Factory.main_factory import INode
+from Factory.pipeline_executor import SKIPPED_STATUS, create_executor
+
+
+@pytest.fixture
+def dedup(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEDUP_DB_PATH", str(tmp_path / "dedup.db"))
+    return DedupFactory()
+
+
+def test_duplicate_in_flight_is_skipped_and_listed_on_the_canonical_record(dedup):
+    canonical = dedup.process_node({"file_path": "a.pdf", "file_bytes": b"same"})
+    duplicate = dedup.process_node({"file_path": "b.pdf", "file_bytes": b"same"})
+
+    assert canonical["status"] == "success"
+    assert duplicate["status"] == SKIPPED_STATUS
+    assert duplicate["record"]["duplicate_of"] == "a.pdf"
+    # The canonical record picks up the alias while it is still in the pipeline
+    assert canonical["record"]["aliases"] == ["b.pdf"]
+
+
+def test_mapping_is_only_stored_once_the_canonical_record_completes(dedup):
+    canonical = dedup.process_node({"file_path": "a.pdf", "file_bytes": b"same"})
+    dedup.process_node({"file_path": "b.pdf", "file_bytes": b"same"})
+    assert dedup._connect().execute("SELECT COUNT(*) FROM contents").fetchone()[0] == 0
+
+    dedup.on_record_complete(canonical["record"])
+    assert dedup.canonical_source("b.pdf") == "a.pdf"
+    assert dedup.aliases_of("a.pdf") == ["b.pdf"]
+
+
+def test_failed_canonical_record_leaves_no_mapping(dedup):
+    dedup.process_node({"file_path": "a.pdf", "file_bytes": b"same"})
+    # a.pdf never completes; the next run starts from an empty mapping
+    rerun = DedupFactory()
+    result = rerun.process_node({"file_path": "b.pdf", "file_bytes": b"same"})
+    assert result["status"] == "success"
+
+
+def test_later_run_links_duplicates_of_an_indexed_record(dedup):
+    dedup.on_record_complete(dedup.process_node({"file_path": "a.pdf", "file_bytes": b"same"})["record"])
+
+    rerun = DedupFactory()
+    duplicate = rerun.process_node({"file_path": "c.pdf", "file_bytes": b"same"})
+    assert duplicate["status"] == SKIPPED_STATUS
+    assert rerun.aliases_of("a.pdf") == ["c.pdf"]
+
+    # Reprocessing the canonical record carries the aliases stored so far
+    canonical = rerun.process_node({"file_path": "a.pdf", "file_bytes": b"same"})
+    assert canonical["record"]["aliases"] == ["c.pdf"]
+
+
+def test_changed_content_replaces_the_stale_mapping(dedup):
+    dedup.on_record_complete(dedup.process_node({"file_path": "a.pdf", "file_bytes": b"old"})["record"])
+    dedup.on_record_complete(dedup.process_node({"file_path": "a.pdf", "file_bytes": b"new"})["record"])
+
+    # Another file with the old bytes is no longer treated as a duplicate of a.pdf
+    result = dedup.process_node({"file_path": "b.pdf", "file_bytes": b"old"})
+    assert result["status"] == "success"
+
+
+def test_records_without_id_or_content_pass_through(dedup):
+    assert dedup.process_node({"metadata": {}})["status"] == "success"
+    assert dedup.process_node({"file_bytes": b"x"})["status"] == "success"
+
+
+def test_duplicate_after_the_canonical_record_failed_is_processed(dedup):
+    canonical = dedup.process_node({"file_path": "a.pdf", "file_bytes": b"same"})
+    # a.pdf fails in a later node
+    dedup.on_record_dropped(canonical["record"])
+
+    retry = dedup.process_node({"file_path": "b.pdf", "file_bytes": b"same"})
+    assert retry["status"] == "success"
+    dedup.on_record_complete(retry["record"])
+    assert dedup.canonical_source("a.pdf") == "a.pdf"
+    assert dedup.process_node({"file_path": "c.pdf", "file_bytes": b"same"})["record"]["duplicate_of"] == "b.pdf"
+
+
+def test_dropped_duplicate_does_not_release_the_canonical_record(dedup):
+    dedup.process_node({"file_path": "a.pdf", "file_bytes": b"same"})
+    duplicate = dedup.process_node({"file_path": "b.pdf", "file_bytes": b"same"})
+    dedup.on_record_dropped(duplicate["record"])
+    assert dedup.process_node({"file_path": "c.pdf", "file_bytes": b"same"})["status"] == SKIPPED_STATUS
+
+
+class FailOnce(INode):
+    """Fails the first record it sees, as an extraction error would."""
+
+    def __init__(self):
+        self.seen = []
+
+    def process_node(self, record):
+        self.seen.append(record["file_path"])
+        if len(self.seen) == 1:
+            return {"status": "failed", "error": True, "message": "extraction failed"}
+        return {"status": "success", "record": record, "error": None}
+
+
+@pytest.mark.parametrize("mode", ["sequential", "staged", "async"])
+def test_executors_report_dropped_records_to_dedup(dedup, mode):
+    extraction = FailOnce()
+    nodes = [{"node_type": "dedup", "node": dedup}, {"node_type": "extraction", "node": extraction}]
+
+    def on_node_complete(index, node_type, record):
+        if index == len(nodes) - 1:
+            dedup.on_record_complete(record)
+
+    executor = create_executor(nodes, {"mode": mode}, on_node_complete, None,
+                               lambda index, node_type, record: dedup.on_record_dropped(record))
+    executor.submit({"file_path": "a.pdf", "file_bytes": b"same"})
+    if mode != "sequential":
+        executor.close()
+    executor.submit({"file_path": "b.pdf", "file_bytes": b"same"})
+    executor.close()
+
+    assert extraction.seen == ["a.pdf", "b.pdf"]
+    assert dedup.canonical_source("b.pdf") == "b.pdf"
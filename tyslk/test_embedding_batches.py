@@ -0,0 +1,87 @@
+import pytest
+
+from Factory.embedding_batches import embed_in_batches, pack_batches
+
+
+def test_batches_keep_input_order_within_the_item_and_token_caps():
+    texts = ["aa", "bbbb", "c", "dddddd", "ee", "f", "g"]
+    batches = pack_batches(texts, len, max_items=3, max_tokens=7)
+
+    assert batches == [[0, 1, 2], [3], [4, 5, 6]]
+    assert [i for batch in batches for i in batch] == list(range(len(texts)))
+    assert all(len(batch) <= 3 and sum(len(texts[i]) for i in batch) <= 7 for batch in batches)
+
+
+def test_text_over_the_token_budget_gets_a_batch_of_its_own():
+    assert pack_batches(["a", "x" * 50, "b"], len, max_items=10, max_tokens=5) == [[0], [1], [2]]
+    assert pack_batches([], len, max_items=10, max_tokens=5) == []
+
+
+class Embedder:
+    """Embeds text as [len(text)], failing any request that contains a text in `bad`."""
+
+    def __init__(self, bad=(), fail_all=False):
+        self.bad, self.fail_all, self.requests = set(bad), fail_all, []
+
+    def __call__(self, texts):
+        self.requests.append(list(texts))
+        if self.fail_all or self.bad.intersection(texts):
+            raise RuntimeError("rejected")
+        return [[float(len(text))] for text in texts]
+
+
+def test_vectors_come_back_in_input_order():
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    embed = Embedder()
+    vectors, errors = embed_in_batches(embed, texts, [[0, 1], [2, 3, 4]])
+
+    assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert errors == {}
+    assert embed.requests == [["a", "bb"], ["ccc", "dddd", "eeeee"]]
+
+
+def test_failed_batch_is_halved_until_the_bad_text_is_isolated():
+    texts = [f"text{i}" for i in range(8)]
+    embed = Embedder(bad={"text5"})
+    vectors, errors = embed_in_batches(embed, texts, [list(range(8))])
+
+    assert list(errors) == [5]
+    assert errors[5] == "rejected"
+    assert vectors[5] is None
+    assert all(vectors[i] == [5.0] for i in range(8) if i != 5)
+    # 8 -> 4 + 4 -> 2 + 2 -> 1 + 1: the good halves go through once each
+    assert embed.requests[0] == texts
+    assert ["text5"] in embed.requests
+    assert len(embed.requests) == 7
+
+
+def test_wrong_number_of_vectors_counts_as_a_failure():
+    vectors, errors = embed_in_batches(lambda texts: [[0.0]], ["a", "b"], [[0, 1]])
+    assert vectors == [[0.0], [0.0]]
+    assert errors == {}
+
+    vectors, errors = embed_in_batches(lambda texts: [], ["a"], [[0]])
+    assert vectors == [None]
+    assert "Expected 1 embeddings, got 0" in errors[0]
+
+
+def test_remaining_batches_are_not_sent_after_repeated_failures():
+    texts = [f"text{i}" for i in range(12)]
+    embed = Embedder(fail_all=True)
+    vectors, errors = embed_in_batches(embed, texts, [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9], [10, 11]])
+
+    assert vectors == [None] * 12
+    assert sorted(errors) == list(range(12))
+    assert set(errors.values()) == {"rejected"}
+    # A batch of 2 allows 2.bit_length() + 2 = 4 failed requests in a row
+    assert len(embed.requests) == 4
+
+
+@pytest.mark.parametrize("bad", [{"text0"}, {"text0", "text9"}])
+def test_a_success_resets_the_failure_run(bad):
+    texts = [f"text{i}" for i in range(10)]
+    embed = Embedder(bad=bad)
+    vectors, errors = embed_in_batches(embed, texts, [[i] for i in range(10)])
+
+    assert sorted(errors) == sorted(int(text[4:]) for text in bad)
+    assert len(embed.requests) == 10
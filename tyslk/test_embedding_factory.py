@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from Factory.embedding_cache import EmbeddingCache
+from Factory.embedding_factory import EmbeddingFactory
+from Factory.lazy_registry import LazyRegistry
+
+
+class FakeService:
+    """Embeds text as [len(text)] * dimensions and counts the texts it was sent."""
+
+    def __init__(self, model="small", dimensions=3, identity=True):
+        self.model, self.dimensions, self.sent = model, dimensions, []
+        if identity:
+            self.cache_identity = lambda: f"{self.model}|{self.dimensions}"
+
+    def generate_embeddings(self, chunks):
+        self.sent.extend(chunks)
+        return [[float(len(chunk))] * self.dimensions for chunk in chunks]
+
+
+@pytest.fixture
+def factory(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_TYPE", "fake")
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "cache.db"))
+    return EmbeddingFactory()
+
+
+@pytest.fixture
+def use(monkeypatch):
+    """Registers a service as "fake" on a registry that only lives for the test."""
+    registry = LazyRegistry({})
+    monkeypatch.setattr(EmbeddingFactory, "service_type", registry)
+
+    def register(service):
+        registry.register("fake", lambda: service)
+        return service
+    return register
+
+
+def test_cache_is_off_unless_a_path_is_configured(tmp_path, monkeypatch, use):
+    monkeypatch.delenv("EMBEDDING_CACHE_PATH", raising=False)
+    monkeypatch.chdir(tmp_path)
+    assert not EmbeddingCache().enabled
+    monkeypatch.setenv("EMBEDDING_TYPE", "fake")
+    use(FakeService())
+    EmbeddingFactory().process_node({"chunks": ["a"]})
+    assert os.listdir(tmp_path) == []
+
+
+def test_repeated_chunks_are_served_from_the_cache(factory, use):
+    service = use(FakeService())
+    factory.process_node({"chunks": ["one", "two"]})
+    result = factory.process_node({"chunks": ["two", "three"]})
+
+    assert service.sent == ["one", "two", "three"]
+    assert result["record"]["embeddings"] == [[3.0] * 3, [5.0] * 3]
+
+
+def test_cache_key_follows_the_model_and_dimensions_the_service_uses(factory, use):
+    use(FakeService(dimensions=3))
+    factory.process_node({"chunks": ["cached"]})
+
+    service = use(FakeService(dimensions=5))
+    result = factory.process_node({"chunks": ["cached", "fresh"]})
+
+    # No 3-d vectors from the cache next to fresh 5-d ones
+    assert service.sent == ["cached", "fresh"]
+    assert all(len(vector) == 5 for vector in result["record"]["embeddings"])
+
+
+def test_services_without_an_identity_are_not_cached(factory, monkeypatch, use):
+    service = use(FakeService(identity=False))
+    factory.process_node({"chunks": ["a"]})
+    factory.process_node({"chunks": ["a"]})
+    assert service.sent == ["a", "a"]
+
+    monkeypatch.setenv("EMBEDDING_CACHE_NAMESPACE", "deployment-x|1536")
+    factory.process_node({"chunks": ["a"]})
+    factory.process_node({"chunks": ["a"]})
+    assert service.sent == ["a", "a", "a"]
+
+
+def test_cache_round_trips_vectors(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"))
+    cache.put_many("m", 2, ["a", "b"], [[0.5, 0.25], None])
+    assert cache.get_many("m", 2, ["a", "b"]) == [[0.5, 0.25], None]
+    assert cache.get("m", 3, "a") is None
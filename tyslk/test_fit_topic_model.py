@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from Factory.chunking_factory import ChunkingFactory
+from Factory.fit_topic_model import main
+
+DOCUMENTS = [
+    "The invoice total and the quarterly revenue report. Revenue grew in every region.",
+    "The contract policy covers each tenant account. Policy changes need a signed contract.",
+    "Search latency and index throughput. The vector index serves every search.",
+]
+
+
+def test_fitted_model_is_saved_and_used_by_the_factory(tmp_path, monkeypatch, capsys):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    for i, text in enumerate(DOCUMENTS):
+        (corpus / f"{i}.txt").write_text(text)
+    (corpus / "skip.pdf").write_bytes(b"%PDF")
+    model_path = str(tmp_path / "topics.joblib")
+
+    topics = main(["--corpus-dir", str(corpus), "--model-path", model_path, "--num-topics", "2"])
+    assert len(topics) == 2
+    assert os.path.exists(model_path)
+    assert "Saved topic model" in capsys.readouterr().out
+
+    monkeypatch.setenv("CHUNKING_STRATEGY", "topic_based")
+    monkeypatch.setenv("TOPIC_MODEL_PATH", model_path)
+    chunker = ChunkingFactory().get_chunker("topic_based")
+    chunks = chunker.chunk(DOCUMENTS[0])
+    assert len(chunks) == 2
+    # Sentences are labelled with the saved topics rather than ones fitted on this document
+    labels = [f"Topic {i}: {topic} - " for i, topic in enumerate(topics, 1)]
+    assert all(any(chunk.startswith(label) for label in labels) for chunk in chunks)
+
+
+def test_empty_corpus_is_an_error(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["--corpus-dir", str(tmp_path), "--model-path", str(tmp_path / "topics.joblib")])
+    assert not os.path.exists(tmp_path / "topics.joblib")
@@ -0,0 +1,83 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from Factory.lazy_registry import LazyRegistry, load_class, provider
+
+
+@pytest.fixture
+def module(tmp_path, monkeypatch):
+    """A provider module on sys.path that has not been imported yet."""
+    (tmp_path / "lazy_provider_module.py").write_text(
+        "class Service:\n"
+        "    def __init__(self, name='default'):\n"
+        "        self.name = name\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_provider_module", raising=False)
+    yield "lazy_provider_module"
+    sys.modules.pop("lazy_provider_module", None)
+
+
+def test_provider_is_imported_and_created_on_first_lookup_only(module):
+    registry = LazyRegistry({"service": f"{module}:Service"})
+    assert "service" in registry
+    assert list(registry) == ["service"] and len(registry) == 1
+    assert module not in sys.modules
+    assert registry.loaded() == {}
+
+    service = registry["service"]
+    assert service.name == "default"
+    assert registry.get("service") is service
+    assert registry.loaded() == {"service": service}
+
+
+def test_unknown_names(module):
+    registry = LazyRegistry({"service": f"{module}:Service"})
+    assert registry.get("missing") is None
+    assert registry.get(None, "fallback") == "fallback"
+    with pytest.raises(KeyError):
+        registry["missing"]
+    assert module not in sys.modules
+
+
+def test_provider_passes_its_arguments(module):
+    registry = LazyRegistry({"named": provider(f"{module}:Service", name="custom")})
+    assert registry["named"].name == "custom"
+
+
+def test_register_replaces_the_created_instance(module):
+    registry = LazyRegistry({"service": f"{module}:Service"})
+    first = registry["service"]
+    registry.register("service", lambda: "replacement")
+    assert registry["service"] == "replacement"
+    assert first is not registry["service"]
+
+
+def test_bad_provider_path_is_an_error():
+    with pytest.raises(ValueError):
+        load_class("no_class_here")
+    with pytest.raises(ValueError):
+        LazyRegistry({"bad": "no_class_here"}).get("bad")
+
+
+def test_concurrent_lookups_create_one_instance():
+    created = []
+
+    def create():
+        time.sleep(0.05)
+        created.append(object())
+        return created[-1]
+
+    registry = LazyRegistry({"slow": create})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("slow"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(result is created[0] for result in results)
@@ -0,0 +1,120 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from Services.Embeddings.opensource_embedding_service import OpensourceEmbeddingService
+
+
+class FakeModel:
+    """SentenceTransformer stand-in: embeds text as [len(text), 1.0] and records how it was built and called."""
+
+    created = []
+
+    def __init__(self, name, device=None, backend="torch", model_kwargs=None):
+        self.name, self.device, self.backend, self.model_kwargs = name, device, backend, model_kwargs
+        self.max_seq_length = 512
+        self.calls = []
+        FakeModel.created.append(self)
+
+    def eval(self):
+        return self
+
+    def encode(self, texts, **kwargs):
+        self.calls.append((texts, kwargs))
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+@pytest.fixture
+def libraries(monkeypatch):
+    """Fake sentence_transformers, torch and onnxruntime modules; returns what torch was asked to do."""
+    FakeModel.created = []
+    torch_calls = []
+    torch = types.SimpleNamespace(
+        set_num_threads=lambda n: torch_calls.append(("threads", n)),
+        nn=types.SimpleNamespace(Linear=object),
+        qint8="qint8",
+        quantization=types.SimpleNamespace(
+            quantize_dynamic=lambda model, layers, dtype: torch_calls.append(("quantize", dtype)) or model
+        ),
+    )
+    onnxruntime = types.SimpleNamespace(SessionOptions=types.SimpleNamespace)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "onnxruntime", onnxruntime)
+    monkeypatch.setitem(sys.modules, "sentence_transformers", types.SimpleNamespace(SentenceTransformer=FakeModel))
+    return torch_calls
+
+
+@pytest.fixture(autouse=True)
+def env(monkeypatch):
+    for name in ("MODEL", "BACKEND", "FILE", "QUANTIZE", "BATCH_SIZE", "MAX_TOKENS", "THREADS", "NORMALIZE"):
+        monkeypatch.delenv(f"OPENSOURCE_EMBEDDING_{name}", raising=False)
+
+
+def test_model_is_loaded_once_on_first_use(libraries, monkeypatch):
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_THREADS", "2")
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_MAX_TOKENS", "128")
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_BATCH_SIZE", "4")
+    service = OpensourceEmbeddingService()
+    assert service.generate_embeddings([]) == []
+    assert FakeModel.created == []
+
+    assert service.generate_embeddings(("ab", "abc")) == [[2.0, 1.0], [3.0, 1.0]]
+    service.generate_embeddings(["a"])
+    model, = FakeModel.created
+    assert (model.device, model.backend, model.max_seq_length) == ("cpu", "torch", 128)
+    assert libraries == [("threads", 2)]
+    texts, kwargs = model.calls[0]
+    assert texts == ["ab", "abc"]
+    assert kwargs["batch_size"] == 4 and kwargs["normalize_embeddings"] is True
+
+
+def test_onnx_backend_gets_the_model_file_and_session_threads(libraries, monkeypatch):
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_BACKEND", "ONNX")
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_FILE", "onnx/model_qint8_avx512.onnx")
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_THREADS", "3")
+    model = OpensourceEmbeddingService().model
+
+    assert model.backend == "onnx"
+    assert model.model_kwargs["file_name"] == "onnx/model_qint8_avx512.onnx"
+    assert model.model_kwargs["session_options"].intra_op_num_threads == 3
+    assert model.model_kwargs["provider"] == "CPUExecutionProvider"
+
+
+def test_quantize_applies_to_the_torch_backend_only(libraries, monkeypatch):
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_QUANTIZE", "true")
+    OpensourceEmbeddingService().model
+    assert ("quantize", "qint8") in libraries
+
+    libraries.clear()
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_BACKEND", "openvino")
+    OpensourceEmbeddingService().model
+    assert all(call[0] != "quantize" for call in libraries)
+
+
+def test_cache_identity_changes_with_every_setting_that_changes_vectors(monkeypatch):
+    identities = {OpensourceEmbeddingService().cache_identity()}
+    for name, value in [("MODEL", "local/model"), ("BACKEND", "onnx"), ("FILE", "model.onnx"),
+                        ("QUANTIZE", "true"), ("MAX_TOKENS", "64"), ("NORMALIZE", "false")]:
+        monkeypatch.setenv(f"OPENSOURCE_EMBEDDING_{name}", value)
+        identities.add(OpensourceEmbeddingService().cache_identity())
+    assert len(identities) == 7
+
+    # Batch size and threads do not change the vectors
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_BATCH_SIZE", "8")
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_THREADS", "1")
+    assert OpensourceEmbeddingService().cache_identity() in identities
+
+
+def test_validate_config(libraries, monkeypatch):
+    assert OpensourceEmbeddingService().validate_config({})["error"] is False
+
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_BACKEND", "tensorrt")
+    result = OpensourceEmbeddingService().validate_config({})
+    assert result["error"] and "tensorrt" in result["message"]
+
+    monkeypatch.setenv("OPENSOURCE_EMBEDDING_BACKEND", "onnx")
+    monkeypatch.setitem(sys.modules, "onnxruntime", None)
+    result = OpensourceEmbeddingService().validate_config({})
+    assert result["error"] and "Missing package" in result["message"]
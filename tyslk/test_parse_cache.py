@@ -0,0 +1,66 @@
+import pickle
+
+import pytest
+import spacy
+
+from Services.Chunking import chunking
+from Services.Chunking.chunking import EntityChunker, SentenceChunker
+from Services.Chunking.parse_cache import ParsedDocument, ParsedDocumentCache, parse_cache
+
+TEXT = "The first sentence. The second one follows. A third ends it."
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    calls = []
+    pipe = nlp.pipe
+
+    def counting_pipe(texts, **kwargs):
+        texts = list(texts)
+        calls.extend(texts)
+        return pipe(texts, **{k: v for k, v in kwargs.items() if k != "n_process"})
+
+    monkeypatch.setattr(nlp, "pipe", counting_pipe)
+    monkeypatch.setattr(chunking, "_nlp", nlp)
+    parse_cache.clear()
+    yield calls
+    parse_cache.clear()
+
+
+def test_entries_hold_offsets_not_the_text():
+    parsed = ParsedDocument()
+    parsed.sentences = [(0, 19), (20, 43)]
+    assert not hasattr(parsed, "text")
+    assert parsed.sentence_texts(TEXT) == ["The first sentence.", "The second one follows."]
+    assert TEXT.encode() not in pickle.dumps(parsed)
+
+
+def test_entries_are_written_through_to_the_spill_dir(tmp_path):
+    parsed = ParsedDocument()
+    parsed.sentences = [(0, 3)]
+    ParsedDocumentCache(spill_dir=str(tmp_path)).put("model-abc", parsed)
+
+    # A new process finds the entry without the first one ever evicting or flushing it
+    loaded = ParsedDocumentCache(spill_dir=str(tmp_path)).get("model-abc")
+    assert loaded.sentences == [(0, 3)]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_memory_is_bounded():
+    cache = ParsedDocumentCache(max_items=2)
+    for key in "abc":
+        cache.put(key, ParsedDocument())
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_strategies_share_a_parse_and_chunk_from_the_callers_text(nlp):
+    assert SentenceChunker().chunk(TEXT) == ["The first sentence.", "The second one follows.", "A third ends it."]
+    assert SentenceChunker().chunk(TEXT) == ["The first sentence.", "The second one follows.", "A third ends it."]
+    assert nlp == [TEXT]
+
+    # Entities were not parsed the first time, so the text is parsed once more
+    EntityChunker().chunk(TEXT)
+    assert nlp == [TEXT, TEXT]
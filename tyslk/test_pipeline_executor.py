@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from Factory.main_factory import INode
+from Factory.pipeline_executor import SKIPPED_STATUS, StagedExecutor, create_executor
+from Factory.pipeline_metrics import PipelineMetrics
+
+
+class TagNode(INode):
+    """Adds its name to the record; fails or skips records listed at construction."""
+
+    def __init__(self, name, fail=(), skip=(), delay=0.0, raises=()):
+        self.name, self.fail, self.skip, self.delay, self.raises = name, set(fail), set(skip), delay, set(raises)
+        self.batches = []
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def process_node(self, record):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if record["i"] in self.raises:
+            raise RuntimeError("unhandled")
+        if record["i"] in self.fail:
+            return {"status": "failed", "error": True, "message": "boom"}
+        updated_record = dict(record, path=record.get("path", []) + [self.name])
+        if record["i"] in self.skip:
+            return {"status": SKIPPED_STATUS, "record": updated_record, "error": None}
+        return {"status": "success", "record": updated_record, "error": None}
+
+    def process_batch(self, records):
+        with self._lock:
+            self.batches.append(len(records))
+        return super().process_batch(records)
+
+
+class AsyncTagNode(TagNode):
+    async def process_node(self, record):
+        await asyncio.sleep(self.delay)
+        return {"status": "success", "record": dict(record, path=record.get("path", []) + [self.name]), "error": None}
+
+
+def run(mode, nodes, records, dropped=None, **execution):
+    completed = []
+    lock = threading.Lock()
+
+    def on_node_complete(index, node_type, record):
+        if index == len(nodes) - 1:
+            with lock:
+                completed.append(record)
+
+    def on_record_dropped(index, node_type, record):
+        with lock:
+            dropped.append((node_type, record["i"], record.get("path", [])))
+
+    metrics = PipelineMetrics()
+    executor = create_executor(nodes, dict(execution, mode=mode), on_node_complete, metrics,
+                               on_record_dropped if dropped is not None else None)
+    for record in records:
+        try:
+            executor.submit(record)
+        except RuntimeError:
+            pass  # The sequential executor lets unhandled node errors reach the caller
+    executor.close()
+    return sorted(completed, key=lambda record: record["i"]), metrics
+
+
+@pytest.mark.parametrize("mode", ["sequential", "staged", "async"])
+def test_records_go_through_every_node_and_failures_and_skips_stop_early(mode):
+    nodes = [
+        {"node_type": "a", "node": TagNode("a"), "workers": 2},
+        {"node_type": "b", "node": TagNode("b", fail={3}, skip={5}), "workers": 2},
+        {"node_type": "c", "node": TagNode("c")},
+    ]
+    completed, metrics = run(mode, nodes, [{"i": i} for i in range(8)])
+
+    assert [record["i"] for record in completed] == [0, 1, 2, 4, 6, 7]
+    assert all(record["path"] == ["a", "b", "c"] for record in completed)
+    snapshot = metrics.snapshot()["nodes"]
+    assert snapshot["b"]["errors"] == 1
+    assert snapshot["c"]["records_out"] == 6
+
+
+@pytest.mark.parametrize("mode", ["sequential", "staged", "async"])
+def test_records_that_fail_skip_or_raise_are_reported_with_the_node_input(mode):
+    nodes = [
+        {"node_type": "a", "node": TagNode("a")},
+        {"node_type": "b", "node": TagNode("b", fail={1}, skip={2}, raises={3})},
+    ]
+    dropped = []
+    completed, _ = run(mode, nodes, [{"i": i} for i in range(5)], dropped)
+
+    assert [record["i"] for record in completed] == [0, 4]
+    assert sorted(dropped) == [("b", 1, ["a"]), ("b", 2, ["a"]), ("b", 3, ["a"])]
+
+
+@pytest.mark.parametrize("mode", ["staged", "async"])
+def test_batching_nodes_get_records_through_process_batch(mode):
+    batching = TagNode("batch", delay=0.01)
+    nodes = [
+        {"node_type": "a", "node": TagNode("a")},
+        {"node_type": "batch", "node": batching, "batch_size": 4, "concurrency": 1},
+    ]
+    completed, _ = run(mode, nodes, [{"i": i} for i in range(20)], max_in_flight=20, queue_size=20)
+
+    assert len(completed) == 20
+    assert batching.calls == 20
+    # Records queued up behind a busy node are handed over together, a single one goes to process_node
+    assert batching.batches
+    assert max(batching.batches) <= 4
+
+
+def test_async_mode_awaits_coroutine_nodes():
+    nodes = [{"node_type": "a", "node": AsyncTagNode("a", delay=0.05), "concurrency": 10}]
+    start = time.perf_counter()
+    completed, _ = run("async", nodes, [{"i": i} for i in range(10)])
+
+    assert len(completed) == 10
+    # Ten 50 ms calls overlap instead of running one after another
+    assert time.perf_counter() - start < 0.4
+
+
+def test_staged_stages_overlap_on_different_records():
+    nodes = [
+        {"node_type": "a", "node": TagNode("a", delay=0.05)},
+        {"node_type": "b", "node": TagNode("b", delay=0.05)},
+    ]
+    start = time.perf_counter()
+    completed, _ = run("staged", nodes, [{"i": i} for i in range(8)])
+
+    assert len(completed) == 8
+    # Sequentially this takes 16 x 50 ms; with both stages busy at once it is about 9 x 50 ms
+    assert time.perf_counter() - start < 0.7
+
+
+def test_staged_submit_blocks_while_the_first_queue_is_full():
+    release = threading.Event()
+
+    class Blocking(TagNode):
+        def process_node(self, record):
+            release.wait()
+            return super().process_node(record)
+
+    executor = StagedExecutor([{"node_type": "a", "node": Blocking("a")}], queue_size=1)
+    submitted = []
+
+    def connector():
+        for i in range(4):
+            executor.submit({"i": i})
+            submitted.append(i)
+
+    thread = threading.Thread(target=connector, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+    # One record is in the worker and one waits in the queue; the connector is held back
+    assert submitted == [0, 1]
+    release.set()
+    thread.join(timeout=5)
+    executor.close()
+    assert submitted == [0, 1, 2, 3]
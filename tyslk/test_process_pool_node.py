@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from Factory.lazy_registry import load_class
+from Factory.main_factory import INode
+from Factory.process_pool_node import ProcessPoolNode, node_path
+
+
+class WorkerNode(INode):
+    """Tags records with the process that handled them and how many nodes that process built."""
+
+    created = 0
+
+    def __init__(self):
+        WorkerNode.created += 1
+
+    def process_node(self, record):
+        return {
+            "status": "success",
+            "record": {**record, "pid": os.getpid(), "created": WorkerNode.created, "payload": bytes(record["payload"])},
+            "error": False,
+            "message": "",
+        }
+
+
+@pytest.fixture
+def pool():
+    node = ProcessPoolNode(node_path(WorkerNode()), processes=2)
+    yield node
+    node.close()
+
+
+def test_node_path_loads_the_same_class():
+    assert load_class(node_path(WorkerNode())) is WorkerNode
+
+
+def test_records_are_processed_in_worker_processes_in_order(pool):
+    records = [{"id": i, "payload": memoryview(b"data%d" % i)} for i in range(6)]
+    results = pool.process_batch(records)
+
+    assert [result["record"]["id"] for result in results] == list(range(6))
+    # Binary views are sent as bytes
+    assert [result["record"]["payload"] for result in results] == [b"data%d" % i for i in range(6)]
+    assert all(result["record"]["pid"] != os.getpid() for result in results)
+
+
+def test_each_worker_builds_its_node_once(pool):
+    results = [pool.process_node({"id": i, "payload": b""}) for i in range(8)]
+
+    assert all(result["status"] == "success" for result in results)
+    assert {result["record"]["created"] for result in results} == {1}
+    assert len({result["record"]["pid"] for result in results}) <= 2
+
+
+def test_close_releases_the_pool_and_a_later_call_starts_a_new_one(pool):
+    first = pool.process_node({"payload": b""})["record"]["pid"]
+    pool.close()
+    assert pool._pool is None
+    assert pool.process_node({"payload": b""})["record"]["pid"] != first
+
+
+def test_processes_default_to_the_cpu_count():
+    assert ProcessPoolNode("module:Class").processes == (os.cpu_count() or 1)
+    assert ProcessPoolNode("module:Class", "3").processes == 3
@@ -0,0 +1,82 @@
+import pytest
+
+from Factory.lazy_registry import LazyRegistry
+from Factory.search_factory import SearchFactory
+
+
+class FakeSearch:
+    """Records every upload; rejects any upload that holds a chunk in `bad`, or returns `result`."""
+
+    def __init__(self, bad=(), result=True):
+        self.bad, self.result, self.uploads = set(bad), result, []
+
+    def store_records(self, documents):
+        self.uploads.append([document["chunks"] for document in documents])
+        if self.bad.intersection(document["chunks"] for document in documents):
+            raise ValueError("document rejected")
+        return self.result
+
+
+@pytest.fixture
+def use(monkeypatch):
+    """Registers a search service as "fake" on a registry that only lives for the test."""
+    monkeypatch.setenv("SEARCH_TYPE", "fake")
+    monkeypatch.delenv("FIELD_DEFINITIONS", raising=False)
+    registry = LazyRegistry({})
+    monkeypatch.setattr(SearchFactory, "_services", registry)
+
+    def register(service):
+        registry.register("fake", lambda: service)
+        return service
+    return register
+
+
+def records(*names):
+    return [{"name": name, "chunks": [f"{name}-0", f"{name}-1"], "embeddings": [[0.0], [1.0]]} for name in names]
+
+
+def test_batch_is_stored_with_one_upload(use):
+    service = use(FakeSearch())
+    results = SearchFactory().process_batch(records("a", "b"))
+
+    assert [result["status"] for result in results] == ["success", "success"]
+    assert [result["record"]["name"] for result in results] == ["a", "b"]
+    assert service.uploads == [["a-0", "a-1", "b-0", "b-1"]]
+
+
+def test_rejected_document_only_fails_its_own_record(use):
+    service = use(FakeSearch(bad={"b-1"}))
+    results = SearchFactory().process_batch(records("a", "b", "c"))
+
+    assert [result["status"] for result in results] == ["success", "failed", "success"]
+    assert results[1]["message"] == "document rejected"
+    assert service.uploads[1:] == [["a-0", "a-1"], ["b-0", "b-1"], ["c-0", "c-1"]]
+
+
+def test_falsy_result_is_retried_record_by_record(use):
+    service = use(FakeSearch(result=False))
+    results = SearchFactory().process_batch(records("a", "b"))
+
+    assert [result["status"] for result in results] == ["failed", "failed"]
+    assert len(service.uploads) == 3
+
+
+def test_single_record_is_not_uploaded_twice(use):
+    service = use(FakeSearch(bad={"a-0"}))
+    result = SearchFactory().process_node(records("a")[0])
+
+    assert result["status"] == "failed"
+    assert len(service.uploads) == 1
+
+
+def test_field_definitions_map_record_fields_onto_documents(use, monkeypatch):
+    monkeypatch.setenv("FIELD_DEFINITIONS", '[{"source_name": "meta.title", "Target_name": "title"}]')
+    uploaded = []
+    service = use(FakeSearch())
+    service.store_records = lambda documents: uploaded.extend(documents) or True
+    record = {"meta": {"title": "Report"}, "chunks": ["text"], "embeddings": [[0.5]]}
+
+    assert SearchFactory().process_node(record)["status"] == "success"
+    assert uploaded[0]["title"] == "Report"
+    assert uploaded[0]["embeddings"] == [0.5]
+    assert "chunks" not in record and "embeddings" not in record
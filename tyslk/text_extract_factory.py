@@ -1,21 +1,19 @@
-from Services.Text_Extraction.Azure_Service import AzureService
 from typing import Dict, Any
-from Services.Text_Extraction.Aws_Service import AwsService
-from Services.Text_Extraction.Gcp_Service import GcpService
 from Services.Text_Extraction.iText_Extraction import Text_Service
-from Services.Text_Extraction.Opensource_Service import OpensourceService
 
 import os
 from typing import Dict, Any
 from Factory.main_factory import INode
+from Factory.lazy_registry import LazyRegistry
+from Factory.pipeline_record import PipelineRecord, payload_bytes
 class TextExtractionFactory(INode):
-    # Services available for text extraction
-    _services = {
-        "azure": AzureService(),
-        # "gcp": GcpService(),
-        "aws": AwsService(),
-        "opensource": OpensourceService()
-    }
+    # Services available for text extraction, created on first use
+    _services = LazyRegistry({
+        "azure": "Services.Text_Extraction.Azure_Service:AzureService",
+        # "gcp": "Services.Text_Extraction.Gcp_Service:GcpService",
+        "aws": "Services.Text_Extraction.Aws_Service:AwsService",
+        "opensource": "Services.Text_Extraction.Opensource_Service:OpensourceService"
+    })
 
     # @staticmethod
     def validate_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
@@ -71,7 +69,7 @@ class TextExtractionFactory(INode):
         
         # Normalize and fetch the appropriate service instance
         service_type = service_type.strip().lower()
-        extract_service: Text_Service = TextExtractionFactory()._services.get(service_type)
+        extract_service: Text_Service = self._services.get(service_type)
         
         if not extract_service:
             raise ValueError(f"Unsupported service type: {service_type}")
@@ -105,7 +103,7 @@ class TextExtractionFactory(INode):
             service = self.create_service(text_extraction_type)
             if 'file_bytes' in input:
                 file_extension = f".{file_name.split('.')[-1]}"
-                result = service.process(input["file_bytes"], file_extension)
+                result = service.process(payload_bytes(input["file_bytes"]), file_extension)
 
                 if result.get("error"):
                     return {
@@ -117,6 +115,9 @@ class TextExtractionFactory(INode):
                 updated_record = input.copy()
                 updated_record["text"] = result.get("extracted_text", "")
                 updated_record.pop("file_bytes", None)
+                # Later stages only need the text, free the file content for every copy of the record
+                if isinstance(input, PipelineRecord):
+                    input.release_payload()
 
                 return {
                     "status": "success",